@@ -8,19 +8,27 @@ demo_users = [
     {"email": "analyst@crv360.dsecure", "name": "Analyst User", "role": "Analyst"},
 ]
 
-for u in demo_users:
-    users_collection.update_one(
-        {"email": u["email"]},
-        {"$set": {
+def documents():
+    return {"users": [
+        {
             "email": u["email"],
             "name": u["name"],
             "role": u["role"],
             "password": get_password_hash("admin@123"),
             "is_active": True,
             "created_at": datetime.utcnow()
-        }},
-        upsert=True
-    )
-    print(f"Added: {u['email']} - Role: {u['role']}")
+        }
+        for u in demo_users
+    ]}
 
-print("\nAll 3 demo users added to 'product' database! Password: admin@123 🎉")
\ No newline at end of file
+
+if __name__ == "__main__":
+    for user in documents()["users"]:
+        users_collection.update_one(
+            {"email": user["email"]},
+            {"$set": user},
+            upsert=True
+        )
+        print(f"Added: {user['email']} - Role: {user['role']}")
+
+    print("\nAll 3 demo users added to 'product' database! Password: admin@123 🎉")
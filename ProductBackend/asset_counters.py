@@ -0,0 +1,150 @@
+# Running totals over the assets collection, so summary routes read one small document
+# instead of counting or grouping every asset per request.
+#
+# Writers call on_insert / on_update / on_delete next to the write; reconcile() rebuilds
+# the document from scratch in one aggregation and runs periodically from the app
+# lifespan (and after bulk loads), correcting any drift from writes that bypassed the
+# hooks or raced a previous reconciliation.
+#
+#   python asset_counters.py        # reconcile now
+
+import os
+import time
+from datetime import datetime
+
+from database import db
+
+COUNTERS_ID = "assets"
+
+# Asset field -> counter map in the counters document.
+GROUPED_FIELDS = {
+    "status": "by_status",
+    "criticality": "by_criticality",
+    "type": "by_type",
+    "exposure_level": "by_exposure_level",
+    "compliance_status": "by_compliance_status",
+}
+
+RECONCILE_INTERVAL_S = int(os.getenv("ASSET_COUNTER_RECONCILE_S", "600"))
+
+
+def _bucket(value):
+    # Values become field names: no dots, no leading "$", and null groups as "Unknown".
+    if value is None or value == "":
+        return "Unknown"
+    return str(value).replace(".", "_").lstrip("$") or "Unknown"
+
+
+def _risk_score(doc):
+    score = doc.get("risk_score")
+    return score if isinstance(score, (int, float)) and not isinstance(score, bool) else None
+
+
+def _increments(doc, sign):
+    inc = {"total": sign}
+    for field, counter in GROUPED_FIELDS.items():
+        inc[f"{counter}.{_bucket(doc.get(field))}"] = sign
+    score = _risk_score(doc)
+    if score is not None:
+        inc["risk_score_sum"] = sign * score
+        inc["risk_score_count"] = sign
+    return inc
+
+
+def _apply(inc):
+    if inc:
+        db["asset_counters"].update_one({"_id": COUNTERS_ID}, {"$inc": inc}, upsert=True)
+
+
+def on_insert(doc):
+    _apply(_increments(doc, 1))
+
+
+def on_delete(doc):
+    if doc:
+        _apply(_increments(doc, -1))
+
+
+def on_update(before, after):
+    """Moves one asset between buckets; fields that didn't change cancel out."""
+    if before is None:
+        return on_insert(after)
+    on_changes(updated=[(before, after)])
+
+
+def on_changes(inserted=(), updated=()):
+    """One $inc for a batch of writes: new docs plus (before, after) pairs."""
+    inc = {}
+    changes = [_increments(doc, 1) for doc in inserted]
+    for before, after in updated:
+        changes += [_increments(before, -1), _increments(after, 1)]
+    for change in changes:
+        for key, value in change.items():
+            inc[key] = inc.get(key, 0) + value
+    _apply({key: value for key, value in inc.items() if value})
+
+
+# ============================================
+# READS
+# ============================================
+
+def get():
+    """The counters document, rebuilt first if it doesn't exist yet."""
+    counters = db["asset_counters"].find_one({"_id": COUNTERS_ID})
+    return counters if counters is not None else reconcile()
+
+
+def distribution(counters, field):
+    """[{"name", "value"}] for one grouped field, skipping emptied buckets."""
+    return [{"name": name, "value": count}
+            for name, count in counters.get(GROUPED_FIELDS[field], {}).items() if count > 0]
+
+
+# ============================================
+# RECONCILIATION
+# ============================================
+
+def reconcile():
+    """Recomputes every counter with one $facet pass over assets and replaces the document."""
+    facets = {counter: [{"$group": {"_id": f"${field}", "count": {"$sum": 1}}}]
+              for field, counter in GROUPED_FIELDS.items()}
+    facets["totals"] = [{"$group": {
+        "_id": None,
+        "total": {"$sum": 1},
+        "risk_score_sum": {"$sum": {"$cond": [{"$isNumber": "$risk_score"}, "$risk_score", 0]}},
+        "risk_score_count": {"$sum": {"$cond": [{"$isNumber": "$risk_score"}, 1, 0]}},
+    }}]
+    result = next(db["assets"].aggregate([{"$facet": facets}]), {})
+
+    totals = (result.get("totals") or [{}])[0]
+    counters = {
+        "_id": COUNTERS_ID,
+        "total": totals.get("total", 0),
+        "risk_score_sum": totals.get("risk_score_sum", 0),
+        "risk_score_count": totals.get("risk_score_count", 0),
+        "reconciled_at": datetime.utcnow(),
+    }
+    for counter in GROUPED_FIELDS.values():
+        counters[counter] = {}
+        for group in result.get(counter, []):
+            bucket = _bucket(group["_id"])
+            counters[counter][bucket] = counters[counter].get(bucket, 0) + group["count"]
+
+    db["asset_counters"].replace_one({"_id": COUNTERS_ID}, counters, upsert=True)
+    return counters
+
+
+def reconcile_if_due(interval=RECONCILE_INTERVAL_S):
+    """Reconciles unless another worker did so within `interval` seconds; True if it ran."""
+    current = db["asset_counters"].find_one({"_id": COUNTERS_ID}, {"reconciled_at": 1})
+    reconciled_at = (current or {}).get("reconciled_at")
+    if reconciled_at and (datetime.utcnow() - reconciled_at).total_seconds() < interval:
+        return False
+    reconcile()
+    return True
+
+
+if __name__ == "__main__":
+    started = time.perf_counter()
+    counters = reconcile()
+    print(f"✅ Reconciled {counters['total']} assets in {time.perf_counter() - started:.2f}s")
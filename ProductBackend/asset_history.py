@@ -0,0 +1,228 @@
+# Append-only change history for assets, for "what did the inventory look like on date X".
+#
+# Every write to an asset appends one entry to asset_history, numbered by the asset's
+# revision: a full copy when it's created (and every SNAPSHOT_EVERY revisions after
+# that), otherwise only the fields that changed. Rebuilding an asset as of a moment
+# reads the newest full entry at or before it plus the deltas since, so it never
+# touches more than SNAPSHOT_EVERY entries however long the history gets.
+#
+# Bookkeeping fields that change on every sighting (updated_at, last_seen_by, ...) or
+# are derived from other fields (ip_norm, identity_keys) are left out, and a write that
+# changes nothing else records nothing, so history grows with real changes only.
+#
+#   python asset_history.py baseline    # creation entries for assets that predate history
+#   python asset_history.py report      # storage report
+
+import argparse
+import json
+import os
+import time
+from datetime import datetime
+
+from pymongo.errors import BulkWriteError
+
+from database import db
+
+SNAPSHOT_EVERY = int(os.getenv("ASSET_HISTORY_SNAPSHOT_EVERY", "20"))
+
+IGNORED_FIELDS = frozenset({"_id", "updated_at", "revision", "last_seen_by", "last_scanned",
+                            "ip_norm", "ip_version", "identity_keys",
+                            "risk_score", "open_vulns", "risk_scored_at"})
+
+CREATE, SNAPSHOT, DELTA, DELETE = "create", "snapshot", "delta", "delete"
+
+
+def _tracked(doc):
+    return {field: value for field, value in doc.items() if field not in IGNORED_FIELDS}
+
+
+def _at(doc):
+    return doc.get("updated_at") or doc.get("created_at") or datetime.utcnow()
+
+
+def _full(asset, seq, kind):
+    return {"asset_id": asset["_id"], "seq": seq, "at": _at(asset), "kind": kind, "full": True,
+            "doc": _tracked(asset)}
+
+
+def _delta(before, after, seq):
+    old, new = _tracked(before), _tracked(after)
+    changed = {field: value for field, value in new.items() if old.get(field, object()) != value}
+    removed = sorted(field for field in old if field not in new)
+    if not changed and not removed:
+        return None
+    return {"asset_id": after["_id"], "seq": seq, "at": _at(after), "kind": DELTA, "full": False,
+            "set": changed, "unset": removed}
+
+
+def _write(entries):
+    if not entries:
+        return
+    try:
+        db["asset_history"].insert_many(entries, ordered=False)
+    except BulkWriteError as e:
+        # A baseline entry may already exist (seq is unique per asset); anything else is real.
+        if any(error.get("code") != 11000 for error in e.details.get("writeErrors", [])):
+            raise
+
+
+# ============================================
+# RECORDING
+# ============================================
+
+def changes(inserted=(), updated=()):
+    """History entries for new docs plus (before, after) pairs; pairs carry `revision`."""
+    entries = [_full(doc, doc.get("revision") or 0, CREATE) for doc in inserted]
+    for before, after in updated:
+        if before.get("revision") is None:
+            entries.append(_full(before, 0, CREATE))  # first tracked write to a pre-history asset
+        seq = after["revision"]
+        if seq % SNAPSHOT_EVERY == 0:
+            entries.append(_full(after, seq, SNAPSHOT))
+        else:
+            entry = _delta(before, after, seq)
+            if entry:
+                entries.append(entry)
+    return entries
+
+
+def record(inserted=(), updated=()):
+    _write(changes(inserted, updated))
+
+
+def record_delete(asset):
+    entries = [] if asset.get("revision") is not None else [_full(asset, 0, CREATE)]
+    entries.append({"asset_id": asset["_id"], "seq": (asset.get("revision") or 0) + 1,
+                    "at": datetime.utcnow(), "kind": DELETE, "full": False})
+    _write(entries)
+
+
+# ============================================
+# RECONSTRUCTION
+# ============================================
+
+def _apply(doc, entry):
+    if entry["kind"] in (CREATE, SNAPSHOT):
+        return dict(entry["doc"])
+    if entry["kind"] == DELETE or doc is None:
+        return None
+    doc = dict(doc, **entry.get("set", {}))
+    for field in entry.get("unset", []):
+        doc.pop(field, None)
+    return doc
+
+
+def _replay(base, entries, asset_id):
+    doc = _apply(None, base)
+    for entry in entries:
+        doc = _apply(doc, entry)
+    if doc is not None:
+        doc["_id"] = asset_id
+    return doc
+
+
+def as_of(asset_id, at):
+    """The asset as it was at `at`, or None if it didn't exist (yet, or any more)."""
+    history = db["asset_history"]
+    base = next(history.find({"asset_id": asset_id, "full": True, "at": {"$lte": at}})
+                .sort("at", -1).limit(1), None)
+    if base is None:
+        return None
+    entries = history.find({"asset_id": asset_id, "seq": {"$gt": base["seq"]}, "at": {"$lte": at}}).sort("seq", 1)
+    return _replay(base, entries, asset_id)
+
+
+def inventory_as_of(at, after=None, limit=100):
+    """
+    (assets, next_after): one page of the inventory as it was at `at`, in _id order.
+    Pass next_after back as `after` for the next page; it is None after the last one.
+    """
+    history = db["asset_history"]
+    query = {"kind": CREATE, "at": {"$lte": at}}
+    if after is not None:
+        query["asset_id"] = {"$gt": after}
+    ids = [entry["asset_id"] for entry in history.find(query, {"asset_id": 1}).sort("asset_id", 1).limit(limit)]
+    if not ids:
+        return [], None
+
+    bases = {group["_id"]: group["entry"] for group in history.aggregate([
+        {"$match": {"asset_id": {"$in": ids}, "full": True, "at": {"$lte": at}}},
+        {"$sort": {"asset_id": 1, "at": -1}},
+        {"$group": {"_id": "$asset_id", "entry": {"$first": "$$ROOT"}}},
+    ])}
+    pending = {asset_id: [] for asset_id in bases}
+    if bases:
+        since = [{"asset_id": asset_id, "seq": {"$gt": base["seq"]}} for asset_id, base in bases.items()]
+        for entry in history.find({"$or": since, "at": {"$lte": at}}).sort([("asset_id", 1), ("seq", 1)]):
+            pending[entry["asset_id"]].append(entry)
+
+    assets = [doc for doc in (_replay(bases[asset_id], pending[asset_id], asset_id)
+                              for asset_id in ids if asset_id in bases) if doc is not None]
+    return assets, ids[-1] if len(ids) == limit else None
+
+
+def changes_for(asset_id, before_seq=None, limit=50):
+    """Newest-first history entries for one asset."""
+    query = {"asset_id": asset_id}
+    if before_seq is not None:
+        query["seq"] = {"$lt": before_seq}
+    return list(db["asset_history"].find(query).sort("seq", -1).limit(limit))
+
+
+# ============================================
+# MAINTENANCE
+# ============================================
+
+def baseline(batch_size=1000):
+    """Writes creation entries for assets that have never been written through the hooks."""
+    written = 0
+    batch = []
+    for asset in db["assets"].find({"revision": {"$exists": False}}):
+        batch.append(_full(asset, 0, CREATE))
+        if len(batch) >= batch_size:
+            _write(batch)
+            written += len(batch)
+            batch = []
+    _write(batch)
+    return written + len(batch)
+
+
+def storage_report():
+    """History size by entry kind, against the size of the live inventory."""
+    kinds = {group["_id"]: group for group in db["asset_history"].aggregate([
+        {"$group": {
+            "_id": "$kind",
+            "entries": {"$sum": 1},
+            "bytes": {"$sum": {"$bsonSize": "$$ROOT"}},
+            "fields": {"$sum": {"$size": {"$objectToArray": {"$ifNull": ["$set", {}]}}}},
+        }},
+    ])}
+    inventory = next(db["assets"].aggregate([
+        {"$group": {"_id": None, "assets": {"$sum": 1}, "bytes": {"$sum": {"$bsonSize": "$$ROOT"}}}},
+    ]), {"assets": 0, "bytes": 0})
+
+    history_bytes = sum(group["bytes"] for group in kinds.values())
+    deltas = kinds.get(DELTA, {})
+    return {
+        "snapshot_every": SNAPSHOT_EVERY,
+        "by_kind": {kind: {"entries": group["entries"], "bytes": group["bytes"]} for kind, group in kinds.items()},
+        "history_entries": sum(group["entries"] for group in kinds.values()),
+        "history_bytes": history_bytes,
+        "inventory_assets": inventory["assets"],
+        "inventory_bytes": inventory["bytes"],
+        "history_to_inventory_ratio": round(history_bytes / inventory["bytes"], 2) if inventory["bytes"] else None,
+        "avg_delta_bytes": round(deltas["bytes"] / deltas["entries"]) if deltas else None,
+        "avg_fields_per_delta": round(deltas["fields"] / deltas["entries"], 2) if deltas else None,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Asset history maintenance.")
+    parser.add_argument("command", choices=["baseline", "report"])
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    if args.command == "baseline":
+        print(f"✅ Wrote {baseline():,} baseline entries in {time.perf_counter() - started:.1f}s")
+    else:
+        print(json.dumps(storage_report(), indent=2))
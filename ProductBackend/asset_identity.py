@@ -0,0 +1,419 @@
+# Asset identity resolution: one document per real host, however many sources report it.
+#
+# An incoming record is matched on its identifiers, strongest first: cloud instance ID,
+# MAC address, hostname (or FQDN; never the display name), then normalized IP. The first identifier that hits decides,
+# except that an IP hit is ignored when that asset already has a different identifier
+# of a kind the record also carries (the address has been reassigned). Lookups go to
+# in-memory indexes, loaded once per process and topped up every few seconds from the
+# assets changed since, so resolving a record costs no queries.
+#
+# A matched asset is merged field by field: a value is only replaced by a source of
+# equal or higher SOURCE_PRIORITY, and field_sources remembers who set each field.
+# Writes are compare-and-set on the asset's revision and retried on conflict. The
+# strong identifiers are also stored in identity_keys under a unique index, so two
+# workers can't both create the same host: the loser gets DuplicateKeyError,
+# re-resolves and merges instead. Every successful write is appended to the asset's
+# history (asset_history.py).
+#
+#   python asset_identity.py prune-name-keys     # drop host keys taken from display names
+
+import argparse
+import os
+import re
+import threading
+import time
+from datetime import datetime, timedelta
+
+from bson import ObjectId
+from pymongo import InsertOne, UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+
+import asset_counters
+import asset_history
+import ip_index
+from database import db
+
+# Higher wins; equal priority means the newer report wins.
+SOURCE_PRIORITY = {
+    "manual": 100,
+    "cmdb": 90,
+    "edr": 70,
+    "cloud": 60,
+    "nessus": 50,
+    "nmap": 40,
+}
+DEFAULT_PRIORITY = 10
+# Owner of fields on assets written before sources were tracked.
+LEGACY_SOURCE = "manual"
+
+# Identifier kinds stored in identity_keys, strongest first. IPs are matched too but
+# never owned: addresses get reused.
+STRONG_KINDS = ("iid", "mac", "host")
+
+SYNC_INTERVAL_S = float(os.getenv("ASSET_IDENTITY_SYNC_S", "5"))
+MAX_ATTEMPTS = 5
+
+# Bookkeeping fields a record can't set directly.
+_RESERVED = frozenset({"_id", "field_sources", "identity_keys", "revision", "sources", "source",
+                       "last_seen_by", "ip_norm", "ip_version", "created_at", "updated_at"})
+_PROJECTION = {"identity_keys": 1, "hostname": 1, "fqdn": 1, "mac": 1, "instance_id": 1, "ip_norm": 1}
+
+
+# ============================================
+# IDENTIFIERS
+# ============================================
+
+def _hostname(record):
+    # Only explicit host names: `name` is a free-text label ("Web Server") that many assets share.
+    value = record.get("hostname") or record.get("fqdn")
+    if not value:
+        return None
+    value = str(value).strip().rstrip(".").lower()
+    if not value or ip_index.normalize(value)[0] is not None:
+        return None  # an address used as a name identifies nothing new
+    return value
+
+
+def _mac(value):
+    digits = re.sub(r"[^0-9a-f]", "", str(value or "").lower())
+    if len(digits) != 12 or digits in ("000000000000", "ffffffffffff"):
+        return None
+    return digits
+
+
+def strong_keys(record):
+    """{kind: "kind:value"} for the strong identifiers a record carries."""
+    keys = {}
+    if record.get("instance_id"):
+        keys["iid"] = f"iid:{str(record['instance_id']).strip()}"
+    mac = _mac(record.get("mac"))
+    if mac:
+        keys["mac"] = f"mac:{mac}"
+    host = _hostname(record)
+    if host:
+        keys["host"] = f"host:{host}"
+    return keys
+
+
+def _kind(key):
+    return key.split(":", 1)[0]
+
+
+# ============================================
+# IN-MEMORY INDEX
+# ============================================
+
+class IdentityIndex:
+    """Identifier -> asset _id maps for this process."""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._by_key = {}   # "kind:value" -> _id
+        self._by_ip = {}    # ip_norm bytes -> _id
+        self._keys_of = {}  # _id -> set of keys
+        self._ip_of = {}    # _id -> ip_norm bytes
+        self._synced_at = None
+        self._checked = 0.0
+
+    def _sync(self):
+        # Full load on first use, then only assets written since (by any worker).
+        if self._synced_at is not None and time.monotonic() - self._checked < SYNC_INTERVAL_S:
+            return
+        started = datetime.utcnow()
+        query = {} if self._synced_at is None else {"updated_at": {"$gte": self._synced_at}}
+        for doc in db["assets"].find(query, _PROJECTION):
+            self.add(doc)
+        self._synced_at = started - timedelta(seconds=2)  # tolerate clock skew between writers
+        self._checked = time.monotonic()
+
+    def add(self, doc):
+        with self._lock:
+            asset_id = doc["_id"]
+            stored = doc.get("identity_keys")
+            keys = set(stored) if stored else set(strong_keys(doc).values())
+            for key in self._keys_of.get(asset_id, set()) - keys:
+                if self._by_key.get(key) == asset_id:
+                    del self._by_key[key]
+            for key in keys:
+                if stored:
+                    self._by_key[key] = asset_id  # enforced unique in MongoDB
+                else:
+                    self._by_key.setdefault(key, asset_id)  # legacy duplicates: first one wins
+            self._keys_of[asset_id] = keys
+
+            ip = bytes(doc["ip_norm"]) if doc.get("ip_norm") is not None else None
+            old_ip = self._ip_of.pop(asset_id, None)
+            if old_ip is not None and old_ip != ip and self._by_ip.get(old_ip) == asset_id:
+                del self._by_ip[old_ip]
+            if ip is not None:
+                self._by_ip[ip] = asset_id
+                self._ip_of[asset_id] = ip
+
+    def forget(self, asset_id):
+        with self._lock:
+            for key in self._keys_of.pop(asset_id, set()):
+                if self._by_key.get(key) == asset_id:
+                    del self._by_key[key]
+            ip = self._ip_of.pop(asset_id, None)
+            if ip is not None and self._by_ip.get(ip) == asset_id:
+                del self._by_ip[ip]
+
+    def owner(self, key):
+        with self._lock:
+            return self._by_key.get(key)
+
+    def learn(self, keys):
+        """Reads the current owners of `keys` from MongoDB, e.g. after a DuplicateKeyError."""
+        for doc in db["assets"].find({"identity_keys": {"$in": list(keys)}}, _PROJECTION):
+            self.add(doc)
+
+    def match(self, keys, ip_norm):
+        """The _id of the asset the identifiers belong to, or None."""
+        with self._lock:
+            self._sync()
+            for kind in STRONG_KINDS:
+                key = keys.get(kind)
+                if key in self._by_key:
+                    return self._by_key[key]
+            if ip_norm is None:
+                return None
+            asset_id = self._by_ip.get(bytes(ip_norm))
+            if asset_id is None:
+                return None
+            theirs = {_kind(key) for key in self._keys_of.get(asset_id, ())}
+            if theirs & set(keys):
+                return None  # same address, different host
+            return asset_id
+
+    def stats(self):
+        with self._lock:
+            return {"keys": len(self._by_key), "ips": len(self._by_ip), "assets": len(self._keys_of)}
+
+
+identity_index = IdentityIndex()
+
+
+# ============================================
+# MERGING
+# ============================================
+
+def _priority(source):
+    return SOURCE_PRIORITY.get(source, DEFAULT_PRIORITY)
+
+
+def merge(current, record, source):
+    """The $set that applies `record` from `source` over `current`, honouring source priority."""
+    sources = dict(current.get("field_sources") or {})
+    legacy = current.get("source") or LEGACY_SOURCE
+    updates = {}
+    for field, value in record.items():
+        if value is None or field in _RESERVED:
+            continue
+        owner = sources.get(field, legacy if current.get(field) is not None else None)
+        if owner is None or _priority(source) >= _priority(owner):
+            if current.get(field) != value:
+                updates[field] = value
+            sources[field] = source
+    if "ip" in updates:
+        updates.update(ip_index.ip_fields(updates["ip"]))
+    updates["field_sources"] = sources
+    return updates
+
+
+def _owned_keys(asset_id, candidates):
+    # Keys another asset already holds stay with it; ours are kept.
+    return {key for key in candidates if identity_index.owner(key) in (None, asset_id)}
+
+
+def _update_op(current, record, keys, source, now):
+    """(filter, update, doc after the update) for merging `record` into `current`."""
+    updates = merge(current, record, source)
+    after = dict(current, **updates)
+    held = set(current.get("identity_keys") or strong_keys(current).values())
+    candidates = held | set(keys.values()) | set(strong_keys(after).values())
+    owned = sorted(_owned_keys(current["_id"], candidates))
+    updates["updated_at"] = now
+    update = {"$set": updates, "$inc": {"revision": 1}, "$addToSet": {"sources": source}}
+    if owned:
+        updates["identity_keys"] = owned
+    elif "identity_keys" in current:
+        update["$unset"] = {"identity_keys": ""}  # an empty array would collide in the unique index
+    after.update(updates, identity_keys=owned, revision=(current.get("revision") or 0) + 1,
+                 sources=sorted(set(current.get("sources") or []) | {source}))
+    updates[f"last_seen_by.{source}"] = now
+    return {"_id": current["_id"], "revision": current.get("revision")}, update, after
+
+
+def _new_doc(record, keys, source, defaults, now):
+    doc = dict(defaults or {})
+    doc.update({field: value for field, value in record.items() if value is not None and field not in _RESERVED})
+    doc.update(ip_index.ip_fields(doc.get("ip")))
+    doc.update({
+        "_id": ObjectId(),
+        "field_sources": {field: source for field, value in record.items()
+                          if value is not None and field not in _RESERVED},
+        "sources": [source],
+        "last_seen_by": {source: now},
+        "revision": 1,
+        "created_at": doc.get("created_at") or now,
+        "updated_at": now,
+    })
+    owned = sorted(_owned_keys(doc["_id"], keys.values()))
+    if owned:
+        doc["identity_keys"] = owned
+    return doc
+
+
+# ============================================
+# UPSERTS
+# ============================================
+
+def _upsert_one(record, keys, source, defaults):
+    for _ in range(MAX_ATTEMPTS):
+        now = datetime.utcnow()
+        ip_norm, _ = ip_index.normalize(record.get("ip"))
+        asset_id = identity_index.match(keys, ip_norm)
+        if asset_id is None:
+            doc = _new_doc(record, keys, source, defaults, now)
+            try:
+                db["assets"].insert_one(doc)
+            except DuplicateKeyError:
+                identity_index.learn(keys.values())  # another writer created this host first
+                continue
+            identity_index.add(doc)
+            asset_counters.on_insert(doc)
+            asset_history.record(inserted=[doc])
+            return doc["_id"], True
+
+        current = db["assets"].find_one({"_id": asset_id})
+        if current is None:
+            identity_index.forget(asset_id)  # deleted elsewhere
+            continue
+        op_filter, update, after = _update_op(current, record, keys, source, now)
+        try:
+            result = db["assets"].update_one(op_filter, update)
+        except DuplicateKeyError:
+            identity_index.learn(keys.values())
+            continue
+        if result.matched_count:
+            identity_index.add(after)
+            asset_counters.on_update(current, after)
+            asset_history.record(updated=[(current, after)])
+            return asset_id, False
+        # Lost a race on the revision: reload and merge again.
+        fresh = db["assets"].find_one({"_id": asset_id}, _PROJECTION)
+        if fresh is not None:
+            identity_index.add(fresh)
+    raise RuntimeError(f"Asset upsert did not settle after {MAX_ATTEMPTS} attempts")
+
+
+def upsert(record, source, defaults=None):
+    """
+    Resolves `record` to an existing asset and merges it in, or creates a new one
+    (with `defaults` underneath). Returns (asset_id, created).
+    """
+    return upsert_many([record], source, [defaults])[0]
+
+
+def upsert_many(records, source, defaults=None):
+    """
+    upsert() for a batch: one read for the matched assets and one unordered bulk write.
+    Records that conflict (same new host twice, a concurrent writer) fall back to upsert
+    one at a time. Returns [(asset_id, created)] aligned with `records`.
+    """
+    defaults = defaults or [None] * len(records)
+    now = datetime.utcnow()
+    keys = [strong_keys(record) for record in records]
+    matches = [identity_index.match(k, ip_index.normalize(record.get("ip"))[0]) for record, k in zip(records, keys)]
+    currents = {doc["_id"]: doc for doc in db["assets"].find({"_id": {"$in": [m for m in matches if m]}})}
+
+    ops, planned, results, retry = [], [], [None] * len(records), []
+    claimed = set()
+    for i, (record, asset_id) in enumerate(zip(records, matches)):
+        if asset_id is not None and asset_id in currents and asset_id not in claimed:
+            op_filter, update, after = _update_op(currents[asset_id], record, keys[i], source, now)
+            ops.append(UpdateOne(op_filter, update))
+            planned.append((i, currents[asset_id], after))
+            claimed.add(asset_id)
+        elif asset_id is None and not claimed.intersection(keys[i].values()):
+            doc = _new_doc(record, keys[i], source, defaults[i], now)
+            ops.append(InsertOne(doc))
+            planned.append((i, None, doc))
+            claimed.update(keys[i].values())
+        else:
+            retry.append(i)  # a second record for the same asset, or one deleted under us
+
+    failed = set()
+    if ops:
+        try:
+            matched = db["assets"].bulk_write(ops, ordered=False).matched_count
+        except BulkWriteError as e:
+            matched = e.details.get("nMatched", 0)
+            failed = {error["index"] for error in e.details.get("writeErrors", [])}
+            identity_index.learn(key for n in failed for key in keys[planned[n][0]].values())
+        updating = [n for n, (_, before, _) in enumerate(planned) if before is not None and n not in failed]
+        if matched < len(updating):
+            # A concurrent writer moved some revisions on. Ours carry updated_at == now.
+            ids = [planned[n][2]["_id"] for n in updating]
+            written = {doc["_id"] for doc in db["assets"].find({"_id": {"$in": ids}, "updated_at": now}, {"_id": 1})}
+            failed |= {n for n in updating if planned[n][2]["_id"] not in written}
+
+    inserted, updated = [], []
+    for n, (i, before, after) in enumerate(planned):
+        if n in failed:
+            retry.append(i)
+            continue
+        identity_index.add(after)
+        results[i] = (after["_id"], before is None)
+        if before is None:
+            inserted.append(after)
+        else:
+            updated.append((before, after))
+    asset_counters.on_changes(inserted, updated)
+    asset_history.record(inserted, updated)
+
+    for i in sorted(retry):
+        results[i] = _upsert_one(records[i], keys[i], source, defaults[i])
+    return results
+
+
+# ============================================
+# MAINTENANCE
+# ============================================
+
+def prune_name_keys(batch_size=1000):
+    """
+    Drops stored host keys the asset's own hostname/FQDN doesn't produce: keys from
+    before display names stopped counting as host names. Returns how many assets changed.
+    """
+    ops, changed = [], 0
+    now = datetime.utcnow()
+    for doc in db["assets"].find({"identity_keys": {"$regex": "^host:"}}, _PROJECTION):
+        hosts = {key for kind, key in strong_keys(doc).items() if kind == "host"}
+        keys = [key for key in doc["identity_keys"] if _kind(key) != "host" or key in hosts]
+        if keys == doc["identity_keys"]:
+            continue
+        # updated_at moves so other workers' identity indexes drop the keys on their next sync.
+        update = {"$set": {"updated_at": now}, "$inc": {"revision": 1}}
+        if keys:
+            update["$set"]["identity_keys"] = keys
+        else:
+            update["$unset"] = {"identity_keys": ""}
+        ops.append(UpdateOne({"_id": doc["_id"]}, update))
+        identity_index.add(dict(doc, identity_keys=keys))
+        if len(ops) >= batch_size:
+            changed += db["assets"].bulk_write(ops, ordered=False).modified_count
+            ops = []
+    if ops:
+        changed += db["assets"].bulk_write(ops, ordered=False).modified_count
+    return changed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Asset identity maintenance.")
+    parser.add_argument("command", choices=["prune-name-keys"])
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    print(f"✅ Pruned display-name host keys from {prune_name_keys():,} assets "
+          f"in {time.perf_counter() - started:.1f}s")
@@ -0,0 +1,138 @@
+import asyncio
+import logging
+import os
+import threading
+import time
+
+from fastapi.concurrency import run_in_threadpool
+from pymongo.errors import ConnectionFailure
+
+import counters
+
+logger = logging.getLogger("crv360")
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(ConnectionFailure):
+    """Raised instead of touching MongoDB while the breaker is open."""
+
+
+def _chain(exc):
+    seen = 0
+    while exc is not None and seen < 10:
+        yield exc
+        exc = exc.__cause__ or exc.__context__
+        seen += 1
+
+
+def is_outage_error(exc):
+    """True if `exc` (or what it wraps) means MongoDB is unreachable, not that a query was bad."""
+    return any(isinstance(e, ConnectionFailure) for e in _chain(exc))
+
+
+def is_rejection(exc):
+    """True if the breaker itself refused the call, so it is not a new failure."""
+    return any(isinstance(e, CircuitOpenError) for e in _chain(exc))
+
+
+class CircuitBreaker:
+    """
+    Opens after `failure_threshold` consecutive outage errors. While open, data-layer
+    calls fail immediately with CircuitOpenError instead of each waiting out server
+    selection. Only the background probe talks to MongoDB until it answers again; the
+    wait between probes doubles up to `max_reset_timeout`.
+    """
+
+    def __init__(self, failure_threshold=3, reset_timeout=5.0, max_reset_timeout=60.0):
+        self.failure_threshold = failure_threshold
+        self.base_reset_timeout = reset_timeout
+        self.max_reset_timeout = max_reset_timeout
+        self.reset_timeout = reset_timeout
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = None
+        self._lock = threading.Lock()
+
+    def is_open(self):
+        return self.state != CLOSED
+
+    def check(self):
+        if self.state != CLOSED:
+            raise CircuitOpenError("MongoDB circuit breaker is open")
+
+    def record_success(self):
+        if self.failures or self.state != CLOSED:
+            with self._lock:
+                self.failures = 0
+                if self.state != CLOSED:
+                    self._close()
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == CLOSED and self.failures >= self.failure_threshold:
+                self.state = OPEN
+                self.opened_at = time.monotonic()
+                counters.incr("breaker_opened")
+                logger.warning("MongoDB circuit breaker opened after %d failures", self.failures)
+
+    def _close(self):
+        self.state = CLOSED
+        self.opened_at = None
+        self.reset_timeout = self.base_reset_timeout
+        logger.info("MongoDB circuit breaker closed")
+
+    def probe_due(self):
+        """Moves OPEN -> HALF_OPEN once the reset timeout has passed; True if the caller should probe."""
+        with self._lock:
+            if self.state == OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = HALF_OPEN
+                return True
+            return False
+
+    def probe_failed(self):
+        with self._lock:
+            self.state = OPEN
+            self.opened_at = time.monotonic()
+            self.reset_timeout = min(self.reset_timeout * 2, self.max_reset_timeout)
+
+    def stats(self):
+        return {"state": self.state, "consecutive_failures": self.failures,
+                "open_for_s": round(time.monotonic() - self.opened_at, 1) if self.opened_at else 0,
+                "next_probe_s": self.reset_timeout}
+
+
+mongo_breaker = CircuitBreaker(
+    failure_threshold=int(os.getenv("BREAKER_FAILURES", "3")),
+    reset_timeout=float(os.getenv("BREAKER_RESET_S", "5")),
+)
+
+
+async def monitor(app, interval=1.0, breaker=None):
+    """
+    Lifespan background task: probes MongoDB while the breaker is open and, once it
+    answers, closes the breaker and re-renders the cached dashboard payloads.
+    """
+    import cache
+    import database
+
+    breaker = breaker or mongo_breaker
+    while True:
+        await asyncio.sleep(interval)
+        if not breaker.probe_due():
+            continue
+        try:
+            await run_in_threadpool(database.ping, 2)
+        except Exception as e:
+            logger.warning("MongoDB still unavailable: %s", e)
+            breaker.probe_failed()
+            continue
+        breaker.record_success()
+        counters.incr("breaker_recovered")
+        try:
+            await cache.refresh(app)
+        except Exception as e:
+            logger.warning("Cache refresh after recovery failed: %s", e)
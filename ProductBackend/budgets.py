@@ -0,0 +1,239 @@
+import asyncio
+import contextvars
+import os
+import time
+import uuid
+
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse
+from pymongo.errors import ExecutionTimeout
+from starlette.routing import Match
+
+import counters
+from breaker import mongo_breaker
+
+# ============================================
+# BUDGET TABLES
+# ============================================
+
+# Route prefix -> milliseconds the whole request may spend in MongoDB. Longest prefix wins.
+ROUTE_BUDGETS_MS = {
+    "/api/events/alerts": 1500,
+    "/api/events/campaigns": 2000,
+    "/api/executive-report/export-pdf": 10000,
+    "/api/compliance/evidence/generate-gap-report": 10000,
+    "/api/assets/history/storage": 10000,
+    "/api/assets/risk/recompute": 30000,
+}
+DEFAULT_ROUTE_BUDGET_MS = int(os.getenv("QUERY_BUDGET_MS", "3000"))
+
+# Collection -> cap for any single query against it, whatever the route allows.
+COLLECTION_BUDGETS_MS = {
+    "security_alerts": 1500,
+    "vulnerabilities": 2000,
+    "assets": 2000,
+}
+
+RETRY_AFTER_S = int(os.getenv("QUERY_BUDGET_RETRY_AFTER", "2"))
+
+_ROUTES_BY_LENGTH = sorted(ROUTE_BUDGETS_MS, key=len, reverse=True)
+
+# Set per request by QueryBudgetMiddleware; copied into threadpool handlers with the context.
+_deadline = contextvars.ContextVar("query_deadline", default=None)
+_comment = contextvars.ContextVar("query_comment", default=None)
+
+
+def route_budget_ms(path):
+    for prefix in _ROUTES_BY_LENGTH:
+        if path.startswith(prefix):
+            return ROUTE_BUDGETS_MS[prefix]
+    return DEFAULT_ROUTE_BUDGET_MS
+
+
+def route_template(scope):
+    """
+    The path template of the route `scope` matches ("/api/assets/{asset_id}/as-of"), so
+    counters get one label per route rather than one per asset or finding id.
+    """
+    for route in getattr(scope.get("app"), "routes", ()):
+        if route.matches(scope)[0] == Match.FULL:
+            return route.path
+    return "unmatched"
+
+
+def query_budget(collection_name):
+    """(maxTimeMS, comment) for a query issued now, or (None, None) outside a request."""
+    deadline = _deadline.get()
+    if deadline is None:
+        return None, None
+    remaining = (deadline - time.monotonic()) * 1000
+    cap = COLLECTION_BUDGETS_MS.get(collection_name)
+    ms = int(min(remaining, cap) if cap else remaining)
+    if ms < 1:
+        raise ExecutionTimeout("query time budget exhausted before the query started", 50)
+    return ms, _comment.get()
+
+
+# ============================================
+# COLLECTION WRAPPER
+# ============================================
+
+class BudgetedCollection:
+    """
+    Collection proxy that stamps every read with maxTimeMS from the current request's
+    budget and tags it with the request comment, so it can be found and killed.
+    Reads and writes fail fast while the MongoDB circuit breaker is open.
+    Everything else is delegated to the wrapped pymongo Collection.
+    """
+
+    __slots__ = ("_collection",)
+
+    _GUARDED = frozenset({
+        "insert_one", "insert_many", "update_one", "update_many", "replace_one", "delete_one",
+        "delete_many", "find_one_and_update", "find_one_and_replace", "find_one_and_delete", "bulk_write",
+    })
+
+    def __init__(self, collection):
+        self._collection = collection
+
+    def __getattr__(self, name):
+        if name in self._GUARDED:
+            mongo_breaker.check()
+        return getattr(self._collection, name)
+
+    def __getitem__(self, name):
+        return BudgetedCollection(self._collection[name])
+
+    def _stamp(self, kwargs, max_time_key):
+        mongo_breaker.check()
+        ms, comment = query_budget(self._collection.name)
+        if ms is not None:
+            kwargs.setdefault(max_time_key, ms)
+            kwargs.setdefault("comment", comment)
+        return kwargs
+
+    @staticmethod
+    def _ok(result):
+        mongo_breaker.record_success()
+        return result
+
+    def find(self, *args, **kwargs):
+        return self._collection.find(*args, **self._stamp(kwargs, "max_time_ms"))
+
+    def find_one(self, filter=None, *args, **kwargs):
+        return self._ok(self._collection.find_one(filter, *args, **self._stamp(kwargs, "max_time_ms")))
+
+    def aggregate(self, pipeline, *args, **kwargs):
+        return self._ok(self._collection.aggregate(pipeline, *args, **self._stamp(kwargs, "maxTimeMS")))
+
+    def count_documents(self, filter, *args, **kwargs):
+        return self._ok(self._collection.count_documents(filter, *args, **self._stamp(kwargs, "maxTimeMS")))
+
+    def distinct(self, key, filter=None, *args, **kwargs):
+        return self._ok(self._collection.distinct(key, filter, *args, **self._stamp(kwargs, "maxTimeMS")))
+
+
+# ============================================
+# CANCELLATION
+# ============================================
+
+def kill_operations(comment):
+    """killOp every in-flight operation (including getMores) tagged with `comment`."""
+    import database
+
+    admin = database.get_client().admin
+    ops = admin.aggregate([
+        {"$currentOp": {"allUsers": True, "localOps": True}},
+        {"$match": {"$or": [{"command.comment": comment}, {"cursor.originatingCommand.comment": comment}]}},
+    ])
+    killed = 0
+    for op in ops:
+        admin.command("killOp", op=op["opid"])
+        killed += 1
+    return killed
+
+
+# ============================================
+# ASGI MIDDLEWARE
+# ============================================
+
+class QueryBudgetMiddleware:
+    """
+    Starts the route's time budget when the request arrives and kills its queries if the
+    client disconnects first. Handlers must be plain `def` (threadpool) for the
+    disconnect to be noticed while a query is running.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        path = scope["path"]
+        comment = f"{path} #{uuid.uuid4().hex[:12]}"
+        deadline_token = _deadline.set(time.monotonic() + route_budget_ms(path) / 1000)
+        comment_token = _comment.set(comment)
+
+        # Read the client side ourselves so a disconnect is seen while the handler is busy.
+        # One message at a time: the pump waits for the handler to take each body chunk
+        # (keeping the server's backpressure on uploads), and flags a disconnect before
+        # queueing it, so it's seen even by a handler that never reads.
+        messages = asyncio.Queue(maxsize=1)
+        disconnected = asyncio.Event()
+        finished = False
+
+        async def pump():
+            while True:
+                message = await receive()
+                if message["type"] == "http.disconnect":
+                    disconnected.set()
+                await messages.put(message)
+                if disconnected.is_set():
+                    return
+
+        async def cancel_on_disconnect():
+            await disconnected.wait()
+            if not finished:
+                route = route_template(scope)
+                counters.incr("client_disconnect", route)
+                try:
+                    killed = await run_in_threadpool(kill_operations, comment)
+                    counters.incr("queries_killed", route, killed)
+                except Exception:
+                    counters.incr("kill_failed", route)
+
+        tasks = [asyncio.create_task(pump()), asyncio.create_task(cancel_on_disconnect())]
+        try:
+            await self.app(scope, messages.get, send)
+        finally:
+            finished = True
+            for task in tasks:
+                task.cancel()
+            _deadline.reset(deadline_token)
+            _comment.reset(comment_token)
+
+
+# ============================================
+# ERROR MAPPING
+# ============================================
+
+def is_budget_error(exc):
+    """True for maxTimeMS expiries, including ones re-raised as HTTPException(500)."""
+    while exc is not None:
+        if isinstance(exc, ExecutionTimeout):
+            return True
+        exc = exc.__cause__ or exc.__context__
+    return False
+
+
+def budget_exceeded_response(request):
+    path = request.url.path
+    counters.incr("budget_exceeded", route_template(request.scope))
+    return JSONResponse(
+        status_code=503,
+        headers={"Retry-After": str(RETRY_AFTER_S)},
+        content={"detail": "Query time budget exceeded, retry shortly",
+                 "budget_ms": route_budget_ms(path)},
+    )
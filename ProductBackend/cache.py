@@ -0,0 +1,283 @@
+import asyncio
+import os
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import parse_qsl, urlencode
+
+from fastapi.concurrency import run_in_threadpool
+
+from breaker import mongo_breaker
+
+# Hot dashboard reads: route -> seconds a rendered response may be reused.
+# These are the pages every analyst opens first, backed by small summary collections.
+CACHED_ROUTES = {
+    "/api/metrics/key": 30,
+    "/api/metrics/operational": 30,
+    "/api/metrics/trends/5days": 60,
+    "/api/metrics/module-health": 30,
+    "/api/metrics/alerts/today": 30,
+    "/api/calendar/upcoming": 60,
+    "/api/risks/top": 60,
+    "/api/vulnerabilities/summary": 15,
+    "/api/vulnerabilities/severity-distribution": 15,
+    "/api/network/summary": 15,
+    "/api/assets/distribution": 15,
+    "/api/settings/": 300,
+    "/api/compliance/frameworks": 60,
+    "/api/compliance/violations": 30,
+    "/api/compliance/executive-kpis": 60,
+}
+
+# A successful write under the key prefix also evicts these cached prefixes.
+INVALIDATES = {
+    "/api/assets": ["/api/network", "/api/vulnerabilities"],
+    "/api/settings": [],
+}
+
+
+class TTLCache:
+    """Thread-safe LRU with per-entry expiry. Values are stored as given (usually bytes)."""
+
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        """Returns (value, stored_at) or None."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < now:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1], entry[2]
+
+    def set(self, key, value, ttl):
+        now = time.monotonic()
+        with self._lock:
+            self._entries[key] = (now + ttl, value, time.time())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, prefix=""):
+        with self._lock:
+            stale = [key for key in self._entries if key.startswith(prefix)]
+            for key in stale:
+                del self._entries[key]
+        return len(stale)
+
+    def stats(self):
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses,
+                    "backend": "memory"}
+
+
+# Last 200 seen for each cached route, kept well past its TTL and not evicted by writes:
+# what we serve (marked stale) when MongoDB is unreachable.
+STALE_TTL = 24 * 3600
+
+# ============================================
+# BACKENDS
+# ============================================
+# memory: per process (default, `uvicorn main:app`)
+# shm:    shared by the workers of one serve.py parent (shm_cache.py)
+# redis:  shared by every node, with pub/sub invalidation (redis_cache.py)
+
+response_cache = None
+last_known_good = None
+
+
+def configure(backend=None, **options):
+    """
+    Selects the cache backend (default: $CACHE_BACKEND or "memory"). Call before the
+    app serves traffic; for "shm", in the parent before forking.
+    """
+    global response_cache, last_known_good
+    backend = backend or os.getenv("CACHE_BACKEND", "memory")
+    if backend == "memory":
+        response_cache, last_known_good = TTLCache(), TTLCache()
+    elif backend == "shm":
+        from shm_cache import SharedMemoryCache
+
+        slots = options.get("slots", 2048)
+        slot_bytes = options.get("slot_bytes", 32 * 1024)
+        response_cache = SharedMemoryCache(slots, slot_bytes)
+        last_known_good = SharedMemoryCache(max(64, slots // 4), slot_bytes)
+    elif backend == "redis":
+        from redis_cache import RedisCache
+
+        # The stale copy stays local: it must still answer when the network is the problem.
+        response_cache = RedisCache(options.get("url") or os.getenv("REDIS_URL", "redis://localhost:6379/0"))
+        last_known_good = TTLCache()
+    else:
+        raise ValueError(f"Unknown cache backend: {backend}")
+    return response_cache
+
+
+configure()
+
+
+def cache_key(path, query_string=b""):
+    """Route plus sorted query parameters, so ?a=1&b=2 and ?b=2&a=1 share an entry."""
+    params = sorted(parse_qsl(query_string.decode("latin-1"), keep_blank_values=True))
+    return f"{path}?{urlencode(params)}" if params else path
+
+
+def invalidate_for(path):
+    """Evicts everything a write to `path` may have changed: its module plus declared dependents."""
+    parts = path.split("/")
+    module = "/".join(parts[:3])  # "/api/assets/123" -> "/api/assets"
+    evicted = response_cache.invalidate(module)
+    for prefix in INVALIDATES.get(module, []):
+        evicted += response_cache.invalidate(prefix)
+    return evicted
+
+
+async def _offload(cache, fn, *args):
+    # Backends that talk to the network (redis) block on sockets: keep them off the event loop.
+    if getattr(cache, "blocking", False):
+        return await run_in_threadpool(fn, *args)
+    return fn(*args)
+
+
+# ============================================
+# ASGI MIDDLEWARE
+# ============================================
+
+class ResponseCacheMiddleware:
+    """Serves CACHED_ROUTES from memory and evicts them when the same module is written to."""
+
+    def __init__(self, app, routes=None, cache=None):
+        self.app = app
+        self.routes = CACHED_ROUTES if routes is None else routes
+        self._cache = cache
+
+    @property
+    def cache(self):
+        # Resolved per request so a backend chosen later by configure() is picked up.
+        return self._cache or response_cache
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        path = scope["path"]
+        if scope["method"] != "GET":
+            status = {}
+
+            async def send_and_invalidate(message):
+                if message["type"] == "http.response.start":
+                    status["code"] = message["status"]
+                elif message["type"] == "http.response.body" and not message.get("more_body"):
+                    if status.get("code", 500) < 400:
+                        await _offload(response_cache, invalidate_for, path)
+                await send(message)
+
+            return await self.app(scope, receive, send_and_invalidate)
+
+        ttl = self.routes.get(path)
+        if ttl is None:
+            return await self.app(scope, receive, send)
+
+        key = cache_key(path, scope.get("query_string", b""))
+        hit = await _offload(self.cache, self.cache.get, key)
+        if hit is not None:
+            (status, headers, body), _ = hit
+            return await self._send_cached(send, status, headers, body, b"HIT")
+
+        stale = last_known_good.get(key)
+        if stale is not None and mongo_breaker.is_open():
+            return await self._send_stale(send, stale)
+
+        captured = {"headers": [], "chunks": [], "replaced": False}
+
+        async def send_and_capture(message):
+            if message["type"] == "http.response.start":
+                captured["status"] = message["status"]
+                if message["status"] >= 500 and stale is not None:
+                    # MongoDB failed mid-request: answer with the last good payload instead.
+                    captured["replaced"] = True
+                    return
+                captured["headers"] = [(k, v) for k, v in message.get("headers", []) if k.lower() != b"x-cache"]
+                message = dict(message, headers=list(message.get("headers", [])) + [(b"x-cache", b"MISS")])
+            elif message["type"] == "http.response.body":
+                if captured["replaced"]:
+                    if not message.get("more_body"):
+                        await self._send_stale(send, stale)
+                    return
+                captured["chunks"].append(message.get("body", b""))
+                if not message.get("more_body") and captured.get("status") == 200:
+                    response = (200, captured["headers"], b"".join(captured["chunks"]))
+                    await _offload(self.cache, self.cache.set, key, response, ttl)
+                    last_known_good.set(key, response, STALE_TTL)
+            await send(message)
+
+        await self.app(scope, receive, send_and_capture)
+
+    @staticmethod
+    async def _send_cached(send, status, headers, body, state, extra=()):
+        await send({"type": "http.response.start", "status": status,
+                    "headers": headers + [(b"x-cache", state), *extra]})
+        await send({"type": "http.response.body", "body": body})
+
+    async def _send_stale(self, send, stale):
+        (status, headers, body), stored_at = stale
+        age = str(max(0, int(time.time() - stored_at))).encode()
+        await self._send_cached(send, status, headers, body, b"STALE",
+                                [(b"age", age), (b"warning", b'110 - "Response is Stale"')])
+
+
+async def asgi_get(app, path, query_string=b""):
+    """Runs a GET through the full ASGI stack in-process; returns (status, body)."""
+    result = {"status": None, "body": []}
+    requested = False
+    done = asyncio.Event()
+
+    async def receive():
+        # Like a real server: one empty request body, then nothing until the response is done.
+        nonlocal requested
+        if not requested:
+            requested = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await done.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            result["status"] = message["status"]
+        elif message["type"] == "http.response.body":
+            result["body"].append(message.get("body", b""))
+
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": path, "raw_path": path.encode(), "root_path": "",
+        "query_string": query_string, "headers": [(b"host", b"localhost"), (b"x-warmup", b"1")],
+        "client": ("127.0.0.1", 0), "server": ("127.0.0.1", 0),
+    }
+    try:
+        await app(scope, receive, send)
+    finally:
+        done.set()
+    return result["status"], b"".join(result["body"])
+
+
+async def refresh(app):
+    """Drops fresh entries and re-renders every cached route, e.g. after MongoDB comes back."""
+    await _offload(response_cache, response_cache.invalidate)
+    return await prime(app)
+
+
+async def prime(app, paths=None):
+    """Fills the response cache before the worker reports ready; returns {path: status}."""
+    statuses = {}
+    for path in paths or CACHED_ROUTES:
+        status, _ = await asgi_get(app, path)
+        statuses[path] = status
+    return statuses
@@ -0,0 +1,94 @@
+import asyncio
+
+import counters
+from cache import cache_key
+
+# Opt-in: GET routes whose response depends only on path + query, read by everyone at once.
+SINGLE_FLIGHT_ROUTES = {
+    "/api/metrics/key",
+    "/api/metrics/operational",
+    "/api/metrics/trends/5days",
+    "/api/metrics/module-health",
+    "/api/metrics/alerts/today",
+    "/api/calendar/upcoming",
+    "/api/risks/top",
+    "/api/vulnerabilities/summary",
+    "/api/vulnerabilities/severity-distribution",
+    "/api/vulnerabilities/active-threats",
+    "/api/network/summary",
+    "/api/assets/distribution",
+    "/api/assets/top-risk",
+}
+
+
+async def _capture(app, scope):
+    """Runs the request through `app` detached from the client; returns (status, headers, body)."""
+    requested = False
+    done = asyncio.Event()
+    result = {"status": 500, "headers": [], "body": []}
+
+    async def receive():
+        # GET has no body; after that, never report a disconnect: other requests share this run.
+        nonlocal requested
+        if not requested:
+            requested = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await done.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            result["status"] = message["status"]
+            result["headers"] = list(message.get("headers", []))
+        elif message["type"] == "http.response.body":
+            result["body"].append(message.get("body", b""))
+
+    try:
+        await app(scope, receive, send)
+    finally:
+        done.set()
+    return result["status"], result["headers"], b"".join(result["body"])
+
+
+class SingleFlightMiddleware:
+    """
+    Concurrent identical GETs (same route, same normalized query) share one execution:
+    the first becomes the leader, the rest wait for its encoded response.
+    Nothing is kept once the leader finishes; that is the response cache's job.
+    """
+
+    def __init__(self, app, routes=None):
+        self.app = app
+        self.routes = SINGLE_FLIGHT_ROUTES if routes is None else routes
+        self._inflight = {}
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "GET" or scope["path"] not in self.routes:
+            return await self.app(scope, receive, send)
+
+        path = scope["path"]
+        key = cache_key(path, scope.get("query_string", b""))
+        future = self._inflight.get(key)
+        if future is not None:
+            counters.incr("singleflight_shared", path)
+            # shield: one follower going away must not cancel the leader's result for the others
+            status, headers, body = await asyncio.shield(future)
+            headers = headers + [(b"x-singleflight", b"shared")]
+        else:
+            counters.incr("singleflight_leader", path)
+            future = self._inflight[key] = asyncio.get_running_loop().create_future()
+            try:
+                status, headers, body = await _capture(self.app, scope)
+                future.set_result((status, headers, body))
+            except asyncio.CancelledError:
+                future.cancel()
+                raise
+            except Exception as e:
+                future.set_exception(e)
+                future.exception()  # retrieved: followers re-raise it, no "never retrieved" warning
+                raise
+            finally:
+                del self._inflight[key]
+
+        await send({"type": "http.response.start", "status": status, "headers": headers})
+        await send({"type": "http.response.body", "body": body})
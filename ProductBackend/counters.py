@@ -0,0 +1,32 @@
+import threading
+from collections import defaultdict
+
+# Process-wide event counters, exposed by GET /health/metrics.
+# Keys are (name, label), e.g. ("budget_exceeded", "/api/events/alerts").
+
+_lock = threading.Lock()
+_counts = defaultdict(int)
+
+
+def incr(name, label="", amount=1):
+    with _lock:
+        _counts[(name, label)] += amount
+
+
+def get(name, label=""):
+    with _lock:
+        return _counts.get((name, label), 0)
+
+
+def snapshot():
+    """{"name": {"label": count}}; unlabelled counters use the "" label."""
+    result = {}
+    with _lock:
+        for (name, label), count in _counts.items():
+            result.setdefault(name, {})[label] = count
+    return result
+
+
+def reset():
+    with _lock:
+        _counts.clear()
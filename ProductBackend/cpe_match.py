@@ -0,0 +1,291 @@
+# Vulnerabilities derived from installed software: CPE names on assets matched against
+# the CPE configurations in the local CVE catalog (cve_catalog.py).
+#
+# Assets list their software as CPE names in `software` ([{"cpe": ..., "port": ...}]),
+# filled by scan imports from Nmap service/OS detection or sent with the asset. The
+# index groups every vulnerable catalog configuration under its (vendor, product), each
+# with its version range compiled once into a predicate over pre-parsed version keys.
+# Matching a piece of software only evaluates the rules for its own product, so pairs
+# whose product differs are never compared, and the result for one (vendor, product,
+# version) is computed once per run however many assets run it.
+#
+# link_assets() writes the matches as vulnerability sightings (vuln_fingerprint.py), so
+# a CVE a scanner already reported on the same asset and port merges with it, marks
+# findings it created earlier as patched once the software no longer matches, and
+# reopens them if a vulnerable version comes back.
+#
+#   python cpe_match.py               # relink every asset that has a software inventory
+
+import operator
+import re
+import threading
+import time
+from datetime import datetime, timedelta
+from functools import lru_cache
+from urllib.parse import unquote
+
+from pymongo import UpdateOne
+
+import cve_catalog
+import patch_velocity
+import risk_scoring
+import vuln_fingerprint
+import vuln_priority
+from database import db
+
+BATCH_SIZE = 500
+SOURCE = "cpe"
+# Catalog batches are stamped before they commit (and by another clock): each refresh
+# re-reads this window behind the previous one.
+SYNC_LAG = timedelta(seconds=60)
+
+ANY, NA = "*", "-"
+# Ranks that order version tokens: 1.0rc1 < 1.0 < 1.0p1 < 1.0.1
+PRERELEASE, END, ALPHA, NUMERIC = 0, 1, 2, 3
+PRERELEASE_TAGS = frozenset({"dev", "alpha", "a", "beta", "b", "pre", "preview", "rc"})
+
+_CPE23_SPLIT = re.compile(r"(?<!\\):")
+_TOKENS = re.compile(r"\d+|[a-z]+")
+
+
+# ============================================
+# CPE NAMES & VERSIONS
+# ============================================
+
+def parse_cpe(value):
+    """(vendor, product, version) from a CPE 2.3 or 2.2 URI name, lowercased; None if malformed."""
+    if not value:
+        return None
+    value = value.strip().lower()
+    if value.startswith("cpe:2.3:"):
+        if "\\" in value:  # escaped separators, e.g. "foo\:bar"
+            fields = [re.sub(r"\\(.)", r"\1", field) for field in _CPE23_SPLIT.split(value)[2:]]
+        else:
+            fields = value.split(":")[2:]
+    elif value.startswith("cpe:/"):
+        fields = [unquote(field) for field in value[5:].split(":")]
+    else:
+        return None
+    fields += [ANY] * (5 - len(fields))
+    _, vendor, product, version, update = fields[:5]
+    if not vendor or not product or vendor == ANY or product == ANY:
+        return None
+    version = version or ANY
+    if version not in (ANY, NA) and update not in (ANY, NA, ""):
+        version += update  # openssh 7.4 / p1 -> 7.4p1
+    return vendor, product, version
+
+
+def _trim_zeros(key):
+    """Drops the zeros ending a run of numbers: 2.4.0 == 2.4, 1.0rc1 == 1rc1."""
+    while key and key[-1] == (NUMERIC, 0, ""):
+        key.pop()
+
+
+@lru_cache(maxsize=100_000)
+def version_key(version):
+    """Comparable key for a version string; see the ranks above."""
+    key = []
+    for token in _TOKENS.findall(version.lower()):
+        if token.isdigit():
+            key.append((NUMERIC, int(token), ""))
+        else:
+            _trim_zeros(key)
+            key.append((PRERELEASE if token in PRERELEASE_TAGS else ALPHA, 0, token))
+    _trim_zeros(key)
+    key.append((END, 0, ""))
+    return tuple(key)
+
+
+def _every_version(key):
+    return True
+
+
+def compile_rule(match, parsed=None):
+    """
+    Predicate over version keys for one catalog CPE match, or None if the match can
+    never apply to a versioned install.
+    """
+    parsed = parsed or parse_cpe(match.get("criteria"))
+    if parsed is None:
+        return None
+    checks = [(op, version_key(match[field])) for field, op in (
+        ("versionStartIncluding", operator.ge), ("versionStartExcluding", operator.gt),
+        ("versionEndIncluding", operator.le), ("versionEndExcluding", operator.lt),
+    ) if match.get(field)]
+    version = parsed[2]
+    if not checks:
+        if version == ANY:
+            return _every_version
+        if version == NA:
+            return None
+        checks = [(operator.eq, version_key(version))]
+    if len(checks) == 1:
+        (op, bound), = checks
+        return lambda key: op(key, bound)
+    return lambda key: all(op(key, bound) for op, bound in checks)
+
+
+# ============================================
+# INDEX
+# ============================================
+
+class CpeIndex:
+    """(vendor, product) -> [(cve_id, predicate)], kept in step with the catalog."""
+
+    def __init__(self):
+        self.rules = {}
+        self._products_by_cve = {}
+        self._synced_to = None
+        self._lock = threading.Lock()
+
+    def _add(self, entry):
+        products = set()
+        for match in entry.get("cpe") or []:
+            parsed = parse_cpe(match.get("criteria"))
+            predicate = compile_rule(match, parsed) if parsed else None
+            if predicate is None:
+                continue
+            product = parsed[:2]
+            self.rules.setdefault(product, []).append((entry["_id"], predicate))
+            products.add(product)
+        if products:
+            self._products_by_cve[entry["_id"]] = products
+
+    def _remove(self, cve_id):
+        for product in self._products_by_cve.pop(cve_id, ()):
+            remaining = [rule for rule in self.rules[product] if rule[0] != cve_id]
+            if remaining:
+                self.rules[product] = remaining
+            else:
+                del self.rules[product]
+
+    def refresh(self):
+        """Compiles catalog entries written since the last refresh (all of them the first time)."""
+        with self._lock:
+            started = datetime.utcnow()
+            query = {"cpe.0": {"$exists": True}}
+            if self._synced_to is not None:
+                query = {"nvd_updated_at": {"$gte": self._synced_to}}
+            changed = 0
+            for entry in db["cve_catalog"].find(query, {"cpe": 1}):
+                self._remove(entry["_id"])
+                self._add(entry)
+                changed += 1
+            # Only once every entry is in: an interrupted refresh starts over.
+            self._synced_to = started - SYNC_LAG
+            return changed
+
+    def match(self, vendor, product, version):
+        """CVE ids whose configurations cover this install."""
+        rules = self.rules.get((vendor, product))
+        if not rules:
+            return frozenset()
+        if version in (ANY, NA):
+            # Only rules that apply to every version can match an install of unknown version.
+            return frozenset(cve_id for cve_id, predicate in rules if predicate is _every_version)
+        key = version_key(version)
+        return frozenset(cve_id for cve_id, predicate in rules if predicate(key))
+
+    def stats(self):
+        with self._lock:
+            return {"products": len(self.rules), "rules": sum(len(rules) for rules in self.rules.values()),
+                    "cves": len(self._products_by_cve)}
+
+
+cpe_index = CpeIndex()
+
+
+# ============================================
+# LINKING
+# ============================================
+
+def _link_batch(assets, memo, now, stats):
+    links = {}  # fingerprint -> (asset_id, cve_id, port, matched software)
+    for asset in assets:
+        for item in asset.get("software") or []:
+            parsed = parse_cpe(item.get("cpe") if isinstance(item, dict) else item)
+            if parsed is None:
+                continue
+            if parsed not in memo:
+                memo[parsed] = cpe_index.match(*parsed)
+            port = item.get("port") if isinstance(item, dict) else None
+            software = ":".join(parsed)
+            for cve_id in memo[parsed]:
+                fp = vuln_fingerprint.fingerprint(asset["_id"], cve_id, port)
+                links[fp] = (asset["_id"], cve_id, port, software)
+    stats["links"] += len(links)
+
+    catalog = cve_catalog.lookup_many(cve_id for _, cve_id, _, _ in links.values())
+    units = {asset["_id"]: [asset["business_unit"]] if asset.get("business_unit") else [] for asset in assets}
+    # A link can land on a scanner's finding: only what the catalog knows replaces its
+    # fields, the rest are defaults for new findings, and the scores use the merged values.
+    current = {vuln["fingerprint"]: vuln for vuln in db["vulnerabilities"].find(
+        {"fingerprint": {"$in": list(links)}}, {"fingerprint": 1, "cvss": 1, "exploitability": 1})}
+    sightings = []
+    for fp, (asset_id, cve_id, port, software) in links.items():
+        finding = {"cve_id": cve_id, "port": port}
+        finding.update(cve_catalog.enrich(finding, catalog[cve_id]))
+        defaults = {"title": finding.pop("title", cve_id), "severity": "Medium", "exploitability": "None",
+                    "cvss": None}
+        merged = {**defaults, **current.get(fp, {}), **finding}
+        exposure = risk_scoring.estimate_exposure(merged["cvss"], merged["exploitability"])
+        sightings.append((asset_id, finding, {
+            "matched_software": software, "business_units": units[asset_id], "exposure_score": exposure,
+            "risk_score": risk_scoring.vulnerability_score(merged["cvss"], merged["exploitability"], exposure),
+        }, defaults))
+
+    # Findings this matcher raised earlier that no installed software matches any more.
+    asset_ids = list(units)
+    ops, patched = [], []
+    for vuln in db["vulnerabilities"].find(
+            {"asset_id": {"$in": asset_ids}, "source": SOURCE, "status": {"$in": risk_scoring.OPEN_STATUSES}},
+            {"fingerprint": 1, "status": 1, "severity": 1}):
+        if vuln.get("fingerprint") not in links:
+            ops.append(UpdateOne({"_id": vuln["_id"]}, {"$set": {
+                "status": patch_velocity.REMEDIATED, "patched_at": now, "changed_at": now}}))
+            patched.append((vuln, vuln["status"], patch_velocity.REMEDIATED, now))
+            stats["patched"] += 1
+
+    # Matches write through vuln_fingerprint.write, which reopens findings patched earlier
+    # when the vulnerable version is installed again.
+    result = vuln_fingerprint.write(sightings, SOURCE, now)
+    if result:
+        stats["created"] += result.upserted_count
+    if ops:
+        db["vulnerabilities"].bulk_write(ops, ordered=False)
+        patch_velocity.record(patched)
+    if result or ops:
+        vuln_priority.priority_queue.apply(list(db["vulnerabilities"].find(
+            {"asset_id": {"$in": asset_ids}, "$or": [{"last_seen": now}, {"patched_at": now}]},
+            vuln_priority.PROJECTION)))
+    risk_scoring.recompute(asset_ids)
+
+
+def link_assets(asset_ids=None, batch_size=BATCH_SIZE):
+    """Matches the software of `asset_ids` (every asset with software when None) and writes the links."""
+    started = time.perf_counter()
+    cpe_index.refresh()
+    query = {"software.0": {"$exists": True}}
+    if asset_ids is not None:
+        query = {"_id": {"$in": list(asset_ids)}}
+    stats = {"assets": 0, "links": 0, "created": 0, "patched": 0}
+    memo, batch, now = {}, [], datetime.utcnow()
+    for asset in db["assets"].find(query, {"software": 1, "business_unit": 1}).batch_size(batch_size):
+        stats["assets"] += 1
+        batch.append(asset)
+        if len(batch) >= batch_size:
+            _link_batch(batch, memo, now, stats)
+            batch = []
+    if batch:
+        _link_batch(batch, memo, now, stats)
+    stats["distinct_installs"] = len(memo)
+    stats["ms"] = round((time.perf_counter() - started) * 1000, 1)
+    return stats
+
+
+if __name__ == "__main__":
+    stats = link_assets()
+    print(f"✅ Matched {stats['assets']:,} assets ({stats['distinct_installs']:,} distinct installs) "
+          f"to {stats['links']:,} CVE links: {stats['created']:,} new, {stats['patched']:,} patched "
+          f"in {stats['ms'] / 1000:.1f}s")
@@ -0,0 +1,389 @@
+# Local CVE catalog built from offline NVD feeds and CISA KEV lists, and enrichment of
+# vulnerabilities from it.
+#
+#   python cve_catalog.py load nvdcve-2.0-2024.json.gz nvdcve-2.0-modified.json.gz
+#   python cve_catalog.py load known_exploited_vulnerabilities.json
+#   python cve_catalog.py enrich                    # re-enrich every vulnerability
+#
+# Feeds (NVD 1.1 "CVE_Items", NVD 2.0 and KEV "vulnerabilities", plain or .gz) are
+# decoded one array item at a time, so a full year's feed never sits in memory. Each
+# entry is keyed by its CVE id and upserted in batches. NVD and KEV data live side by
+# side in the same document, each with a hash of its content: a refresh reads the
+# stored hashes for the batch and writes only the entries whose hash changed, and only
+# the vulnerabilities carrying those CVE ids are re-enriched.
+#
+# Lookups by cve_id (scan imports, re-enrichment) go through a hot LRU in front of the
+# collection; misses for a whole batch are fetched with one query.
+
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import re
+import time
+from datetime import datetime
+
+from pymongo import UpdateOne
+
+import cache
+import risk_scoring
+import vuln_priority
+from database import db
+
+BATCH_SIZE = int(os.getenv("CVE_CATALOG_BATCH_SIZE", "1000"))
+CHUNK_SIZE = 1024 * 1024
+HOT_ENTRIES = int(os.getenv("CVE_CATALOG_HOT_ENTRIES", "20000"))
+# How long a worker trusts its copy of an entry; refreshes made elsewhere show up after this.
+HOT_TTL_S = int(os.getenv("CVE_CATALOG_HOT_TTL_S", "600"))
+
+ARRAY_RE = re.compile(r'"(CVE_Items|vulnerabilities)"\s*:\s*\[')
+CVSS_METRICS = ("cvssMetricV40", "cvssMetricV31", "cvssMetricV30", "cvssMetricV2")
+MAX_REFERENCES = 20
+
+_hot = cache.TTLCache(max_entries=HOT_ENTRIES)
+
+
+# ============================================
+# STREAMING
+# ============================================
+
+def _open(path):
+    return gzip.open(path, "rt", encoding="utf-8") if path.endswith(".gz") else open(path, encoding="utf-8")
+
+
+def _items(source, chunk_size=CHUNK_SIZE):
+    """Yields the items of the feed's top-level CVE array one at a time."""
+    decoder = json.JSONDecoder()
+    buf = ""
+    while True:
+        chunk = source.read(chunk_size)
+        if not chunk:
+            raise ValueError("no CVE_Items or vulnerabilities array in feed")
+        buf += chunk
+        match = ARRAY_RE.search(buf)
+        if match:
+            pos = match.end()
+            break
+        buf = buf[-64:]  # the key may straddle two chunks
+
+    while True:
+        while pos < len(buf) and buf[pos] in " \t\r\n,":
+            pos += 1
+        if pos < len(buf):
+            if buf[pos] == "]":
+                return
+            try:
+                item, end = decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                pass  # the item runs past the buffer
+            else:
+                yield item
+                pos = end
+                continue
+        chunk = source.read(chunk_size)
+        if not chunk:
+            raise ValueError("feed ends inside the CVE array")
+        buf = buf[pos:] + chunk
+        pos = 0
+
+
+# ============================================
+# FEED MAPPING
+# ============================================
+
+def _date(value):
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00")).replace(tzinfo=None)
+    except ValueError:
+        return None
+
+
+def _english(entries):
+    return next((entry["value"] for entry in entries or [] if entry.get("lang") == "en"), None)
+
+
+def _severity(value):
+    return value.capitalize() if value else None
+
+
+def _cpe_matches(nodes, key, uri_key):
+    matches = []
+    for node in nodes or []:
+        for match in node.get(key, []):
+            if match.get("vulnerable", True):
+                matches.append({field: match[field] for field in (
+                    "versionStartIncluding", "versionStartExcluding", "versionEndIncluding", "versionEndExcluding",
+                ) if match.get(field)} | {"criteria": match[uri_key]})
+        matches.extend(_cpe_matches(node.get("children"), key, uri_key))
+    return matches
+
+
+def _map_nvd2(item):
+    cve = item["cve"]
+    metrics = cve.get("metrics", {})
+    cvss = severity = version = None
+    for name in CVSS_METRICS:
+        entries = metrics.get(name)
+        if entries:
+            entry = next((e for e in entries if e.get("type") == "Primary"), entries[0])
+            data = entry["cvssData"]
+            cvss, version = data.get("baseScore"), data.get("version")
+            severity = _severity(data.get("baseSeverity") or entry.get("baseSeverity"))
+            break
+    return cve["id"], {
+        "description": _english(cve.get("descriptions")),
+        "cvss": cvss,
+        "cvss_version": version,
+        "severity": severity,
+        "cwe": sorted({d["value"] for w in cve.get("weaknesses", []) for d in w.get("description", [])
+                       if d["value"].startswith("CWE-")}),
+        "cpe": [match for config in cve.get("configurations", [])
+                for match in _cpe_matches(config.get("nodes"), "cpeMatch", "criteria")],
+        "references": [ref["url"] for ref in cve.get("references", [])[:MAX_REFERENCES]],
+        "nvd_status": cve.get("vulnStatus"),
+        "published": _date(cve.get("published")),
+        "last_modified": _date(cve.get("lastModified")),
+    }
+
+
+def _map_nvd1(item):
+    cve = item["cve"]
+    impact = item.get("impact", {})
+    v3, v2 = impact.get("baseMetricV3", {}).get("cvssV3"), impact.get("baseMetricV2", {})
+    if v3:
+        cvss, version, severity = v3.get("baseScore"), v3.get("version"), _severity(v3.get("baseSeverity"))
+    elif v2:
+        cvss, version, severity = v2["cvssV2"].get("baseScore"), v2["cvssV2"].get("version"), _severity(v2.get("severity"))
+    else:
+        cvss = version = severity = None
+    return cve["CVE_data_meta"]["ID"], {
+        "description": _english(cve.get("description", {}).get("description_data")),
+        "cvss": cvss,
+        "cvss_version": version,
+        "severity": severity,
+        "cwe": sorted({d["value"] for p in cve.get("problemtype", {}).get("problemtype_data", [])
+                       for d in p.get("description", []) if d["value"].startswith("CWE-")}),
+        "cpe": _cpe_matches(item.get("configurations", {}).get("nodes"), "cpe_match", "cpe23Uri"),
+        "references": [ref["url"] for ref in cve.get("references", {}).get("reference_data", [])[:MAX_REFERENCES]],
+        "nvd_status": None,
+        "published": _date(item.get("publishedDate")),
+        "last_modified": _date(item.get("lastModifiedDate")),
+    }
+
+
+def _map_kev(item):
+    return item["cveID"], {
+        "name": item.get("vulnerabilityName"),
+        "vendor": item.get("vendorProject"),
+        "product": item.get("product"),
+        "date_added": _date(item.get("dateAdded")),
+        "due_date": _date(item.get("dueDate")),
+        "required_action": item.get("requiredAction"),
+        "ransomware": item.get("knownRansomwareCampaignUse") == "Known",
+    }
+
+
+def _map(item):
+    """(source, cve_id, fields) for one feed item, or None for a shape we don't know."""
+    if "cveID" in item:
+        return ("kev", *_map_kev(item))
+    if "cve" in item:
+        return ("nvd", *(_map_nvd1(item) if "CVE_data_meta" in item["cve"] else _map_nvd2(item)))
+    return None
+
+
+def _hash(fields):
+    return hashlib.sha1(json.dumps(fields, sort_keys=True, default=str).encode()).hexdigest()
+
+
+# ============================================
+# LOADING
+# ============================================
+
+def _write_batch(batch, stats):
+    """Upserts the entries whose content changed; returns their CVE ids."""
+    hashes = {(source, cve_id): _hash(fields) for source, cve_id, fields in batch}
+    stored = {doc["_id"]: doc for doc in db["cve_catalog"].find(
+        {"_id": {"$in": list({cve_id for _, cve_id, _ in batch})}}, {"nvd_hash": 1, "kev_hash": 1})}
+
+    now = datetime.utcnow()
+    ops, changed = {}, set()
+    for source, cve_id, fields in batch:
+        digest = hashes[(source, cve_id)]
+        if stored.get(cve_id, {}).get(f"{source}_hash") == digest:
+            stats["unchanged"] += 1
+            continue
+        update = {f"{source}_hash": digest, f"{source}_updated_at": now}
+        if source == "kev":
+            update["kev"] = fields
+        else:
+            update.update(fields)
+        ops[(source, cve_id)] = UpdateOne({"_id": cve_id}, {"$set": update}, upsert=True)
+        changed.add(cve_id)
+    if ops:
+        result = db["cve_catalog"].bulk_write(list(ops.values()), ordered=False)
+        stats["inserted"] += result.upserted_count
+        stats["updated"] += result.matched_count
+    return changed
+
+
+def load(path, batch_size=BATCH_SIZE, enrich=True):
+    """
+    Loads one NVD or KEV feed file into cve_catalog and returns its stats. With `enrich`,
+    vulnerabilities whose CVE entry changed are re-enriched as each batch lands.
+    """
+    stats = {"read": 0, "skipped": 0, "inserted": 0, "updated": 0, "unchanged": 0, "vulnerabilities_updated": 0}
+    batch = []
+
+    def flush():
+        changed = _write_batch(batch, stats)
+        if changed:
+            _hot.invalidate()
+            if enrich:
+                stats["vulnerabilities_updated"] += enrich_vulnerabilities(changed)["updated"]
+
+    with _open(path) as source:
+        for item in _items(source):
+            stats["read"] += 1
+            mapped = _map(item)
+            if mapped is None:
+                stats["skipped"] += 1
+                continue
+            batch.append(mapped)
+            if len(batch) >= batch_size:
+                flush()
+                batch = []
+        if batch:
+            flush()
+    return stats
+
+
+# ============================================
+# LOOKUP & ENRICHMENT
+# ============================================
+
+def lookup_many(cve_ids):
+    """{cve_id: catalog entry or None}, from the hot LRU where possible."""
+    found, missing = {}, []
+    for cve_id in set(cve_ids):
+        cached = _hot.get(cve_id)
+        if cached is None:
+            missing.append(cve_id)
+        else:
+            found[cve_id] = cached[0]
+    if missing:
+        entries = {doc["_id"]: doc for doc in db["cve_catalog"].find(
+            {"_id": {"$in": missing}}, {"nvd_hash": 0, "kev_hash": 0})}
+        for cve_id in missing:
+            found[cve_id] = entries.get(cve_id)
+            _hot.set(cve_id, found[cve_id], HOT_TTL_S)  # absent ids too, so they cost one query per TTL
+    return found
+
+
+def lookup(cve_id):
+    return lookup_many([cve_id])[cve_id]
+
+
+def hot_stats():
+    return _hot.stats()
+
+
+def enrich(vuln, entry):
+    """
+    Fields to $set on `vuln` from its catalog entry. NVD scores replace hand-entered
+    ones; a KEV listing means exploited in the wild; titles are only filled in.
+    """
+    if not entry:
+        return {}
+    updates = {}
+    if entry.get("cvss") is not None:
+        updates["cvss"] = entry["cvss"]
+        if entry.get("severity"):
+            updates["severity"] = entry["severity"]
+    if entry.get("kev"):
+        updates["exploitability"] = "Exploited in Wild"
+    if not vuln.get("title"):
+        kev_name = (entry.get("kev") or {}).get("name")
+        if kev_name or entry.get("description"):
+            updates["title"] = kev_name or entry["description"].split(". ")[0][:120]
+    updates["kev"] = bool(entry.get("kev"))
+    if entry.get("cwe"):
+        updates["cwe"] = entry["cwe"]
+    return {field: value for field, value in updates.items() if vuln.get(field) != value}
+
+
+def enrich_vulnerabilities(cve_ids=None, batch_size=BATCH_SIZE):
+    """Applies enrich() to the vulnerabilities with `cve_ids` (all when None)."""
+    query = {"cve_id": {"$exists": True}} if cve_ids is None else {"cve_id": {"$in": list(cve_ids)}}
+    fields = {"cve_id": 1, "cvss": 1, "severity": 1, "exploitability": 1, "title": 1, "kev": 1, "cwe": 1,
+              "exposure_score": 1, "asset_id": 1}
+    stats = {"scanned": 0, "updated": 0}
+    touched_assets = set()
+    now = datetime.utcnow()
+
+    def flush(vulns):
+        entries = lookup_many(vuln["cve_id"] for vuln in vulns)
+        ops = []
+        for vuln in vulns:
+            updates = enrich(vuln, entries.get(vuln["cve_id"]))
+            if not updates:
+                continue
+            if vuln.get("exposure_score") is not None:
+                merged = dict(vuln, **updates)
+                updates["risk_score"] = risk_scoring.vulnerability_score(
+                    merged.get("cvss"), merged.get("exploitability"), merged["exposure_score"])
+            ops.append(UpdateOne({"_id": vuln["_id"]}, {"$set": dict(updates, changed_at=now)}))
+            if vuln.get("asset_id"):
+                touched_assets.add(vuln["asset_id"])
+        if ops:
+            db["vulnerabilities"].bulk_write(ops, ordered=False)
+            stats["updated"] += len(ops)
+
+    batch = []
+    for vuln in db["vulnerabilities"].find(query, fields).batch_size(batch_size):
+        stats["scanned"] += 1
+        batch.append(vuln)
+        if len(batch) >= batch_size:
+            flush(batch)
+            batch = []
+    if batch:
+        flush(batch)
+
+    if stats["updated"]:
+        vuln_priority.priority_queue.invalidate()
+        if touched_assets:
+            risk_scoring.recompute(touched_assets)
+        cache.invalidate_for("/api/vulnerabilities")
+    return stats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load NVD / KEV feeds into the local CVE catalog.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    load_parser = sub.add_parser("load", help="load feed files (.json or .json.gz)")
+    load_parser.add_argument("paths", nargs="+")
+    load_parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    load_parser.add_argument("--no-enrich", action="store_true", help="don't re-enrich vulnerabilities")
+    sub.add_parser("enrich", help="re-enrich every vulnerability from the catalog")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    if args.command == "load":
+        for path in args.paths:
+            stats = load(path, args.batch_size, enrich=not args.no_enrich)
+            print(f"   ✓ {os.path.basename(path)}: {stats['read']:,} read, {stats['inserted']:,} new, "
+                  f"{stats['updated']:,} changed, {stats['unchanged']:,} unchanged, "
+                  f"{stats['vulnerabilities_updated']:,} vulnerabilities enriched")
+        if not args.no_enrich:
+            import cpe_match  # imports this module
+
+            links = cpe_match.link_assets()
+            print(f"   ✓ software: {links['links']:,} CVE links, {links['created']:,} new, {links['patched']:,} patched")
+        print(f"\n✅ Loaded {len(args.paths)} feed(s) in {time.perf_counter() - started:.1f}s")
+    else:
+        stats = enrich_vulnerabilities()
+        print(f"✅ Enriched {stats['updated']:,} of {stats['scanned']:,} vulnerabilities "
+              f"in {time.perf_counter() - started:.1f}s")
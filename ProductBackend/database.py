@@ -1,17 +1,180 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 
-from pymongo import MongoClient
+import pymongo
+from pymongo import MongoClient, monitoring
+from pymongo.collection import Collection
 
-# 1. Connect to MongoDB
-MONGO_URI = "mongodb://localhost:27017"
-client = MongoClient(MONGO_URI)
+from budgets import BudgetedCollection
 
-# 2. Select the Database (Using "product" as you confirmed earlier)
-db = client["product"]
+DEFAULT_MONGO_URI = "mongodb://localhost:27017/"
+DB_NAME = "product"
 
-# 3. Export Collections (So routers can import them)
-users_collection = db["users"]
-assets_collection = db["assets"]
-vulnerabilities_collection = db["vulnerabilities"]
-alerts_collection = db["alerts"]
+_client = None
+_lock = threading.Lock()
 
-print("✅ DATABASE: Connection initialized.")
\ No newline at end of file
+
+def mongo_uri():
+    return os.getenv("MONGODB_URI", DEFAULT_MONGO_URI)
+
+
+def pool_limits():
+    """(minPoolSize, maxPoolSize) from the environment."""
+    return (int(os.getenv("MONGODB_MIN_POOL_SIZE", "10")),
+            int(os.getenv("MONGODB_MAX_POOL_SIZE", "100")))
+
+
+class PoolStats(monitoring.ConnectionPoolListener):
+    """Live connection-pool counters per server, fed by pymongo's CMAP events."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pools = {}
+
+    def _pool(self, address):
+        return self._pools.setdefault(address, {"open": 0, "checked_out": 0, "pending": 0,
+                                                "checkout_failures": 0, "cleared": 0})
+
+    def _bump(self, address, **deltas):
+        with self._lock:
+            pool = self._pool(address)
+            for field, delta in deltas.items():
+                pool[field] = max(0, pool[field] + delta)
+
+    def pool_created(self, event):
+        with self._lock:
+            self._pool(event.address)
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        self._bump(event.address, cleared=1)
+
+    def pool_closed(self, event):
+        with self._lock:
+            self._pools.pop(event.address, None)
+
+    def connection_created(self, event):
+        self._bump(event.address, open=1)
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        self._bump(event.address, open=-1)
+
+    def connection_check_out_started(self, event):
+        self._bump(event.address, pending=1)
+
+    def connection_check_out_failed(self, event):
+        self._bump(event.address, pending=-1, checkout_failures=1)
+
+    def connection_checked_out(self, event):
+        self._bump(event.address, pending=-1, checked_out=1)
+
+    def connection_checked_in(self, event):
+        self._bump(event.address, checked_out=-1)
+
+    def snapshot(self):
+        """
+        {"host:port": counters} plus "available" = maxPoolSize - checked_out, and "waiting":
+        the checkouts in progress while every connection is out, i.e. queued for one.
+        """
+        max_pool = pool_limits()[1]
+        with self._lock:
+            return {
+                f"{host}:{port}": dict(pool, max_size=max_pool, available=max(0, max_pool - pool["checked_out"]),
+                                       waiting=pool["pending"] if pool["checked_out"] >= max_pool else 0)
+                for (host, port), pool in self._pools.items()
+            }
+
+
+pool_stats = PoolStats()
+
+
+# 1. One client per process, created on first use (or by the app lifespan)
+def connect():
+    """Creates the shared MongoClient. Safe to call more than once."""
+    global _client
+    if _client is None:
+        with _lock:
+            if _client is None:
+                # Deferred so importing this module stays cheap; scripts that never
+                # go through the app lifespan still pick up .env here.
+                from dotenv import load_dotenv
+                load_dotenv()
+                min_pool, max_pool = pool_limits()
+                _client = MongoClient(mongo_uri(), minPoolSize=min_pool, maxPoolSize=max_pool,
+                                      event_listeners=[pool_stats])
+    return _client
+
+
+def get_client():
+    return _client or connect()
+
+
+def close():
+    global _client
+    with _lock:
+        if _client is not None:
+            _client.close()
+            _client = None
+
+
+def ping(timeout=None):
+    """Round-trip to the primary; returns seconds. `timeout` bounds server selection too."""
+    started = time.perf_counter()
+    with pymongo.timeout(timeout):
+        get_client().admin.command("ping")
+    return time.perf_counter() - started
+
+
+def warm_pool(connections=None):
+    """Opens `connections` sockets up front so the first requests don't pay the handshake."""
+    connections = connections or pool_limits()[0]
+    if connections <= 0:
+        return 0
+    with ThreadPoolExecutor(max_workers=connections) as pool:
+        list(pool.map(lambda _: get_client().admin.command("ping"), range(connections)))
+    return connections
+
+
+# 2. Lazy handles, so routers can keep importing `db` at module level
+class _Lazy:
+    """Resolves a Database/Collection against the current client on first use."""
+
+    def __init__(self, resolve):
+        self._resolve = resolve
+        self._client = None
+        self._target = None
+
+    def _get(self):
+        client = get_client()
+        if self._client is not client:
+            self._target = self._resolve(client)
+            self._client = client
+        return self._target
+
+    def __getattr__(self, name):
+        return _budgeted(getattr(self._get(), name))
+
+    def __getitem__(self, name):
+        return _budgeted(self._get()[name])
+
+
+def _budgeted(value):
+    # Collections handed out to routers carry the request's query time budget.
+    return BudgetedCollection(value) if isinstance(value, Collection) else value
+
+
+# 3. Select the Database (Using "product" as you confirmed earlier)
+db = _Lazy(lambda client: client[DB_NAME])
+
+# 4. Export Collections (So routers can import them)
+users_collection = _Lazy(lambda client: BudgetedCollection(client[DB_NAME]["users"]))
+assets_collection = _Lazy(lambda client: BudgetedCollection(client[DB_NAME]["assets"]))
+vulnerabilities_collection = _Lazy(lambda client: BudgetedCollection(client[DB_NAME]["vulnerabilities"]))
+alerts_collection = _Lazy(lambda client: BudgetedCollection(client[DB_NAME]["alerts"]))
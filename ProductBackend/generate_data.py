@@ -0,0 +1,489 @@
+# Generates a statistically plausible, cross-referenced dataset at N x scale.
+#
+# Unlike the hand-written seed_*.py scripts, every document is derived from
+# (seed, kind, index), so any process can build any slice of any collection and the
+# references line up: vulnerabilities and alerts point at assets that exist,
+# alerts and incidents point at campaigns that exist, and so on.
+#
+#   python generate_data.py --scale 10 --drop
+#   python generate_data.py --scale 1 --count security_alerts=10000000 --workers 16
+
+import argparse
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime, timedelta, timezone
+
+from bson import ObjectId
+from pymongo import MongoClient, ReplaceOne
+from pymongo.errors import BulkWriteError
+
+import ip_index
+
+MONGO_URI = os.getenv("MONGODB_URI", "mongodb://localhost:27017/")
+DB_NAME = "product"
+
+# Documents per kind at scale 1 (a mid-sized organisation).
+BASE_COUNTS = {
+    "assets": 2_000,
+    "vulnerabilities": 10_000,
+    "threat_campaigns": 25,
+    "security_alerts": 50_000,
+    "alerts": 2_000,
+    "compliance_violations": 60,
+    "incident_responses": 150,
+    "phishing_intelligence": 80,
+}
+
+# Collections are written in this order so references always point backwards.
+KINDS = list(BASE_COUNTS)
+
+# ============================================
+# VOCABULARY
+# ============================================
+
+BUSINESS_UNITS = ["Finance", "IT Operations", "Development", "Human Resources", "Customer Services",
+                  "Sales", "Legal", "Production", "Backup & DR", "Executive"]
+LOCATIONS = ["New York DC", "London Office", "Frankfurt DC", "Singapore Office", "AWS us-east-1",
+             "Azure westeurope", "GCP us-central1", "Remote"]
+ASSET_TYPES = [
+    # (type, category, name prefix, weight)
+    ("Endpoint", "Endpoints", "ws", 45),
+    ("Web Server", "Servers", "web", 10),
+    ("Database Server", "Servers", "db", 6),
+    ("Application Server", "Servers", "app", 10),
+    ("Network Device", "Network", "fw", 6),
+    ("Cloud Resource", "Cloud Resources", "cloud", 15),
+    ("Mobile Device", "Endpoints", "mob", 8),
+]
+SEVERITIES = ["Critical", "High", "Medium", "Low"]
+VULN_SEVERITY_WEIGHTS = [6, 22, 44, 28]
+ALERT_SEVERITY_WEIGHTS = [3, 14, 43, 40]
+CVSS_RANGES = {"Critical": (9.0, 10.0), "High": (7.0, 8.9), "Medium": (4.0, 6.9), "Low": (0.1, 3.9)}
+EXPLOITABILITY = ["Exploited in Wild", "Weaponized", "PoC Available", "None"]
+VULN_STATUSES = ["Open", "In Progress", "Patched", "Risk Accepted"]
+THREAT_ACTORS = ["APT29", "APT28", "Lazarus Group", "FIN7", "Scattered Spider", "LockBit",
+                 "Cl0p", "Volt Typhoon", "Sandworm", "TA505"]
+VULN_TITLES = ["Remote Code Execution in {p}", "SQL Injection in {p}", "Cross-Site Scripting in {p}",
+               "Privilege Escalation in {p}", "Authentication Bypass in {p}", "Buffer Overflow in {p}",
+               "Information Disclosure in {p}", "Denial of Service in {p}", "Path Traversal in {p}"]
+PRODUCTS = ["Apache HTTP Server", "OpenSSL", "nginx", "Microsoft Exchange", "MySQL", "PostgreSQL",
+            "Windows SMB", "Cisco IOS XE", "Fortinet FortiOS", "Atlassian Confluence", "VMware ESXi",
+            "Log4j", "Jenkins", "Citrix NetScaler", "OpenSSH"]
+ALERT_SOURCES = ["CrowdStrike EDR", "AWS GuardDuty", "Microsoft Sentinel", "Palo Alto NGFW", "Okta",
+                 "Splunk SIEM", "Zscaler"]
+ALERT_TITLES = ["Suspicious PowerShell Execution", "Unusual Network Traffic Pattern",
+                "Failed Authentication Attempts", "Malware Signature Detected", "Privilege Escalation Attempt",
+                "Impossible Travel Login", "Data Exfiltration Pattern", "Port Scan Detected",
+                "Credential Dumping Activity", "Suspicious Outbound DNS"]
+ALERT_STATUSES = ["Open", "In Progress", "Resolved", "Contained"]
+ALERT_STATUS_WEIGHTS = [20, 15, 55, 10]
+MITRE_TACTICS = ["Initial Access", "Execution", "Persistence", "Privilege Escalation", "Defense Evasion",
+                 "Credential Access", "Discovery", "Lateral Movement", "Collection", "Exfiltration", "Impact"]
+TECHNIQUES = ["T1078", "T1059.001", "T1543", "T1068", "T1562", "T1003", "T1046", "T1021", "T1005",
+              "T1041", "T1199", "T1082", "T1087", "T1490", "T1566"]
+CAMPAIGN_WORDS = ["Cloud Heist", "Supply Chain", "Ransomware Pre-Attack", "Silent Harvest", "Night Owl",
+                  "Credential Storm", "Shadow Relay", "Iron Gate", "Glass Door", "Red Ledger"]
+FRAMEWORKS = ["GDPR", "PCI DSS", "ISO 27001", "NIST", "SOX"]
+OWNERS = ["Security Engineering", "Identity & Access", "IT Operations", "Cloud Platform", "SOC Lead",
+          "Data Protection Office"]
+ROOT_CAUSES = ["Phishing", "Malware", "Misconfiguration", "Insider", "Unpatched Vulnerability",
+               "Credential Stuffing"]
+BRANDS = ["Microsoft", "DocuSign", "Citibank", "DHL", "Okta", "Google", "PayPal", "Amazon", "Adobe"]
+ATTACK_VECTORS = ["Email", "SMS", "Voice", "Social Media"]
+
+
+# ============================================
+# DETERMINISTIC IDS
+# ============================================
+
+_KIND_CODES = {kind: code for code, kind in enumerate(KINDS, start=1)}
+
+
+def object_id(kind, index):
+    """Stable ObjectId for document `index` of `kind`, so cross-references need no lookups."""
+    return ObjectId(b"\xc3\x60" + bytes([_KIND_CODES[kind]]) + b"\x00" + index.to_bytes(8, "big"))
+
+
+def _rng(seed, kind, index):
+    return random.Random(f"{seed}:{kind}:{index}")
+
+
+def _skewed(rng, n, power=2.5):
+    """Index in [0, n) with a heavy head: a few assets/campaigns collect most references."""
+    return min(n - 1, int(n * rng.random() ** power))
+
+
+def _skew_share(j, n, power=2.5):
+    """Probability that _skewed() returns j."""
+    return ((j + 1) / n) ** (1 / power) - (j / n) ** (1 / power)
+
+
+def _recent(rng, now, days, diurnal=True):
+    """Timestamp in the last `days` days, biased towards business hours."""
+    moment = now - timedelta(seconds=rng.random() * days * 86400)
+    if diurnal and rng.random() < 0.7:
+        moment = moment.replace(hour=rng.randint(8, 18))
+        if moment > now:
+            moment -= timedelta(days=1)
+    return moment
+
+
+def counts_for(scale, overrides=None):
+    counts = {kind: max(1, int(base * scale)) for kind, base in BASE_COUNTS.items()}
+    counts.update(overrides or {})
+    return counts
+
+
+# ============================================
+# BUILDERS
+# ============================================
+# Each builder is a pure function of (index, counts, seed, now).
+
+def _build_asset(i, counts, seed, now):
+    rng = _rng(seed, "assets", i)
+    asset_type, category, prefix, _ = rng.choices(ASSET_TYPES, weights=[t[3] for t in ASSET_TYPES])[0]
+    criticality = rng.choices(SEVERITIES, weights=[8, 22, 45, 25])[0]
+    exposure = rng.choices(SEVERITIES, weights=[5, 20, 45, 30])[0]
+    critical_issues = int(rng.expovariate(0.6)) if exposure in ("Critical", "High") else int(rng.expovariate(2))
+    risk = min(10.0, round({"Critical": 7.5, "High": 5.5, "Medium": 3.5, "Low": 1.5}[exposure]
+                           + rng.random() * 2 + critical_issues * 0.1, 1))
+    bu = rng.choice(BUSINESS_UNITS)
+    created = _recent(rng, now, 720, diurnal=False)
+    ip = f"10.{(i >> 16) & 255}.{(i >> 8) & 255}.{i & 255}"
+    return {
+        "_id": object_id("assets", i),
+        "name": f"{bu.split()[0].lower()}-{prefix}-{i:06d}",
+        "ip": ip,
+        **ip_index.ip_fields(ip),
+        "type": asset_type,
+        "category": category,
+        "criticality": criticality,
+        "status": rng.choices(["Active", "Inactive", "Decommissioned"], weights=[88, 9, 3])[0],
+        "owner": rng.choice(OWNERS),
+        "business_unit": bu,
+        "location": rng.choice(LOCATIONS),
+        "exposure_level": exposure,
+        "risk_score": risk,
+        "compliance_status": rng.choices(["Compliant", "Needs Review", "Non-Compliant"], weights=[60, 25, 15])[0],
+        "critical_issues": critical_issues,
+        "tasks": rng.randint(0, 4) if critical_issues else 0,
+        "created_at": created,
+        "updated_at": created + (now - created) * rng.random(),
+    }
+
+
+def _build_vulnerability(i, counts, seed, now):
+    rng = _rng(seed, "vulnerabilities", i)
+    severity = rng.choices(SEVERITIES, weights=VULN_SEVERITY_WEIGHTS)[0]
+    low, high = CVSS_RANGES[severity]
+    cvss = round(rng.uniform(low, high), 1)
+    exploitability = rng.choices(EXPLOITABILITY, weights=[4, 8, 20, 68] if severity in ("Low", "Medium")
+                                 else [15, 20, 35, 30])[0]
+    asset_index = _skewed(rng, counts["assets"])
+    asset_rng = _rng(seed, "assets", asset_index)
+    age_days = int(rng.expovariate(1 / 45))
+    exposure_score = min(100, int(cvss * 8 + (20 if exploitability != "None" else 0) + rng.randint(-5, 5)))
+    actors = rng.sample(THREAT_ACTORS, rng.randint(1, 3)) if exploitability in EXPLOITABILITY[:2] else []
+    product = rng.choice(PRODUCTS)
+    vuln = {
+        "_id": object_id("vulnerabilities", i),
+        "cve_id": f"CVE-{rng.randint(2015, now.year)}-{rng.randint(1000, 49999)}",
+        "title": rng.choice(VULN_TITLES).format(p=product),
+        "cvss": cvss,
+        "severity": severity,
+        "exploitability": exploitability,
+        "asset_id": object_id("assets", asset_index),
+        "business_units": sorted({asset_rng.choice(BUSINESS_UNITS), rng.choice(BUSINESS_UNITS)}),
+        "asset_criticality": "+1" if rng.random() < 0.1 else "",
+        "exposure_score": max(0, exposure_score),
+        "risk_score": round(min(10.0, cvss * 0.8 + (2 if actors else 0) * rng.random()), 1),
+        "status": rng.choices(VULN_STATUSES, weights=[45, 20, 30, 5])[0],
+        "threat_actors": actors,
+        "first_seen": now - timedelta(days=age_days, seconds=rng.randint(0, 86399)),
+    }
+    if vuln["status"] == "Patched":
+        vuln["patched_at"] = vuln["first_seen"] + (now - vuln["first_seen"]) * rng.random()
+    return vuln
+
+
+def _build_campaign(i, counts, seed, now):
+    rng = _rng(seed, "threat_campaigns", i)
+    severity = rng.choices(SEVERITIES[:3], weights=[30, 45, 25])[0]
+    created = _recent(rng, now, 90, diurnal=False)
+    tactics = sorted(rng.sample(MITRE_TACTICS, rng.randint(2, 8)), key=MITRE_TACTICS.index)
+    return {
+        "_id": object_id("threat_campaigns", i),
+        "campaign_id": f"CAMP-{i + 1:05d}",
+        "name": f"Operation {rng.choice(CAMPAIGN_WORDS)} {i + 1}",
+        "severity": severity,
+        "status": rng.choices(["Active", "Contained", "Resolved"], weights=[30, 40, 30])[0],
+        "confidence": rng.randint(60, 98),
+        "impact_score": rng.randint(40, 99),
+        "duration": f"{rng.randint(0, 3)}d {rng.randint(0, 23)}h",
+        "affected_assets": rng.randint(1, 40),
+        # Alerts pick campaigns with _skewed(), so the expected share is known up front.
+        "alert_count": round(counts["security_alerts"] * 0.15 * _skew_share(i, counts["threat_campaigns"])),
+        "impacted_business_units": rng.sample(BUSINESS_UNITS, rng.randint(1, 3)),
+        "mitre_tactics": tactics,
+        "techniques": rng.sample(TECHNIQUES, len(tactics)),
+        "created_at": created,
+        "updated_at": created + (now - created) * rng.random(),
+    }
+
+
+def _build_security_alert(i, counts, seed, now):
+    rng = _rng(seed, "security_alerts", i)
+    detected = _recent(rng, now, 30)
+    campaign = _skewed(rng, counts["threat_campaigns"]) if rng.random() < 0.15 else None
+    title = rng.choice(ALERT_TITLES)
+    return {
+        "_id": object_id("security_alerts", i),
+        "alert_id": f"ALT-{detected.year}-{i + 1:09d}",
+        "title": title,
+        "description": f"{title} on {rng.choice(BUSINESS_UNITS)} infrastructure",
+        "severity": rng.choices(SEVERITIES, weights=ALERT_SEVERITY_WEIGHTS)[0],
+        "status": rng.choices(ALERT_STATUSES, weights=ALERT_STATUS_WEIGHTS)[0],
+        "alert_source": rng.choice(ALERT_SOURCES),
+        "campaign_id": f"CAMP-{campaign + 1:05d}" if campaign is not None else None,
+        "asset_id": object_id("assets", _skewed(rng, counts["assets"])),
+        "detected_at": detected,
+        "assigned_to": f"SOC Analyst {rng.randint(1, 12)}",
+        "last_activity": detected + timedelta(minutes=rng.randint(0, 600)),
+        "created_at": detected,
+        "updated_at": detected + timedelta(minutes=rng.randint(0, 600)),
+    }
+
+
+def _build_feed_alert(i, counts, seed, now):
+    rng = _rng(seed, "alerts", i)
+    asset = _skewed(rng, counts["assets"])
+    return {
+        "_id": object_id("alerts", i),
+        "timestamp": _recent(rng, now, 7),
+        "severity": rng.choices(SEVERITIES, weights=ALERT_SEVERITY_WEIGHTS)[0],
+        "source": rng.choice(["SIEM", "IDS", "EDR", "WAF"]),
+        "message": rng.choice(ALERT_TITLES),
+        "asset_id": object_id("assets", asset),
+        "status": rng.choice(["New", "Escalated", "Closed"]),
+    }
+
+
+def _build_violation(i, counts, seed, now):
+    rng = _rng(seed, "compliance_violations", i)
+    framework = rng.choice(FRAMEWORKS)
+    deadline = now + timedelta(days=rng.randint(-15, 120))
+    steps = rng.randint(2, 4)
+    done = rng.randint(0, steps)
+    return {
+        "_id": object_id("compliance_violations", i),
+        "violation_id": i + 1,
+        "title": f"{framework} control gap #{i + 1}",
+        "severity": rng.choices(SEVERITIES, weights=[10, 30, 40, 20])[0],
+        "framework": framework,
+        "affected_assets_count": min(counts["assets"], int(rng.expovariate(1 / 60)) + 1),
+        "affected_asset_ids": [object_id("assets", _skewed(rng, counts["assets"])) for _ in range(rng.randint(1, 5))],
+        "impact_summary": f"{framework} requirement not met on sampled assets",
+        "deadline": deadline,
+        "days_remaining": (deadline - now).days,
+        "owner": rng.choice(OWNERS),
+        "status": "Resolved" if done == steps else rng.choice(["Not Started", "In Progress"]),
+        "remediation_steps": [{"step": s + 1, "description": f"Remediation step {s + 1}", "completed": s < done}
+                              for s in range(steps)],
+        "created_at": now - timedelta(days=rng.randint(1, 90)),
+        "updated_at": now - timedelta(days=rng.randint(0, 1)),
+    }
+
+
+def _build_incident(i, counts, seed, now):
+    rng = _rng(seed, "incident_responses", i)
+    detected = _recent(rng, now, 180, diurnal=False)
+    status = rng.choices(["Open", "Investigating", "Contained", "Resolved"], weights=[10, 15, 20, 55])[0]
+    campaign = _skewed(rng, counts["threat_campaigns"]) if rng.random() < 0.4 else None
+    return {
+        "_id": object_id("incident_responses", i),
+        "incident_id": f"INC-{detected.year}-{i + 1:05d}",
+        "title": f"{rng.choice(ALERT_TITLES)} Incident",
+        "severity": rng.choices(SEVERITIES, weights=[10, 30, 40, 20])[0],
+        "business_impact": rng.choice(["High", "Medium", "Low"]),
+        "business_unit": rng.choice(BUSINESS_UNITS),
+        "root_cause": rng.choice(ROOT_CAUSES),
+        "status": status,
+        "owner": rng.choice(OWNERS),
+        "campaign_id": f"CAMP-{campaign + 1:05d}" if campaign is not None else None,
+        "resolution_time": f"{rng.randint(1, 72)}h" if status == "Resolved" else "Ongoing",
+        "detected_at": detected,
+        "updated_at": detected + (now - detected) * rng.random(),
+        "regulatory_impact": rng.sample(FRAMEWORKS, rng.randint(0, 2)),
+        "sla_status": rng.choices(["Within SLA", "At Risk", "Breached"], weights=[70, 20, 10])[0],
+    }
+
+
+def _build_phishing(i, counts, seed, now):
+    rng = _rng(seed, "phishing_intelligence", i)
+    brand = rng.choice(BRANDS)
+    slug = brand.lower()
+    return {
+        "_id": object_id("phishing_intelligence", i),
+        "threat_id": f"PHISH-{now.year}-{i + 1:05d}",
+        "campaign_name": f"{brand} {rng.choice(['Credential Harvest', 'Invoice Fraud', 'MFA Fatigue', 'Account Update'])}",
+        "impersonated_brand": brand,
+        "status": rng.choices(["Active", "Takedown In Progress", "Resolved"], weights=[35, 20, 45])[0],
+        "severity": rng.choices(SEVERITIES, weights=[10, 30, 45, 15])[0],
+        "detected_at": _recent(rng, now, 60),
+        "attack_vector": rng.choices(ATTACK_VECTORS, weights=[70, 18, 6, 6])[0],
+        "targets_count": int(rng.lognormvariate(5, 1.2)),
+        "click_rate_estimate": round(min(40.0, rng.lognormvariate(1.6, 0.6)), 1),
+        "indicators_of_compromise": {
+            "urls": [f"{slug}-secure-{rng.randint(10, 999)}.com"],
+            "sender_domains": [f"support@{slug}-alerts.net"],
+            "subject_lines": [f"Action required: {brand} account"],
+        },
+        "remediation_status": {
+            "domain_takedown": rng.random() < 0.4,
+            "email_gateway_block": rng.random() < 0.7,
+            "browser_blocklist": rng.random() < 0.5,
+        },
+    }
+
+
+BUILDERS = {
+    "assets": _build_asset,
+    "vulnerabilities": _build_vulnerability,
+    "threat_campaigns": _build_campaign,
+    "security_alerts": _build_security_alert,
+    "alerts": _build_feed_alert,
+    "compliance_violations": _build_violation,
+    "incident_responses": _build_incident,
+    "phishing_intelligence": _build_phishing,
+}
+
+
+def build(kind, start, stop, counts, seed, now):
+    """Documents [start, stop) of `kind`."""
+    builder = BUILDERS[kind]
+    return [builder(i, counts, seed, now) for i in range(start, stop)]
+
+
+# ============================================
+# LOADING
+# ============================================
+
+_worker_db = None
+
+
+def _init_worker(uri, db_name):
+    global _worker_db
+    _worker_db = MongoClient(uri, w=1)[db_name]
+
+
+def _load_chunk(kind, start, stop, counts, seed, now, batch_size, upsert=False):
+    """Builds and writes one chunk with unordered bulk writes; returns (written, duplicates)."""
+    collection = _worker_db[kind]
+    inserted = duplicates = 0
+    for batch_start in range(start, stop, batch_size):
+        docs = build(kind, batch_start, min(stop, batch_start + batch_size), counts, seed, now)
+        if upsert:
+            result = collection.bulk_write([ReplaceOne({"_id": doc["_id"]}, doc, upsert=True) for doc in docs],
+                                           ordered=False)
+            inserted += result.upserted_count + result.modified_count
+            duplicates += result.matched_count - result.modified_count
+            continue
+        try:
+            inserted += len(collection.insert_many(docs, ordered=False).inserted_ids)
+        except BulkWriteError as e:
+            # Re-running without --drop: existing documents have the same _id, skip them.
+            errors = e.details.get("writeErrors", [])
+            if any(err.get("code") != 11000 for err in errors):
+                raise
+            duplicates += len(errors)
+            inserted += e.details.get("nInserted", 0)
+    return inserted, duplicates
+
+
+def load(counts, seed=42, workers=None, batch_size=5_000, chunk_size=200_000, drop=False,
+         uri=MONGO_URI, db_name=DB_NAME, now=None, upsert=False):
+    """Writes `counts` documents per kind using a pool of processes.
+
+    With upsert=True every document is replaced by _id instead of inserted, so the
+    load is idempotent (used by seed.py); plain inserts are much faster on an empty
+    collection.
+    """
+    # Anchor "now" to the hour so two runs with the same seed produce identical documents.
+    now = now or datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0)
+    workers = workers or os.cpu_count() or 4
+
+    if drop:
+        db = MongoClient(uri)[db_name]
+        for kind in counts:
+            db[kind].drop()
+
+    totals = {}
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(uri, db_name)) as pool:
+        for kind in KINDS:
+            if not counts.get(kind):
+                continue
+            started = time.perf_counter()
+            futures = [
+                pool.submit(_load_chunk, kind, start, min(counts[kind], start + chunk_size),
+                            counts, seed, now, batch_size, upsert)
+                for start in range(0, counts[kind], chunk_size)
+            ]
+            inserted = duplicates = 0
+            for future in as_completed(futures):
+                chunk_inserted, chunk_duplicates = future.result()
+                inserted += chunk_inserted
+                duplicates += chunk_duplicates
+            elapsed = time.perf_counter() - started
+            totals[kind] = inserted
+            print(f"   ✓ {kind}: {inserted:,} written, {duplicates:,} already present "
+                  f"({elapsed:.1f}s, {inserted / elapsed if elapsed else 0:,.0f} docs/s)")
+    return totals
+
+
+def _parse_counts(values):
+    overrides = {}
+    for value in values or []:
+        kind, _, number = value.partition("=")
+        if kind not in BASE_COUNTS or not number.isdigit():
+            raise argparse.ArgumentTypeError(f"expected <kind>=<count> with kind in {', '.join(KINDS)}")
+        overrides[kind] = int(number)
+    return overrides
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a cross-referenced synthetic dataset.")
+    parser.add_argument("--scale", type=float, default=1.0, help="multiplier applied to BASE_COUNTS")
+    parser.add_argument("--count", action="append", metavar="KIND=N", help="override one collection's size")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--workers", type=int, default=None, help="loader processes (default: CPU count)")
+    parser.add_argument("--batch-size", type=int, default=5_000)
+    parser.add_argument("--drop", action="store_true", help="drop the generated collections first")
+    args = parser.parse_args()
+
+    counts = counts_for(args.scale, _parse_counts(args.count))
+    print(f"🔄 Generating {sum(counts.values()):,} documents into '{DB_NAME}'...")
+    started = time.perf_counter()
+    load(counts, seed=args.seed, workers=args.workers, batch_size=args.batch_size, drop=args.drop)
+    if counts.get("vulnerabilities"):
+        import patch_velocity
+        import threat_exposure
+        import vuln_fingerprint
+        import vuln_priority
+        import vuln_sla
+        vuln_fingerprint.backfill()  # the same CVE can land on an asset twice
+        vuln_priority.priority_queue.invalidate()  # running workers refill their queues
+        threat_exposure.refresh(full=True)
+        vuln_sla.run()  # generated findings are up to years old
+        patch_velocity.backfill()
+    if counts.get("assets"):
+        import asset_counters
+        import risk_scoring
+        risk_scoring.recompute()
+        asset_counters.reconcile()  # bulk inserts bypass the per-write counter hooks
+    print(f"\n✅ Synthetic data generated in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+# Index definitions for the collections the API queries, created at startup.
+#
+#   python indexes.py        # create them now (e.g. before a bulk load finishes)
+#
+# create_indexes is idempotent, so every worker can run this on boot.
+
+import time
+
+from pymongo import ASCENDING, DESCENDING, IndexModel
+
+from database import db
+
+INDEXES = {
+    "assets": [
+        # Faceted inventory search (GET /api/assets/search): filters and sort.
+        IndexModel([("type", ASCENDING), ("criticality", ASCENDING)], name="type_criticality"),
+        IndexModel([("status", ASCENDING), ("criticality", ASCENDING)], name="status_criticality"),
+        IndexModel([("business_unit", ASCENDING), ("criticality", ASCENDING)], name="business_unit_criticality"),
+        IndexModel([("owner", ASCENDING)], name="owner"),
+        IndexModel([("location", ASCENDING)], name="location"),
+        IndexModel([("name", ASCENDING)], name="name"),
+        IndexModel([("risk_score", DESCENDING)], name="risk_score_desc"),
+        # Top-risk read (GET /api/assets/top-risk): active assets by score.
+        IndexModel([("status", ASCENDING), ("risk_score", DESCENDING)], name="status_risk_score"),
+        # Exact / range / CIDR lookups on the normalized address (ip_index.py).
+        IndexModel([("ip_norm", ASCENDING)], name="ip_norm"),
+        # Identity resolution (asset_identity.py): no two assets may claim the same
+        # hostname / MAC / instance ID, and workers sync recently written assets.
+        IndexModel([("identity_keys", ASCENDING)], name="identity_keys", unique=True,
+                   partialFilterExpression={"identity_keys": {"$exists": True}}),
+        IndexModel([("updated_at", ASCENDING)], name="updated_at"),
+    ],
+    "asset_history": [
+        # Point-in-time reads (asset_history.py): newest full entry at or before a moment,
+        # the deltas after it, and which assets existed by then.
+        IndexModel([("asset_id", ASCENDING), ("seq", ASCENDING)], name="asset_seq", unique=True),
+        IndexModel([("asset_id", ASCENDING), ("full", ASCENDING), ("at", DESCENDING)], name="asset_full_at"),
+        IndexModel([("kind", ASCENDING), ("asset_id", ASCENDING), ("at", ASCENDING)], name="kind_asset_at"),
+    ],
+    "vulnerabilities": [
+        # One document per finding however many scanners report it (vuln_fingerprint.py);
+        # older documents get their fingerprint from its backfill.
+        IndexModel([("fingerprint", ASCENDING)], name="fingerprint", unique=True,
+                   partialFilterExpression={"fingerprint": {"$exists": True}}),
+        # Per-asset reads: counts, rescoring, relinking an asset's software.
+        IndexModel([("asset_id", ASCENDING), ("cve_id", ASCENDING), ("port", ASCENDING)], name="asset_cve_port"),
+        # Prioritization queue (vuln_priority.py): open findings by score, globally and
+        # per business unit, with _id as the keyset tie-break.
+        IndexModel([("status", ASCENDING), ("risk_score", DESCENDING), ("exposure_score", DESCENDING),
+                    ("_id", ASCENDING)], name="status_priority"),
+        IndexModel([("business_units", ASCENDING), ("status", ASCENDING), ("risk_score", DESCENDING),
+                    ("exposure_score", DESCENDING), ("_id", ASCENDING)], name="business_unit_priority"),
+        # Threat-intel panel (threat_exposure.py): per-actor aggregation and top findings
+        # (multikey), open counts per exploitability label, and findings changed since the
+        # view's last refresh.
+        IndexModel([("threat_actors", ASCENDING), ("status", ASCENDING), ("risk_score", DESCENDING)],
+                   name="threat_actor_status_risk"),
+        IndexModel([("exploitability", ASCENDING), ("status", ASCENDING), ("risk_score", DESCENDING)],
+                   name="exploitability_status_risk"),
+        IndexModel([("changed_at", ASCENDING)], name="changed_at"),
+        # SLA scheduler and aging rollup (vuln_sla.py): range queries on first_seen per severity.
+        IndexModel([("severity", ASCENDING), ("status", ASCENDING), ("first_seen", ASCENDING)],
+                   name="severity_status_first_seen"),
+        # Re-enrichment of the findings for CVEs whose catalog entry changed (cve_catalog.py).
+        IndexModel([("cve_id", ASCENDING)], name="cve_id"),
+    ],
+    "vulnerability_events": [
+        IndexModel([("kind", ASCENDING), ("at", DESCENDING)], name="kind_at"),
+        IndexModel([("kind", ASCENDING), ("severity", ASCENDING), ("at", DESCENDING)], name="kind_severity_at"),
+        # Findings' own transitions (patch_velocity.py backfill).
+        IndexModel([("vuln_id", ASCENDING), ("kind", ASCENDING)], name="vuln_kind"),
+    ],
+    "threat_actor_exposure": [
+        IndexModel([("open_count", DESCENDING), ("max_risk", DESCENDING)], name="open_count_max_risk"),
+        IndexModel([("max_risk", DESCENDING), ("open_count", DESCENDING)], name="max_risk_open_count"),
+    ],
+    "cve_catalog": [
+        # Entries are keyed by CVE id (_id); these serve KEV and recently-modified listings.
+        IndexModel([("kev.date_added", DESCENDING)], name="kev_date_added", sparse=True),
+        IndexModel([("last_modified", DESCENDING)], name="last_modified"),
+        # Incremental CPE index refresh (cpe_match.py): entries written since the last sync.
+        IndexModel([("nvd_updated_at", ASCENDING)], name="nvd_updated_at"),
+    ],
+}
+
+
+def ensure_indexes(collections=None):
+    """Creates every declared index; returns {collection: [index names]}."""
+    created = {}
+    for name, models in INDEXES.items():
+        if collections and name not in collections:
+            continue
+        created[name] = db[name].create_indexes(models)
+    return created
+
+
+if __name__ == "__main__":
+    started = time.perf_counter()
+    for collection, names in ensure_indexes().items():
+        print(f"   ✓ {collection}: {', '.join(names)}")
+    print(f"\n✅ Indexes ready in {time.perf_counter() - started:.1f}s")
@@ -0,0 +1,79 @@
+# Normalized, indexable form of asset IP addresses.
+#
+# Assets keep the address as entered in "ip"; alongside it we store "ip_norm", the
+# address as 16 big-endian bytes (IPv4 as IPv4-mapped ::ffff:a.b.c.d) and "ip_version".
+# MongoDB orders equal-length BinData bytewise, so one ascending index on ip_norm
+# answers exact, range and CIDR lookups for both families as a single index scan.
+
+import ipaddress
+
+from bson.binary import Binary
+
+_V4_MAPPED = ipaddress.IPv6Address("::ffff:0.0.0.0")
+
+
+def _parse(value):
+    """ipaddress.IPv4Address / IPv6Address for free-form input, or None."""
+    if value is None:
+        return None
+    text = str(value).strip()
+    if not text:
+        return None
+    if text.startswith("["):  # "[2001:db8::1]:443"
+        text = text[1:text.find("]")] if "]" in text else text[1:]
+    elif text.count(":") == 1:  # "10.0.0.1:8080"
+        text = text.split(":", 1)[0]
+    text = text.split("%", 1)[0]  # zone id, "fe80::1%eth0"
+    try:
+        # Accepts "10.0.0.5/24" interface notation as well as bare addresses.
+        return ipaddress.ip_interface(text).ip
+    except ValueError:
+        return None
+
+
+def _key(address):
+    if address.version == 4:
+        return int(_V4_MAPPED) | int(address)
+    return int(address)
+
+
+def _binary(number):
+    return Binary(number.to_bytes(16, "big"))
+
+
+def normalize(value):
+    """(ip_norm, version) for an address string; (None, None) if it isn't one."""
+    address = _parse(value)
+    if address is None:
+        return None, None
+    return _binary(_key(address)), address.version
+
+
+def ip_fields(value):
+    """The normalized fields to store next to an asset's "ip"."""
+    ip_norm, version = normalize(value)
+    return {"ip_norm": ip_norm, "ip_version": version}
+
+
+def cidr_bounds(cidr):
+    """Inclusive (low, high) ip_norm bounds for a network such as "10.0.0.0/8"."""
+    network = ipaddress.ip_network(cidr.strip(), strict=False)
+    return (_binary(_key(network.network_address)), _binary(_key(network.broadcast_address)))
+
+
+def range_bounds(start, end):
+    """Inclusive (low, high) ip_norm bounds between two addresses of the same family."""
+    low, high = _parse(start), _parse(end)
+    if low is None or high is None:
+        raise ValueError("start and end must be IP addresses")
+    if low.version != high.version:
+        raise ValueError("start and end must be the same IP version")
+    if int(low) > int(high):
+        low, high = high, low
+    return _binary(_key(low)), _binary(_key(high))
+
+
+def to_string(ip_norm):
+    """Back from ip_norm to the canonical address string."""
+    address = ipaddress.IPv6Address(bytes(ip_norm))
+    return str(address.ipv4_mapped or address)
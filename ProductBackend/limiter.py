@@ -0,0 +1,180 @@
+import asyncio
+import os
+import time
+from collections import deque
+
+from fastapi.responses import JSONResponse
+
+import counters
+
+# ============================================
+# PRIORITY CLASSES
+# ============================================
+
+INTERACTIVE = "interactive"  # dashboard reads
+MUTATION = "mutation"        # writes from the UI
+HEAVY = "heavy"              # PDF / report generation, exports, uploads
+
+# Path fragments that mark a request as heavy, whatever its method.
+HEAVY_PATTERNS = ("/export-pdf", "/generate-", "/logs/export", "/upload-photo", "/imports/upload", "/risk/recompute")
+
+# Never limited: probes must answer even (especially) when we are shedding.
+BYPASS_PREFIXES = ("/health/",)
+
+# Share of the adaptive limit each class may fill, counting everything in flight.
+# Low-priority work stops being admitted first as the limit shrinks.
+CLASS_SHARE = {INTERACTIVE: 1.0, MUTATION: 0.75, HEAVY: 0.25}
+
+# Hard caps on what a single class may have in flight.
+CLASS_MAX = {
+    INTERACTIVE: None,
+    MUTATION: int(os.getenv("LIMITER_MAX_MUTATIONS", "32")),
+    HEAVY: int(os.getenv("LIMITER_MAX_HEAVY", "4")),
+}
+
+# Status returned when a class is shed.
+SHED_STATUS = {INTERACTIVE: 503, MUTATION: 503, HEAVY: 429}
+
+
+def classify(method, path):
+    if any(pattern in path for pattern in HEAVY_PATTERNS):
+        return HEAVY
+    if method in ("GET", "HEAD", "OPTIONS"):
+        return INTERACTIVE
+    return MUTATION
+
+
+# ============================================
+# AIMD LIMITER
+# ============================================
+
+class AdaptiveLimiter:
+    """
+    Additive-increase / multiplicative-decrease concurrency limit.
+
+    The limit grows by roughly one per limit's worth of fast completions while it is
+    actually being used, and is cut by `backoff` (at most once per `cooldown` seconds)
+    when an interactive request exceeds `target_ms` or anything comes back 503/504.
+    Interactive requests over the limit may wait up to `queue_timeout` for a slot;
+    mutations and heavy work are rejected immediately.
+    """
+
+    def __init__(self, initial=32, min_limit=4, max_limit=256, target_ms=750,
+                 backoff=0.9, cooldown=1.0, queue_timeout=0.5):
+        self.limit = float(initial)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.target_ms = target_ms
+        self.backoff = backoff
+        self.cooldown = cooldown
+        self.queue_timeout = queue_timeout
+        self.inflight = 0
+        self.by_class = {INTERACTIVE: 0, MUTATION: 0, HEAVY: 0}
+        self._waiters = deque()
+        self._last_decrease = 0.0
+
+    def _admits(self, klass):
+        cap = CLASS_MAX[klass]
+        if cap is not None and self.by_class[klass] >= cap:
+            return False
+        return self.inflight < max(1, int(self.limit * CLASS_SHARE[klass]))
+
+    def _take(self, klass):
+        self.inflight += 1
+        self.by_class[klass] += 1
+
+    async def acquire(self, klass):
+        """True once a slot is held; False if the request should be shed."""
+        if not self._waiters and self._admits(klass):
+            self._take(klass)
+            return True
+        if klass != INTERACTIVE or len(self._waiters) >= int(self.limit):
+            return False
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(waiter, self.queue_timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+        except asyncio.CancelledError:
+            # Client went away after a slot was handed over: give it back.
+            if waiter.done() and not waiter.cancelled():
+                self.release(klass, 0, 200, False)
+            raise
+        finally:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+
+    def release(self, klass, elapsed_ms, status, busy):
+        self.inflight -= 1
+        self.by_class[klass] -= 1
+
+        overloaded = status in (503, 504) or (klass == INTERACTIVE and elapsed_ms > self.target_ms)
+        now = time.monotonic()
+        if overloaded:
+            if now - self._last_decrease >= self.cooldown:
+                self.limit = max(self.min_limit, self.limit * self.backoff)
+                self._last_decrease = now
+        elif busy:
+            self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+
+        # Hand freed slots to queued interactive requests, oldest first.
+        while self._waiters and self._admits(INTERACTIVE):
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self._take(INTERACTIVE)
+                waiter.set_result(True)
+
+    def stats(self):
+        return {"limit": round(self.limit, 1), "inflight": self.inflight,
+                "queued": len(self._waiters), "by_class": dict(self.by_class)}
+
+
+concurrency_limiter = AdaptiveLimiter(
+    initial=int(os.getenv("LIMITER_INITIAL", "32")),
+    min_limit=int(os.getenv("LIMITER_MIN", "4")),
+    max_limit=int(os.getenv("LIMITER_MAX", "256")),
+    target_ms=float(os.getenv("LIMITER_TARGET_MS", "750")),
+)
+
+
+# ============================================
+# ASGI MIDDLEWARE
+# ============================================
+
+class ConcurrencyLimitMiddleware:
+    """Admits each request by priority class, or sheds it with 429/503 before any work is done."""
+
+    def __init__(self, app, limiter=None):
+        self.app = app
+        self.limiter = limiter or concurrency_limiter
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"].startswith(BYPASS_PREFIXES):
+            return await self.app(scope, receive, send)
+
+        klass = classify(scope["method"], scope["path"])
+        busy = self.limiter.inflight + 1 >= self.limiter.limit / 2
+        if not await self.limiter.acquire(klass):
+            counters.incr("shed", klass)
+            response = JSONResponse(
+                status_code=SHED_STATUS[klass],
+                headers={"Retry-After": "1" if klass == INTERACTIVE else "5"},
+                content={"detail": "Server busy, retry shortly", "priority": klass},
+            )
+            return await response(scope, receive, send)
+
+        status = {"code": 500}
+
+        async def send_with_status(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            self.limiter.release(klass, (time.perf_counter() - started) * 1000, status["code"], busy)
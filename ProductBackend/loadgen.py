@@ -0,0 +1,307 @@
+# Replays the page-level request bundles the React frontend fires against a running backend.
+#
+# Every page switch in ProductFrontend fires all of its GETs in parallel (Promise.all /
+# fetchWithFallback) and only renders once the slowest one returns, so the number that
+# matters is page-complete latency, not per-request latency.
+#
+#   python loadgen.py --base-url http://127.0.0.1:8000 --users 50 --duration 60
+
+import argparse
+import http.client
+import json
+import math
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from urllib.parse import urlsplit
+
+# ============================================
+# PAGE BUNDLES (mirrors ProductFrontend/src/components)
+# ============================================
+
+PAGES = {
+    # HomePage.tsx
+    "dashboard": [
+        "/api/metrics/key",
+        "/api/metrics/operational",
+        "/api/metrics/trends/5days",
+        "/api/calendar/upcoming",
+        "/api/metrics/module-health",
+        "/api/metrics/alerts/today",
+        "/api/risks/top",
+    ],
+    # modules/AssetManagementModule.tsx
+    "assets": [
+        "/api/assets/summary",
+        "/api/assets/distribution",
+        "/api/assets/top-risk",
+        "/api/assets",
+    ],
+    # modules/VulnerabilityModule.tsx
+    "vulnerabilities": [
+        "/api/vulnerabilities/summary",
+        "/api/vulnerabilities/active-threats",
+        "/api/vulnerabilities/severity-distribution",
+        "/api/vulnerabilities/patch-velocity",
+        "/api/vulnerabilities/inventory",
+    ],
+    # modules/RiskDashboardModule.tsx
+    "risk": [
+        "/api/risk/summary",
+        "/api/risk/posture",
+        "/api/risk/category-breakdown",
+        "/api/risk/business-units",
+        "/api/risk/internal-drivers",
+        "/api/risk/external-drivers",
+        "/api/risk/recommendations",
+    ],
+    # modules/ComplianceModule.tsx
+    "compliance": [
+        "/api/compliance/frameworks",
+        "/api/compliance/violations",
+        "/api/compliance/actions",
+        "/api/compliance/evidence",
+        "/api/compliance/controls",
+        "/api/compliance/executive-kpis",
+    ],
+    # modules/EventsModule.tsx
+    "events": [
+        "/api/events/campaigns",
+        "/api/events/alerts",
+        "/api/events/metrics",
+    ],
+    # modules/PhishingIntelligenceModule.tsx still renders mock data, so replay the
+    # backend routes that feed the same panel.
+    "phishing": [
+        "/api/phishing/intelligence",
+        "/api/phishing/intelligence/stats",
+    ],
+    # modules/IncidentResponseModule.tsx
+    "incident-response": [
+        "/api/incident-response/incidents",
+        "/api/incident-response/stats",
+    ],
+    # modules/ExecutiveReportModule.tsx
+    "executive-report": [
+        "/api/executive-report/latest",
+    ],
+}
+
+# One analyst session: land on the dashboard, then switch through the busiest tabs.
+DEFAULT_JOURNEY = ["dashboard", "risk", "compliance", "events", "phishing"]
+
+# Browsers open at most six HTTP/1.1 connections per origin.
+CONNECTIONS_PER_USER = 6
+
+
+# ============================================
+# HTTP
+# ============================================
+
+class _Client:
+    """Keep-alive HTTP client, one connection per worker thread (like a browser socket pool)."""
+
+    def __init__(self, base_url, timeout):
+        parts = urlsplit(base_url)
+        self.scheme = parts.scheme or "http"
+        self.host = parts.hostname or "127.0.0.1"
+        self.port = parts.port or (443 if self.scheme == "https" else 80)
+        self.prefix = parts.path.rstrip("/")
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            cls = http.client.HTTPSConnection if self.scheme == "https" else http.client.HTTPConnection
+            conn = cls(self.host, self.port, timeout=self.timeout)
+            self._local.conn = conn
+        return conn
+
+    def get(self, path):
+        """Returns (status, seconds). Status 0 means a transport error."""
+        started = time.perf_counter()
+        for attempt in range(2):
+            conn = self._connection()
+            try:
+                conn.request("GET", self.prefix + path, headers={"Accept": "application/json"})
+                response = conn.getresponse()
+                response.read()
+                return response.status, time.perf_counter() - started
+            except (http.client.HTTPException, OSError):
+                # Stale keep-alive socket: reconnect once, then give up.
+                conn.close()
+                self._local.conn = None
+                if attempt == 1:
+                    return 0, time.perf_counter() - started
+
+
+# ============================================
+# REPLAY
+# ============================================
+
+class _Recorder:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.pages = {}
+        self.requests = {}
+
+    def record_page(self, page, seconds, failed):
+        with self._lock:
+            entry = self.pages.setdefault(page, {"latencies": [], "errors": 0})
+            entry["latencies"].append(seconds)
+            if failed:
+                entry["errors"] += 1
+
+    def record_request(self, path, status, seconds):
+        with self._lock:
+            entry = self.requests.setdefault(path, {"latencies": [], "statuses": {}})
+            entry["latencies"].append(seconds)
+            entry["statuses"][status] = entry["statuses"].get(status, 0) + 1
+
+
+def _load_page(client, pool, recorder, page):
+    """Fires the whole bundle at once and waits for the slowest response."""
+    paths = PAGES[page]
+    started = time.perf_counter()
+    futures = [pool.submit(client.get, path) for path in paths]
+    wait(futures)
+    elapsed = time.perf_counter() - started
+
+    failed = False
+    for path, future in zip(paths, futures):
+        status, seconds = future.result()
+        recorder.record_request(path, status, seconds)
+        if status == 0 or status >= 400:
+            failed = True
+    recorder.record_page(page, elapsed, failed)
+
+
+def _run_user(client, recorder, journey, deadline, think_time, rng):
+    with ThreadPoolExecutor(max_workers=CONNECTIONS_PER_USER) as pool:
+        while time.monotonic() < deadline:
+            for page in journey:
+                if time.monotonic() >= deadline:
+                    return
+                _load_page(client, pool, recorder, page)
+                if think_time:
+                    time.sleep(rng.uniform(0, think_time * 2))
+
+
+def run(base_url, users, duration, journey, think_time=0.5, ramp_up=0.0, timeout=30.0, seed=None):
+    """Replays `journey` with `users` concurrent virtual analysts for `duration` seconds."""
+    unknown = [page for page in journey if page not in PAGES]
+    if unknown:
+        raise ValueError(f"Unknown page(s): {', '.join(unknown)}")
+
+    client = _Client(base_url, timeout)
+    recorder = _Recorder()
+    rng = random.Random(seed)
+    started = time.monotonic()
+    deadline = started + duration
+
+    threads = []
+    for i in range(users):
+        thread = threading.Thread(
+            target=_run_user,
+            args=(client, recorder, journey, deadline, think_time, random.Random(rng.random())),
+            daemon=True,
+        )
+        thread.start()
+        threads.append(thread)
+        if ramp_up and i < users - 1:
+            time.sleep(ramp_up / users)
+
+    for thread in threads:
+        thread.join()
+    return _summarize(recorder, time.monotonic() - started)
+
+
+# ============================================
+# REPORTING
+# ============================================
+
+def _percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    # Nearest-rank percentile.
+    index = max(0, math.ceil(pct / 100 * len(sorted_values)) - 1)
+    return sorted_values[index]
+
+
+def _latency_stats(latencies):
+    values = sorted(latencies)
+    return {
+        "count": len(values),
+        "p50_ms": round(_percentile(values, 50) * 1000, 1),
+        "p90_ms": round(_percentile(values, 90) * 1000, 1),
+        "p99_ms": round(_percentile(values, 99) * 1000, 1),
+        "max_ms": round((values[-1] if values else 0) * 1000, 1),
+    }
+
+
+def _summarize(recorder, wall_seconds):
+    pages = {}
+    for page, entry in recorder.pages.items():
+        stats = _latency_stats(entry["latencies"])
+        stats["errors"] = entry["errors"]
+        stats["requests_per_page"] = len(PAGES[page])
+        pages[page] = stats
+
+    slowest = {}
+    for path, entry in recorder.requests.items():
+        stats = _latency_stats(entry["latencies"])
+        stats["statuses"] = {str(k): v for k, v in sorted(entry["statuses"].items())}
+        slowest[path] = stats
+
+    total_pages = sum(p["count"] for p in pages.values())
+    return {
+        "duration_s": round(wall_seconds, 1),
+        "pages_completed": total_pages,
+        "pages_per_s": round(total_pages / wall_seconds, 2) if wall_seconds else 0,
+        "pages": pages,
+        "requests": slowest,
+    }
+
+
+def print_report(summary):
+    print(f"\nPages completed: {summary['pages_completed']} in {summary['duration_s']}s "
+          f"({summary['pages_per_s']} pages/s)\n")
+    print(f"{'PAGE':<20}{'REQS':>5}{'COUNT':>8}{'ERR':>6}{'p50':>10}{'p90':>10}{'p99':>10}{'max':>10}")
+    for page, s in summary["pages"].items():
+        print(f"{page:<20}{s['requests_per_page']:>5}{s['count']:>8}{s['errors']:>6}"
+              f"{s['p50_ms']:>10}{s['p90_ms']:>10}{s['p99_ms']:>10}{s['max_ms']:>10}")
+
+    # The request that gates the page is usually the one with the worst tail.
+    print("\nSlowest routes by p99 (ms):")
+    ranked = sorted(summary["requests"].items(), key=lambda kv: kv[1]["p99_ms"], reverse=True)
+    for path, s in ranked[:10]:
+        print(f"  {s['p99_ms']:>9}  {path}  {s['statuses']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay frontend page bundles and report page-complete latency.")
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--users", type=int, default=10, help="concurrent virtual analysts")
+    parser.add_argument("--duration", type=float, default=30, help="seconds to run")
+    parser.add_argument("--journey", default=",".join(DEFAULT_JOURNEY),
+                        help=f"comma-separated pages, from: {', '.join(PAGES)}")
+    parser.add_argument("--think-time", type=float, default=0.5, help="mean seconds between tab switches")
+    parser.add_argument("--ramp-up", type=float, default=0.0, help="seconds to spread user start over")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--json", action="store_true", help="print the summary as JSON")
+    args = parser.parse_args()
+
+    journey = [page.strip() for page in args.journey.split(",") if page.strip()]
+    summary = run(args.base_url, args.users, args.duration, journey,
+                  think_time=args.think_time, ramp_up=args.ramp_up, timeout=args.timeout, seed=args.seed)
+    if args.json:
+        print(json.dumps(summary, indent=2))
+    else:
+        print_report(summary)
+
+
+if __name__ == "__main__":
+    main()
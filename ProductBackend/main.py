@@ -1,14 +1,130 @@
+import time
+
+_IMPORT_STARTED = time.perf_counter()
+
 from fastapi import FastAPI, HTTPException, Request, Body, APIRouter
+from fastapi.concurrency import run_in_threadpool
+from fastapi.exception_handlers import http_exception_handler
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from bson import ObjectId
+from pymongo.errors import ConnectionFailure, ExecutionTimeout
+from contextlib import asynccontextmanager
 from datetime import datetime
+import asyncio
+import logging
 import os
 
 # --- 1. SETUP & DATABASE ---
 # IMPORT DATABASE FROM THE SEPARATE FILE TO FIX THE MODULE ERROR
+import asset_counters
+import asset_history
+import asset_identity
+import breaker
+import budgets
+import cache
+import cve_catalog
+import coalesce
+import cpe_match
+import database
+import indexes
+import limiter
+import patch_velocity
+import risk_scoring
+import threat_exposure
+import vuln_priority
+import vuln_sla
 from database import db, assets_collection, vulnerabilities_collection, alerts_collection
 
-app = FastAPI(title="CRV360 Unified Backend")
+logger = logging.getLogger("crv360")
+
+# Startup phases in milliseconds, filled in at import and by the lifespan below.
+STARTUP_TIMINGS = {}
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Opens the Mongo pool once per worker, warms it and primes the dashboard cache
+    before the worker is marked ready. Nothing touches the network at import time.
+    """
+    app.state.ready = False
+    app.state.primed = {}
+
+    def timed(phase, fn, *args):
+        started = time.perf_counter()
+        result = fn(*args)
+        STARTUP_TIMINGS[phase] = round((time.perf_counter() - started) * 1000, 1)
+        return result
+
+    try:
+        await run_in_threadpool(timed, "connect_ms", database.connect)
+        await run_in_threadpool(timed, "ping_ms", database.ping)
+        await run_in_threadpool(timed, "pool_warm_ms", database.warm_pool)
+        await run_in_threadpool(timed, "indexes_ms", indexes.ensure_indexes)
+
+        started = time.perf_counter()
+        primed = app.state.primed = await cache.prime(app)
+        STARTUP_TIMINGS["cache_prime_ms"] = round((time.perf_counter() - started) * 1000, 1)
+        failed = [path for path, status in primed.items() if status != 200]
+        if failed:
+            logger.warning("Cache priming failed for: %s", ", ".join(failed))
+        app.state.ready = True
+    except Exception as e:
+        # Keep serving: the pool connects lazily and readiness stays false until Mongo answers.
+        logger.error("Startup warm-up failed: %s", e)
+
+    logger.info("Startup timings (ms): %s", STARTUP_TIMINGS)
+    background = [asyncio.create_task(breaker.monitor(app)),
+                  asyncio.create_task(reconcile_asset_counters()),
+                  asyncio.create_task(check_vuln_slas()),
+                  asyncio.create_task(refresh_threat_exposure())]
+    yield
+    app.state.ready = False
+    for task in background:
+        task.cancel()
+    database.close()
+
+
+async def reconcile_asset_counters():
+    """Rebuilds the asset counters at startup and then every ASSET_COUNTER_RECONCILE_S."""
+    while True:
+        try:
+            await run_in_threadpool(asset_counters.reconcile_if_due)
+        except Exception as e:
+            logger.warning("Asset counter reconciliation failed: %s", e)
+        await asyncio.sleep(asset_counters.RECONCILE_INTERVAL_S)
+
+
+async def check_vuln_slas():
+    """Emits SLA breach events and refreshes the aging rollup every VULN_SLA_CHECK_INTERVAL_S."""
+    while True:
+        try:
+            await run_in_threadpool(vuln_sla.run_if_due)
+        except Exception as e:
+            logger.warning("Vulnerability SLA check failed: %s", e)
+        await asyncio.sleep(vuln_sla.CHECK_INTERVAL_S)
+
+
+async def refresh_threat_exposure():
+    """Re-aggregates the threat actor view every THREAT_EXPOSURE_REFRESH_S, one worker at a time."""
+    while True:
+        try:
+            await run_in_threadpool(threat_exposure.refresh_if_due)
+        except Exception as e:
+            logger.warning("Threat exposure refresh failed: %s", e)
+        await asyncio.sleep(threat_exposure.REFRESH_S)
+
+
+app = FastAPI(title="CRV360 Unified Backend", lifespan=lifespan)
+
+# Starlette wraps the last-added middleware outermost, so requests pass through
+# CORS -> response cache -> single-flight -> budget clock -> concurrency limit -> routes.
+# Single-flight sits outside the budget so one leader disconnecting can't kill a shared query.
+app.add_middleware(limiter.ConcurrencyLimitMiddleware)
+app.add_middleware(budgets.QueryBudgetMiddleware)
+app.add_middleware(coalesce.SingleFlightMiddleware)
+app.add_middleware(cache.ResponseCacheMiddleware)
 
 # CORS (Allows your React Frontend to talk to this Backend)
 app.add_middleware(
@@ -19,6 +135,34 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+
+# Handlers wrap every failure in HTTPException(500). A blown query budget or an
+# unreachable MongoDB is a 503 instead; the latter also feeds the circuit breaker.
+@app.exception_handler(HTTPException)
+async def budget_aware_http_exception_handler(request: Request, exc: HTTPException):
+    if exc.status_code == 500 and budgets.is_budget_error(exc):
+        return budgets.budget_exceeded_response(request)
+    if exc.status_code == 500 and breaker.is_outage_error(exc):
+        return mongo_unavailable_response(exc)
+    return await http_exception_handler(request, exc)
+
+
+@app.exception_handler(ConnectionFailure)
+async def connection_failure_handler(request: Request, exc):
+    return mongo_unavailable_response(exc)
+
+
+def mongo_unavailable_response(exc):
+    if not breaker.is_rejection(exc):
+        breaker.mongo_breaker.record_failure()
+    return JSONResponse(status_code=503, headers={"Retry-After": "5"},
+                        content={"detail": "Database temporarily unavailable"})
+
+
+@app.exception_handler(ExecutionTimeout)
+async def execution_timeout_handler(request: Request, exc):
+    return budgets.budget_exceeded_response(request)
+
 # --- 2. HELPER FUNCTIONS ---
 
 def serialize_doc(doc):
@@ -66,23 +210,36 @@ async def add_asset(request: Request):
         if not asset_name:
             raise HTTPException(status_code=400, detail="Asset Name (or Hostname) is required")
 
-        new_asset = {
+        record = {
             "name": asset_name,
+            "hostname": data.get("hostname"),
             "ip": data.get("ip_address") or data.get("ip"),
+            "mac": data.get("mac_address") or data.get("mac"),
+            "instance_id": data.get("instance_id"),
             "type": data.get("asset_type") or data.get("type"),
             "criticality": data.get("criticality"),
-            "status": data.get("status", "Active"),
+            "status": data.get("status"),
             "owner": data.get("owner"),
             "business_unit": data.get("business_unit"),
             "location": data.get("location"),
-            "created_at": datetime.now()
+            "software": data.get("software"),
         }
-        
-        result = db.assets.insert_one(new_asset)
-        
+
+        # The same host reported again (by any source) updates its existing asset.
+        asset_id, created = await run_in_threadpool(
+            asset_identity.upsert, record, data.get("source", "manual"),
+            {"status": "Active", "created_at": datetime.now()},
+        )
+        # Criticality, business unit or installed software may have changed the asset's score.
+        if record["software"] is not None:
+            await run_in_threadpool(cpe_match.link_assets, [asset_id])
+        else:
+            await run_in_threadpool(risk_scoring.recompute, [asset_id])
+
         return {
-            "message": "Asset created successfully", 
-            "id": str(result.inserted_id)
+            "message": "Asset created successfully" if created else "Asset matched an existing record and was updated",
+            "id": str(asset_id),
+            "created": created
         }
     except HTTPException as he:
         raise he
@@ -91,12 +248,13 @@ async def add_asset(request: Request):
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/assets/top-risk")
-def get_top_risk_assets():
+def get_top_risk_assets(limit: int = 5):
     try:
+        # Top-K straight off the (status, risk_score) index; scores come from risk_scoring.py
         high_risk_assets = list(db.assets.find(
-            {"criticality": "High", "status": "Active"},
-            {"_id": 1, "name": 1, "ip": 1, "owner": 1}
-        ).limit(5))
+            {"status": "Active"},
+            {"_id": 1, "name": 1, "ip": 1, "owner": 1, "criticality": 1, "risk_score": 1, "open_vulns": 1}
+        ).sort("risk_score", -1).limit(max(1, min(limit, 100))))
 
         return [serialize_doc(asset) for asset in high_risk_assets]
     except Exception as e:
@@ -105,24 +263,23 @@ def get_top_risk_assets():
 @app.get("/api/assets/distribution")
 def get_asset_distribution():
     try:
-        # Aggregation to count assets by 'type'
-        pipeline = [
-            {"$group": {"_id": "$type", "count": {"$sum": 1}}}
-        ]
-        distribution = list(db.assets.aggregate(pipeline))
-        
-        formatted_data = [{"name": item["_id"] or "Unknown", "value": item["count"]} for item in distribution]
-        return formatted_data
+        # Asset counts by 'type', maintained incrementally (see asset_counters.py)
+        return asset_counters.distribution(asset_counters.get(), "type")
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.delete("/api/assets/{asset_id}")
 def delete_asset(asset_id: str):
     try:
-        result = db.assets.delete_one({"_id": ObjectId(asset_id)})
-        if result.deleted_count == 0:
+        deleted = db.assets.find_one_and_delete({"_id": ObjectId(asset_id)})
+        if deleted is None:
             raise HTTPException(status_code=404, detail="Asset not found")
+        asset_counters.on_delete(deleted)
+        asset_identity.identity_index.forget(deleted["_id"])
+        asset_history.record_delete(deleted)
         return {"message": "Asset deleted"}
+    except HTTPException as he:
+        raise he
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -179,17 +336,168 @@ def get_severity_distribution():
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/api/vulnerabilities/patch-velocity")
+def get_patch_velocity():
+    """
+    GET /api/vulnerabilities/patch-velocity
+    Remediations per day over the last 30 days with a 7-day rolling average, from the
+    day buckets patch_velocity.py maintains as findings change status.
+    """
+    try:
+        return patch_velocity.velocity()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/api/vulnerabilities/{vuln_id}/status")
+def update_vuln_status(vuln_id: str, new_status: str):
+    """
+    POST /api/vulnerabilities/{vuln_id}/status
+    Moves a finding to `new_status` (Open, In Progress, Patched, Risk Accepted) and
+    records the transition for patch velocity.
+    """
+    try:
+        if new_status not in patch_velocity.STATUSES:
+            raise HTTPException(status_code=400, detail=f"status must be one of {', '.join(patch_velocity.STATUSES)}")
+        if not ObjectId.is_valid(vuln_id):
+            raise HTTPException(status_code=400, detail="Invalid vulnerability id")
+        vuln = patch_velocity.set_status(ObjectId(vuln_id), new_status)
+        if vuln is None:
+            raise HTTPException(status_code=404, detail="Vulnerability not found")
+        return serialize_doc(dict(vuln, asset_id=str(vuln.get("asset_id")),
+                                  age_days=vuln_sla.age_days(vuln.get("first_seen"))))
+    except HTTPException as he:
+        raise he
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/api/vulnerabilities/queue")
+def get_vuln_queue(business_unit: str = None, limit: int = 20, after: str = None):
+    """
+    GET /api/vulnerabilities/queue
+    Open vulnerabilities, most important first (risk_score, then exposure_score), for the
+    whole organisation or one business unit. Pass next_after back as `after` for the next page.
+    """
+    try:
+        try:
+            docs, next_after = vuln_priority.priority_queue.page(business_unit, max(1, min(limit, 200)), after)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        now = datetime.utcnow()
+        items = [serialize_doc(dict(doc, asset_id=str(doc.get("asset_id")),
+                                    age_days=vuln_sla.age_days(doc.get("first_seen"), now))) for doc in docs]
+        return {"items": items, "next_after": next_after}
+    except HTTPException as he:
+        raise he
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/api/vulnerabilities/catalog/{cve_id}")
+def get_cve_catalog_entry(cve_id: str):
+    """
+    GET /api/vulnerabilities/catalog/{cve_id}
+    The local NVD / KEV record for one CVE (see cve_catalog.py).
+    """
+    try:
+        entry = cve_catalog.lookup(cve_id.upper())
+        if not entry:
+            raise HTTPException(status_code=404, detail="CVE not in catalog")
+        return entry
+    except HTTPException as he:
+        raise he
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/api/vulnerabilities/threat-actors")
+def get_threat_actor_exposure(limit: int = 20, sort: str = "open_count"):
+    """
+    GET /api/vulnerabilities/threat-actors
+    Exposure per threat actor (open findings, max risk, business units, exploitability mix),
+    read from the materialized view in threat_exposure.py.
+    """
+    try:
+        if sort not in ("open_count", "max_risk"):
+            raise HTTPException(status_code=400, detail="sort must be open_count or max_risk")
+        rows = threat_exposure.top_actors(max(1, min(limit, 100)), sort)
+        return {"actors": [dict(row, actor=row.pop("_id")) for row in rows]}
+    except HTTPException as he:
+        raise he
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/api/vulnerabilities/threat-actors/{actor}")
+def get_threat_actor(actor: str, limit: int = 10):
+    """
+    GET /api/vulnerabilities/threat-actors/{actor}
+    One actor's exposure plus its riskiest open findings.
+    """
+    try:
+        row = threat_exposure.actor(actor, max(1, min(limit, 100)))
+        if row is None:
+            raise HTTPException(status_code=404, detail="No open findings for this threat actor")
+        row["actor"] = row.pop("_id")
+        row["top_vulnerabilities"] = [serialize_doc(dict(vuln, asset_id=str(vuln.get("asset_id")),
+                                                         age_days=vuln_sla.age_days(vuln.get("first_seen"))))
+                                      for vuln in row["top_vulnerabilities"]]
+        return row
+    except HTTPException as he:
+        raise he
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/api/vulnerabilities/exploitability")
+def get_exploitability_counts():
+    try:
+        return {"open_by_exploitability": threat_exposure.exploitability_counts()}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/api/vulnerabilities/aging")
+def get_vuln_aging():
+    """
+    GET /api/vulnerabilities/aging
+    Open findings per severity by age bucket, with SLA days and how many are past due,
+    from the rollup the SLA scheduler maintains (vuln_sla.py).
+    """
+    try:
+        rollup = vuln_sla.rollup()
+        rollup.pop("_id")
+        return rollup
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/api/vulnerabilities/sla-breaches")
+def get_sla_breaches(severity: str = None, limit: int = 50):
+    """
+    GET /api/vulnerabilities/sla-breaches
+    The most recent SLA breach events, newest first.
+    """
+    try:
+        if severity and severity not in vuln_sla.SLA_DAYS:
+            raise HTTPException(status_code=400, detail=f"severity must be one of {', '.join(vuln_sla.SLA_DAYS)}")
+        events = vuln_sla.recent_breaches(max(1, min(limit, 500)), severity)
+        return {"breaches": [serialize_doc(dict(event, vuln_id=str(event["vuln_id"]),
+                                                asset_id=str(event.get("asset_id")))) for event in events]}
+    except HTTPException as he:
+        raise he
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/api/vulnerabilities/queue/stats")
+def get_vuln_queue_stats():
+    try:
+        return vuln_priority.priority_queue.stats()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 # --- 5. NETWORK SUMMARY ---
 @app.get("/api/network/summary")
 def get_network_summary():
     try:
-        total = db.assets.count_documents({})
-        active = db.assets.count_documents({"status": "Active"})
-        critical = db.assets.count_documents({"criticality": "Critical"})
+        counters = asset_counters.get()
         return {
-            "total_assets": total,
-            "active_assets": active,
-            "critical_infrastructure": critical,
+            "total_assets": counters.get("total", 0),
+            "active_assets": counters.get("by_status", {}).get("Active", 0),
+            "critical_infrastructure": counters.get("by_criticality", {}).get("Critical", 0),
             "network_health": "98%"
         }
     except Exception as e:
@@ -197,11 +505,15 @@ def get_network_summary():
 
 # --- 6. EXISTING ROUTERS ---
 
-from routers import auth, metrics, risk, compliance, events, phishing, phishing_simulation, incident_response, executive_report, settings
+_routers_started = time.perf_counter()
+from routers import health, auth, assets, metrics, risk, compliance, events, phishing, phishing_simulation, incident_response, executive_report, settings, imports
+STARTUP_TIMINGS["router_import_ms"] = round((time.perf_counter() - _routers_started) * 1000, 1)
 
+app.include_router(health.router)
 app.include_router(auth.router, prefix="/auth", tags=["auth"])
 app.include_router(metrics.router, prefix="/api", tags=["metrics"])
-# app.include_router(assets.router, prefix="/api", tags=["assets"])          <-- USING LOCAL LOGIC ABOVE
+# Mounted after the local asset routes above, which take precedence for the paths they share.
+app.include_router(assets.router, prefix="/api", tags=["assets"])
 # app.include_router(vulnerabilities.router, prefix="/api", tags=["vulnerabilities"]) <-- USING LOCAL LOGIC ABOVE
 app.include_router(risk.router, prefix="/api", tags=["risk"])
 app.include_router(compliance.router, prefix="/api/compliance", tags=["compliance"])
@@ -211,7 +523,10 @@ app.include_router(phishing_simulation.router, prefix="/api", tags=["phishing-si
 app.include_router(incident_response.router, prefix="/api", tags=["incident-response"])
 app.include_router(executive_report.router, prefix="/api", tags=["executive-report"])
 app.include_router(settings.router, prefix="/api", tags=["settings"])
+app.include_router(imports.router, prefix="/api", tags=["imports"])
 
 @app.get("/")
 def home():
-    return {"message": "CRV360 Unified Backend Running! 🚀"}
\ No newline at end of file
+    return {"message": "CRV360 Unified Backend Running! 🚀"}
+
+STARTUP_TIMINGS["import_ms"] = round((time.perf_counter() - _IMPORT_STARTED) * 1000, 1)
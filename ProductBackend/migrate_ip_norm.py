@@ -0,0 +1,55 @@
+# Backfills ip_norm / ip_version (see ip_index.py) on assets written before they existed.
+#
+#   python migrate_ip_norm.py           # only documents missing ip_norm
+#   python migrate_ip_norm.py --all     # recompute every document (e.g. after a parser fix)
+#
+# Walks the collection in _id order and writes in unordered batches, so it can be
+# interrupted and re-run: finished documents no longer match the filter. Unparseable
+# addresses get ip_norm = null so they aren't rescanned on the next run.
+
+import argparse
+import time
+
+from pymongo import UpdateOne
+
+import ip_index
+from database import db
+
+
+def backfill(recompute=False, batch_size=1000):
+    """Returns {"scanned", "updated", "invalid"}."""
+    query = {"ip": {"$exists": True, "$ne": None}}
+    if not recompute:
+        query["ip_norm"] = {"$exists": False}
+
+    stats = {"scanned": 0, "updated": 0, "invalid": 0}
+    batch = []
+
+    def flush():
+        if batch:
+            stats["updated"] += db["assets"].bulk_write(batch, ordered=False).modified_count
+            batch.clear()
+
+    for asset in db["assets"].find(query, {"ip": 1}).sort("_id", 1).batch_size(batch_size):
+        fields = ip_index.ip_fields(asset["ip"])
+        stats["scanned"] += 1
+        if fields["ip_norm"] is None:
+            stats["invalid"] += 1
+        batch.append(UpdateOne({"_id": asset["_id"]}, {"$set": fields}))
+        if len(batch) >= batch_size:
+            flush()
+            print(f"   … {stats['scanned']:,} scanned")
+    flush()
+    return stats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Backfill normalized IP fields on assets.")
+    parser.add_argument("--all", action="store_true", help="recompute documents that already have ip_norm")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    stats = backfill(recompute=args.all, batch_size=args.batch_size)
+    print(f"✅ Backfilled {stats['updated']:,} of {stats['scanned']:,} assets "
+          f"({stats['invalid']:,} without a valid IP) in {time.perf_counter() - started:.1f}s")
@@ -0,0 +1,175 @@
+# Patch velocity from real status transitions.
+#
+# Every change of a finding's status is recorded as a compact event in
+# vulnerability_events ({kind: "status", vuln_id, from, to, severity, at}), and every
+# remediation (any other status -> Patched) increments the bucket of the UTC day it
+# happened on: one patch_velocity_daily document per day, {_id: "2026-10-19", date,
+# patched, by_severity}. The endpoint reads the buckets of the last WINDOW_DAYS (plus
+# the ROLLING_DAYS before them for the rolling average), a few dozen small documents
+# however long the history is.
+#
+# Event ids are derived from (finding, new status, time) and buckets only count events
+# that were actually inserted, so a replayed transition is never counted twice.
+#
+#   python patch_velocity.py              # events for findings patched before transitions were recorded
+#   python patch_velocity.py rebuild      # recompute every day bucket from the events
+
+import argparse
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+
+from pymongo import ReplaceOne, UpdateOne
+from pymongo.errors import BulkWriteError
+
+import risk_scoring
+import vuln_priority
+from database import db
+from risk_scoring import OPEN_STATUSES
+
+KIND = "status"
+REMEDIATED = "Patched"
+STATUSES = OPEN_STATUSES + [REMEDIATED, "Risk Accepted"]
+BUCKETS = "patch_velocity_daily"
+WINDOW_DAYS = 30
+ROLLING_DAYS = 7
+
+
+def _midnight(at):
+    return datetime(at.year, at.month, at.day)
+
+
+def _event(vuln, from_status, to_status, at):
+    return {
+        "_id": f"{KIND}:{vuln['_id']}:{to_status}:{at:%Y%m%dT%H%M%S%f}",
+        "kind": KIND,
+        "vuln_id": vuln["_id"],
+        "from": from_status,
+        "to": to_status,
+        "severity": vuln.get("severity"),
+        "at": at,
+    }
+
+
+def _by_day(remediations):
+    """{day: Counter(severity)} from (at, severity) pairs."""
+    days = {}
+    for at, severity in remediations:
+        days.setdefault(_midnight(at), Counter())[severity or "Unknown"] += 1
+    return days
+
+
+def record(transitions):
+    """
+    Writes an event per (vuln, from status, to status, at) transition and counts the
+    remediations among them in their day buckets; returns how many events were new.
+    """
+    events = [_event(*transition) for transition in transitions if transition[1] != transition[2]]
+    if not events:
+        return 0
+    try:
+        db["vulnerability_events"].insert_many(events, ordered=False)
+        inserted = events
+    except BulkWriteError as e:
+        errors = e.details.get("writeErrors", [])
+        if any(error.get("code") != 11000 for error in errors):
+            raise
+        replayed = {error["index"] for error in errors}
+        inserted = [event for i, event in enumerate(events) if i not in replayed]
+    days = _by_day((event["at"], event["severity"]) for event in inserted if event["to"] == REMEDIATED)
+    if days:
+        db[BUCKETS].bulk_write([
+            UpdateOne({"_id": f"{day:%Y-%m-%d}"},
+                      {"$inc": {"patched": sum(counts.values()),
+                                **{f"by_severity.{severity}": n for severity, n in counts.items()}},
+                       "$setOnInsert": {"date": day}}, upsert=True)
+            for day, counts in days.items()
+        ], ordered=False)
+    return len(inserted)
+
+
+def set_status(vuln_id, status, at=None):
+    """Moves one finding to `status` and records the transition; returns the finding, or None if it doesn't exist."""
+    at = at or datetime.utcnow()
+    update = {"status": status, "changed_at": at}
+    if status == REMEDIATED:
+        update["patched_at"] = at
+    before = db["vulnerabilities"].find_one_and_update(
+        {"_id": vuln_id, "status": {"$ne": status}}, {"$set": update}, {"status": 1, "severity": 1})
+    after = db["vulnerabilities"].find_one({"_id": vuln_id}, vuln_priority.PROJECTION)
+    if before is not None:
+        record([(before, before.get("status"), status, at)])
+        vuln_priority.priority_queue.apply([after])
+        if after.get("asset_id"):
+            risk_scoring.recompute([after["asset_id"]])
+    return after
+
+
+# ============================================
+# READS
+# ============================================
+
+def velocity(now=None):
+    """Daily remediations over the last WINDOW_DAYS with a ROLLING_DAYS average, plus the totals."""
+    today = _midnight(now or datetime.utcnow())
+    start = today - timedelta(days=WINDOW_DAYS - 1)
+    first = start - timedelta(days=ROLLING_DAYS - 1)
+    patched = {bucket["_id"]: bucket["patched"]
+               for bucket in db[BUCKETS].find({"_id": {"$gte": f"{first:%Y-%m-%d}"}}, {"patched": 1})}
+    daily = [patched.get(f"{first + timedelta(days=i):%Y-%m-%d}", 0)
+             for i in range((today - first).days + 1)]
+    trend = []
+    for i in range(ROLLING_DAYS - 1, len(daily)):
+        day = first + timedelta(days=i)
+        trend.append({"day": f"{day:%m-%d}", "date": day, "patches": daily[i],
+                      "rolling_avg": round(sum(daily[i - ROLLING_DAYS + 1:i + 1]) / ROLLING_DAYS, 1)})
+    total = sum(point["patches"] for point in trend)
+    return {"summary": {"total_30d": total, "avg_daily": round(total / WINDOW_DAYS, 1)}, "trend": trend}
+
+
+# ============================================
+# BACKFILL & REBUILD
+# ============================================
+
+def backfill(batch_size=1000):
+    """Records a remediation for patched findings that have a patched_at but no remediation event."""
+    recorded, last_id = 0, None
+    while True:
+        query = {"status": REMEDIATED, "patched_at": {"$type": "date"}}
+        if last_id is not None:
+            query["_id"] = {"$gt": last_id}
+        batch = list(db["vulnerabilities"].find(query, {"severity": 1, "patched_at": 1})
+                     .sort("_id", 1).limit(batch_size))
+        if not batch:
+            return recorded
+        last_id = batch[-1]["_id"]
+        known = set(db["vulnerability_events"].distinct(
+            "vuln_id", {"vuln_id": {"$in": [vuln["_id"] for vuln in batch]}, "kind": KIND, "to": REMEDIATED}))
+        recorded += record([(vuln, None, REMEDIATED, vuln["patched_at"]) for vuln in batch
+                            if vuln["_id"] not in known])
+
+
+def rebuild():
+    """Recomputes every day bucket from the remediation events; returns the number of days."""
+    days = _by_day((event["at"], event.get("severity")) for event in db["vulnerability_events"].find(
+        {"kind": KIND, "to": REMEDIATED}, {"at": 1, "severity": 1}))
+    db[BUCKETS].delete_many({"_id": {"$nin": [f"{day:%Y-%m-%d}" for day in days]}})
+    if days:
+        db[BUCKETS].bulk_write([
+            ReplaceOne({"_id": f"{day:%Y-%m-%d}"},
+                       {"date": day, "patched": sum(counts.values()), "by_severity": dict(counts)}, upsert=True)
+            for day, counts in days.items()
+        ], ordered=False)
+    return len(days)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Patch velocity events and day buckets.")
+    parser.add_argument("command", nargs="?", choices=["backfill", "rebuild"], default="backfill")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    if args.command == "rebuild":
+        print(f"✅ Rebuilt {rebuild():,} day buckets in {time.perf_counter() - started:.1f}s")
+    else:
+        print(f"✅ Recorded {backfill():,} remediations in {time.perf_counter() - started:.1f}s")
@@ -0,0 +1,69 @@
+# Measures cold start: where `import main` spends its time, and how long the lifespan takes.
+#
+#   python profile_startup.py              # top 25 modules by cumulative import time
+#   python profile_startup.py --top 50 --lifespan
+#
+# Import timing comes from `python -X importtime`, run in a fresh interpreter so
+# nothing is already cached in sys.modules.
+
+import argparse
+import json
+import subprocess
+import sys
+
+
+def import_times(module="main"):
+    """Returns [(cumulative_us, self_us, module)] for a fresh `import module`."""
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                          capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "import failed")
+
+    rows = []
+    for line in proc.stderr.splitlines():
+        # import time:   self [us] | cumulative | imported package
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        rows.append((int(cumulative_us), int(self_us), name.rstrip()))
+    return rows
+
+
+def lifespan_timings():
+    """Runs the app lifespan in a fresh interpreter and returns main.STARTUP_TIMINGS."""
+    code = (
+        "import asyncio, json, main\n"
+        "async def go():\n"
+        "    async with main.lifespan(main.app):\n"
+        "        pass\n"
+        "asyncio.run(go())\n"
+        "print(json.dumps(main.STARTUP_TIMINGS))\n"
+    )
+    proc = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip())
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Profile backend import and startup time.")
+    parser.add_argument("--module", default="main")
+    parser.add_argument("--top", type=int, default=25)
+    parser.add_argument("--lifespan", action="store_true", help="also run the lifespan (needs MongoDB)")
+    args = parser.parse_args()
+
+    rows = import_times(args.module)
+    total = max((row[0] for row in rows), default=0)
+    print(f"\n⏱  import {args.module}: {total / 1000:.1f} ms across {len(rows)} modules\n")
+    print(f"{'CUMULATIVE ms':>14}{'SELF ms':>10}  MODULE")
+    for cumulative_us, self_us, name in sorted(rows, reverse=True)[:args.top]:
+        print(f"{cumulative_us / 1000:>14.1f}{self_us / 1000:>10.1f}  {name}")
+
+    if args.lifespan:
+        print("\n⏱  lifespan phases (ms):")
+        for phase, ms in lifespan_timings().items():
+            print(f"   {phase:<20}{ms:>10}")
+
+
+if __name__ == "__main__":
+    main()
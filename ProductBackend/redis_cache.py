@@ -0,0 +1,210 @@
+# Redis-protocol cache backend, shared by every node behind the load balancer.
+#
+# Entries live in Redis (SET ... PX ttl); each process also keeps a small in-memory
+# copy for a few seconds so hot routes don't pay a network round-trip. Writes evict
+# the Redis keys and PUBLISH the prefix, and every node's subscriber thread drops its
+# local copies, so nobody serves a stale summary after a write elsewhere.
+#
+# Only the handful of RESP2 commands we need are implemented; any Redis-compatible
+# server works, including resp_standin.py for local runs.
+
+import re
+import socket
+import struct
+import threading
+import time
+from urllib.parse import urlsplit
+
+import counters
+from shm_cache import decode_response, encode_response
+
+CHANNEL = "crv360:cache:invalidate"
+NAMESPACE = "crv360:cache:"
+_GLOB_SPECIAL = re.compile(r"([\\*?\[\]])")
+
+
+class RespError(Exception):
+    pass
+
+
+class RespConnection:
+    """One blocking RESP2 connection."""
+
+    def __init__(self, url, timeout=1.0):
+        parts = urlsplit(url)
+        self.host = parts.hostname or "localhost"
+        self.port = parts.port or 6379
+        self.password = parts.password
+        self.db = int(parts.path.strip("/") or 0)
+        self.timeout = timeout
+        self._sock = None
+        self._reader = None
+
+    def connect(self):
+        self._sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        self._sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._reader = self._sock.makefile("rb")
+        if self.password:
+            self.command("AUTH", self.password)
+        if self.db:
+            self.command("SELECT", self.db)
+
+    def close(self):
+        if self._sock is not None:
+            try:
+                self._reader.close()
+                self._sock.close()
+            finally:
+                self._sock = self._reader = None
+
+    def send(self, *args):
+        if self._sock is None:
+            self.connect()
+        out = [b"*%d\r\n" % len(args)]
+        for arg in args:
+            if not isinstance(arg, bytes):
+                arg = str(arg).encode()
+            out.append(b"$%d\r\n%s\r\n" % (len(arg), arg))
+        self._sock.sendall(b"".join(out))
+
+    def read(self):
+        line = self._reader.readline()
+        if not line:
+            raise ConnectionError("connection closed by server")
+        kind, rest = line[:1], line[1:-2]
+        if kind == b"+":
+            return rest
+        if kind == b"-":
+            raise RespError(rest.decode())
+        if kind == b":":
+            return int(rest)
+        if kind == b"$":
+            length = int(rest)
+            if length < 0:
+                return None
+            data = self._reader.read(length + 2)
+            return data[:-2]
+        if kind == b"*":
+            length = int(rest)
+            return None if length < 0 else [self.read() for _ in range(length)]
+        raise RespError(f"unexpected reply {line!r}")
+
+    def command(self, *args):
+        try:
+            self.send(*args)
+            return self.read()
+        except (OSError, ConnectionError):
+            self.close()  # reconnect on next use
+            raise
+
+
+class RedisCache:
+    """
+    Same interface as cache.TTLCache. Backend errors count as misses (and are counted),
+    never as request failures: the cache is an optimization.
+    """
+
+    blocking = True  # socket I/O: cache.py calls it from the threadpool
+
+    def __init__(self, url, local_ttl=5.0, timeout=0.5):
+        from cache import TTLCache
+
+        self.url = url
+        self.local_ttl = local_ttl
+        self.timeout = timeout
+        self.local = TTLCache()
+        self.hits = 0
+        self.misses = 0
+        self._conn = RespConnection(url, timeout)
+        self._lock = threading.Lock()
+        self._subscriber = None
+        self._down_until = 0.0
+
+    def _command(self, *args):
+        # After a failure, skip Redis for a second rather than making every request wait on it.
+        if time.monotonic() < self._down_until:
+            raise ConnectionError("redis unavailable, backing off")
+        with self._lock:
+            try:
+                return self._conn.command(*args)
+            except (OSError, ConnectionError):
+                self._down_until = time.monotonic() + 1.0
+                raise
+
+    def _ensure_subscriber(self):
+        # Started lazily so it belongs to the worker process, not a pre-fork parent.
+        if self._subscriber is None or not self._subscriber.is_alive():
+            self._subscriber = threading.Thread(target=self._listen, name="cache-invalidation", daemon=True)
+            self._subscriber.start()
+
+    def _listen(self):
+        while True:
+            conn = RespConnection(self.url, timeout=None)
+            try:
+                conn.send("SUBSCRIBE", CHANNEL)
+                while True:
+                    message = conn.read()
+                    if message and message[0] == b"message":
+                        self.local.invalidate(message[2].decode())
+            except (OSError, ConnectionError, RespError):
+                counters.incr("cache_backend_error", "subscribe")
+                # While we can't hear invalidations, local copies could go stale: drop them.
+                self.local.invalidate()
+                time.sleep(1)
+            finally:
+                conn.close()
+
+    def get(self, key):
+        """Returns (value, stored_at) or None."""
+        self._ensure_subscriber()
+        hit = self.local.get(key)
+        if hit is not None:
+            self.hits += 1
+            return hit
+        try:
+            data = self._command("GET", NAMESPACE + key)
+        except (OSError, ConnectionError, RespError):
+            counters.incr("cache_backend_error", "get")
+            data = None
+        if data is None:
+            self.misses += 1
+            return None
+        stored_at, expires_at = struct.unpack_from("<dd", data, 0)
+        value = decode_response(data[16:])
+        self.local.set(key, value, min(self.local_ttl, max(0.0, expires_at - time.time())))
+        self.hits += 1
+        return value, stored_at
+
+    def set(self, key, value, ttl):
+        now = time.time()
+        self.local.set(key, value, min(self.local_ttl, ttl))
+        try:
+            self._command("SET", NAMESPACE + key, struct.pack("<dd", now, now + ttl) + encode_response(value),
+                          "PX", int(ttl * 1000))
+        except (OSError, ConnectionError, RespError):
+            counters.incr("cache_backend_error", "set")
+
+    def invalidate(self, prefix=""):
+        """Deletes matching keys in Redis and tells every node to drop its local copies."""
+        # Local copies are copies of Redis keys, so only the Redis deletions are counted
+        # (the local ones when Redis can't be reached).
+        local = self.local.invalidate(prefix)
+        evicted = 0
+        try:
+            cursor = b"0"
+            pattern = NAMESPACE + _GLOB_SPECIAL.sub(r"\\\1", prefix) + "*"
+            while True:
+                cursor, keys = self._command("SCAN", cursor, "MATCH", pattern, "COUNT", 500)
+                if keys:
+                    evicted += self._command("DEL", *keys)
+                if cursor in (b"0", 0):
+                    break
+            self._command("PUBLISH", CHANNEL, prefix)
+        except (OSError, ConnectionError, RespError):
+            counters.incr("cache_backend_error", "invalidate")
+            return local
+        return evicted
+
+    def stats(self):
+        return {"entries": self.local.stats()["entries"], "hits": self.hits, "misses": self.misses,
+                "backend": "redis", "url": f"{self._conn.host}:{self._conn.port}/{self._conn.db}"}
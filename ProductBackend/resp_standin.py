@@ -0,0 +1,149 @@
+# In-memory stand-in for the Redis commands redis_cache.py uses, for local runs
+# without a Redis server:
+#
+#   python resp_standin.py --port 6390
+#   CACHE_BACKEND=redis REDIS_URL=redis://127.0.0.1:6390/0 uvicorn main:app --port 8001
+#   CACHE_BACKEND=redis REDIS_URL=redis://127.0.0.1:6390/0 uvicorn main:app --port 8002
+#
+# Supports PING, AUTH, SELECT, GET, SET (EX/PX), DEL, SCAN (MATCH), FLUSHDB, PUBLISH
+# and SUBSCRIBE. Single process, not persistent, no auth checks.
+
+import argparse
+import asyncio
+import fnmatch
+import re
+import time
+
+
+class Store:
+    def __init__(self):
+        self.data = {}  # key -> (value, expires_at or None)
+        self.subscribers = {}  # channel -> set of StreamWriter
+
+    def get(self, key):
+        entry = self.data.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at is not None and expires_at < time.monotonic():
+            del self.data[key]
+            return None
+        return value
+
+
+def _encode(reply):
+    if reply is None:
+        return b"$-1\r\n"
+    if isinstance(reply, int):
+        return b":%d\r\n" % reply
+    if isinstance(reply, str):
+        return b"+%s\r\n" % reply.encode()
+    if isinstance(reply, Exception):
+        return b"-ERR %s\r\n" % str(reply).encode()
+    if isinstance(reply, list):
+        return b"*%d\r\n" % len(reply) + b"".join(_encode(item) for item in reply)
+    return b"$%d\r\n%s\r\n" % (len(reply), reply)
+
+
+async def _read_command(reader):
+    line = await reader.readline()
+    if not line:
+        return None
+    if not line.startswith(b"*"):
+        return line.strip().split()  # inline command, e.g. from telnet
+    args = []
+    for _ in range(int(line[1:])):
+        length = int((await reader.readline())[1:])
+        args.append((await reader.readexactly(length + 2))[:-2])
+    return args
+
+
+def _glob(pattern):
+    # Redis escapes glob characters with a backslash; fnmatch only with brackets.
+    return re.sub(rb"\\(.)", lambda m: b"[" + m.group(1) + b"]", pattern)
+
+
+def _execute(store, writer, args):
+    name = args[0].upper()
+    if name == b"PING":
+        return "PONG"
+    if name in (b"AUTH", b"SELECT"):
+        return "OK"
+    if name == b"GET":
+        return store.get(args[1])
+    if name == b"SET":
+        expires_at = None
+        options = [a.upper() for a in args[3::2]]
+        for option, value in zip(options, args[4::2]):
+            if option == b"PX":
+                expires_at = time.monotonic() + int(value) / 1000
+            elif option == b"EX":
+                expires_at = time.monotonic() + int(value)
+        store.data[args[1]] = (args[2], expires_at)
+        return "OK"
+    if name == b"DEL":
+        return sum(1 for key in args[1:] if store.data.pop(key, None) is not None)
+    if name == b"SCAN":
+        pattern = b"*"
+        for option, value in zip(args[2::2], args[3::2]):
+            if option.upper() == b"MATCH":
+                pattern = _glob(value)
+        keys = [k for k in list(store.data) if store.get(k) is not None and fnmatch.fnmatchcase(k, pattern)]
+        return [b"0", keys]
+    if name == b"FLUSHDB":
+        store.data.clear()
+        return "OK"
+    if name == b"PUBLISH":
+        receivers = store.subscribers.get(args[1], set())
+        for subscriber in list(receivers):
+            subscriber.write(_encode([b"message", args[1], args[2]]))
+        return len(receivers)
+    if name == b"SUBSCRIBE":
+        for count, channel in enumerate(args[1:], start=1):
+            store.subscribers.setdefault(channel, set()).add(writer)
+            writer.write(_encode([b"subscribe", channel, count]))
+        return ...
+    return Exception(f"unknown command '{name.decode()}'")
+
+
+async def _serve_client(store, reader, writer):
+    try:
+        while True:
+            args = await _read_command(reader)
+            if args is None:
+                break
+            if not args:
+                continue
+            reply = _execute(store, writer, args)
+            if reply is not ...:
+                writer.write(_encode(reply))
+            await writer.drain()
+    except (ConnectionError, asyncio.IncompleteReadError):
+        pass
+    finally:
+        for subscribers in store.subscribers.values():
+            subscribers.discard(writer)
+        writer.close()
+
+
+async def serve(host, port):
+    store = Store()
+    server = await asyncio.start_server(lambda r, w: _serve_client(store, r, w), host, port)
+    print(f"🧪 RESP stand-in listening on {host}:{port}")
+    async with server:
+        await server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tiny in-memory Redis stand-in for local cache testing.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=6390)
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
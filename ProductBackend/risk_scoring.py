@@ -0,0 +1,146 @@
+# Per-asset risk scores from linked vulnerabilities, computed in NumPy.
+#
+#   v        = cvss / 10 * EXPLOITABILITY_WEIGHTS[exploitability] * (0.5 + exposure_score / 200)
+#   exposure = 1 - prod(1 - v)        over the asset's open vulnerabilities
+#   score    = 10 * CRITICALITY_WEIGHTS[criticality] * BUSINESS_UNIT_WEIGHTS[business_unit]
+#                 * (BASELINE + (1 - BASELINE) * exposure)            capped at 10, 0.1 steps
+#
+# exposure is a noisy-OR: every open finding raises it, with diminishing returns, and
+# one critical exploited finding counts for more than many informational ones. The
+# product is taken as a sum of logs so the whole inventory is one np.bincount.
+#
+# recompute() with no ids scores every asset (after bulk loads); with ids it scores only
+# those, which is what writers call after touching an asset's vulnerabilities. Only
+# scores that moved are written back.
+#
+#   python risk_scoring.py        # rescore the whole inventory
+
+import os
+import time
+from array import array
+from datetime import datetime
+
+from pymongo import UpdateOne
+
+import asset_counters
+from database import db
+
+CRITICALITY_WEIGHTS = {"Critical": 1.0, "High": 0.8, "Medium": 0.6, "Low": 0.4}
+DEFAULT_CRITICALITY_WEIGHT = 0.6
+
+EXPLOITABILITY_WEIGHTS = {"Exploited in Wild": 1.0, "Weaponized": 0.85, "PoC Available": 0.6, "None": 0.35}
+DEFAULT_EXPLOITABILITY_WEIGHT = 0.35
+
+BUSINESS_UNIT_WEIGHTS = {
+    "Finance": 1.2,
+    "Executive": 1.2,
+    "Customer Services": 1.1,
+    "Production": 1.1,
+    "Legal": 1.05,
+    "Development": 0.9,
+    "Backup & DR": 0.9,
+}
+DEFAULT_BUSINESS_UNIT_WEIGHT = 1.0
+
+# Share of an asset's score that its criticality alone accounts for, with no open findings.
+BASELINE = 0.15
+OPEN_STATUSES = ["Open", "In Progress"]
+# Smaller movements aren't worth a write (scores are shown to one decimal).
+MIN_CHANGE = 0.05
+WRITE_BATCH = int(os.getenv("RISK_WRITE_BATCH", "1000"))
+
+_ASSET_FIELDS = {"criticality": 1, "business_unit": 1, "risk_score": 1, "open_vulns": 1,
+                 **{field: 1 for field in asset_counters.GROUPED_FIELDS}}
+_VULN_FIELDS = {"_id": 0, "asset_id": 1, "cvss": 1, "exploitability": 1, "exposure_score": 1}
+
+
+def _number(value, default=0.0):
+    return float(value) if isinstance(value, (int, float)) and not isinstance(value, bool) else default
+
+
+def estimate_exposure(cvss, exploitability):
+    """0-100 exposure for findings that come without one: severity, plus a bump once an exploit exists."""
+    return min(100, int(_number(cvss, 5.0) * 8 + (20 if exploitability not in (None, "None") else 0)))
+
+
+def vulnerability_score(cvss, exploitability, exposure_score):
+    """One finding's own 0-10 score: the v above, scaled."""
+    v = (min(max(_number(cvss) / 10.0, 0.0), 1.0)
+         * EXPLOITABILITY_WEIGHTS.get(exploitability, DEFAULT_EXPLOITABILITY_WEIGHT)
+         * (0.5 + min(max(_number(exposure_score, 50.0), 0), 100) / 200.0))
+    return round(10.0 * v, 1)
+
+
+def score(criticality_w, business_unit_w, positions, cvss, exploit_w, exposure_score):
+    """
+    (scores, open_counts) per asset. The first two arrays are per asset; the last four
+    are per vulnerability, `positions` giving each one's asset index.
+    """
+    import numpy as np
+
+    n = len(criticality_w)
+    v = np.clip(cvss / 10.0, 0.0, 1.0) * exploit_w * (0.5 + np.clip(exposure_score, 0, 100) / 200.0)
+    log_miss = np.bincount(positions, weights=np.log1p(-np.minimum(v, 0.999)), minlength=n)
+    exposure = 1.0 - np.exp(log_miss)
+    raw = 10.0 * criticality_w * business_unit_w * (BASELINE + (1.0 - BASELINE) * exposure)
+    return np.round(np.minimum(raw, 10.0), 1), np.bincount(positions, minlength=n)
+
+
+def recompute(asset_ids=None):
+    """Rescores `asset_ids` (every asset when None) and writes back what changed."""
+    # NumPy is only needed here, so keep it out of app startup
+    import numpy as np
+
+    started = time.perf_counter()
+    asset_query = {} if asset_ids is None else {"_id": {"$in": list(asset_ids)}}
+    assets = list(db["assets"].find(asset_query, _ASSET_FIELDS))
+    position = {asset["_id"]: i for i, asset in enumerate(assets)}
+    criticality_w = np.fromiter((CRITICALITY_WEIGHTS.get(a.get("criticality"), DEFAULT_CRITICALITY_WEIGHT)
+                                 for a in assets), dtype=float, count=len(assets))
+    business_unit_w = np.fromiter((BUSINESS_UNIT_WEIGHTS.get(a.get("business_unit"), DEFAULT_BUSINESS_UNIT_WEIGHT)
+                                   for a in assets), dtype=float, count=len(assets))
+
+    vuln_query = {"status": {"$in": OPEN_STATUSES}}
+    if asset_ids is not None:
+        vuln_query["asset_id"] = asset_query["_id"]
+    positions, cvss, exploit_w, exposure = array("q"), array("d"), array("d"), array("d")
+    for vuln in db["vulnerabilities"].find(vuln_query, _VULN_FIELDS).batch_size(10000):
+        i = position.get(vuln.get("asset_id"))
+        if i is None:
+            continue  # orphaned finding
+        positions.append(i)
+        cvss.append(_number(vuln.get("cvss")))
+        exploit_w.append(EXPLOITABILITY_WEIGHTS.get(vuln.get("exploitability"), DEFAULT_EXPLOITABILITY_WEIGHT))
+        exposure.append(_number(vuln.get("exposure_score"), 50.0))
+
+    scores, open_counts = score(criticality_w, business_unit_w, np.frombuffer(positions, dtype=np.int64),
+                                np.frombuffer(cvss), np.frombuffer(exploit_w), np.frombuffer(exposure))
+
+    old = np.fromiter((_number(a.get("risk_score"), np.nan) for a in assets), dtype=float, count=len(assets))
+    old_counts = np.fromiter((_number(a.get("open_vulns"), -1) for a in assets), dtype=float, count=len(assets))
+    changed = np.flatnonzero(~(np.abs(scores - old) < MIN_CHANGE) | (open_counts != old_counts))
+
+    now = datetime.utcnow()
+    ops, pairs = [], []
+    for i in changed:
+        before = assets[i]
+        after = dict(before, risk_score=float(scores[i]), open_vulns=int(open_counts[i]))
+        ops.append(UpdateOne({"_id": before["_id"]}, {"$set": {"risk_score": after["risk_score"],
+                                                                "open_vulns": after["open_vulns"],
+                                                                "risk_scored_at": now}}))
+        pairs.append((before, after))
+        if len(ops) >= WRITE_BATCH:
+            db["assets"].bulk_write(ops, ordered=False)
+            ops = []
+    if ops:
+        db["assets"].bulk_write(ops, ordered=False)
+    asset_counters.on_changes(updated=pairs)  # keeps the average risk in the summary exact
+
+    return {"assets": len(assets), "vulnerabilities": len(positions), "updated": len(pairs),
+            "ms": round((time.perf_counter() - started) * 1000, 1)}
+
+
+if __name__ == "__main__":
+    stats = recompute()
+    print(f"✅ Scored {stats['assets']:,} assets from {stats['vulnerabilities']:,} open vulnerabilities "
+          f"({stats['updated']:,} changed) in {stats['ms'] / 1000:.1f}s")
@@ -1,17 +1,26 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, HTTPException, Query
+from bson import ObjectId
+from datetime import datetime, timezone
+import re
+
+import asset_counters
+import asset_history
+import ip_index
+import risk_scoring
 from database import db
 
 router = APIRouter()
 
 @router.get("/assets/summary")
-async def get_asset_summary():
-    assets = db["assets"]
-    total = assets.count_documents({})
-    critical_actions = assets.count_documents({"exposure_level": "Critical"})
-    avg_risk = list(assets.aggregate([
-        {"$group": {"_id": None, "avg": {"$avg": "$risk_score"}}}
-    ]))[0]["avg"] if total > 0 else 0
-    compliance_rate = round((assets.count_documents({"compliance_status": "Compliant"}) / total) * 100, 1) if total > 0 else 0
+def get_asset_summary():
+    # O(1): reads the incrementally maintained counters instead of scanning assets
+    counters = asset_counters.get()
+    total = counters.get("total", 0)
+    critical_actions = counters.get("by_exposure_level", {}).get("Critical", 0)
+    scored = counters.get("risk_score_count", 0)
+    avg_risk = counters.get("risk_score_sum", 0) / scored if scored else 0
+    compliant = counters.get("by_compliance_status", {}).get("Compliant", 0)
+    compliance_rate = round((compliant / total) * 100, 1) if total > 0 else 0
 
     return {
         "total_assets": total,
@@ -21,16 +30,335 @@ async def get_asset_summary():
     }
 
 @router.get("/assets/distribution")
-async def get_asset_distribution():
+def get_asset_distribution():
     collection = db["asset_categories"]
     return list(collection.find({}, {"_id": 0}))
 
 @router.get("/assets/top-risk")
-async def get_top_risk_assets():
+def get_top_risk_assets():
     collection = db["risky_assets"]
     return list(collection.find({}, {"_id": 0}).limit(3))
 
 @router.get("/assets/inventory")
-async def get_asset_inventory():
+def get_asset_inventory():
     collection = db["assets"]
-    return list(collection.find({}, {"_id": 0}))
\ No newline at end of file
+    return list(collection.find({}, {"_id": 0}))
+@router.post("/assets/risk/recompute")
+def recompute_asset_risk():
+    """
+    POST /api/assets/risk/recompute
+    Rescores every asset from its open vulnerabilities (see risk_scoring.py).
+    Writers rescore the assets they touch; this is for weight changes and bulk loads.
+    """
+    try:
+        return risk_scoring.recompute()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+# ============================================
+# FACETED SEARCH
+# ============================================
+
+# Query parameter -> asset field. Every one is both a filter and a facet panel.
+FACETS = {
+    "type": "type",
+    "criticality": "criticality",
+    "business_unit": "business_unit",
+    "owner": "owner",
+    "location": "location",
+    "status": "status",
+}
+
+SORTS = {
+    "name": [("name", 1)],
+    "-name": [("name", -1)],
+    "risk": [("risk_score", 1)],
+    "-risk": [("risk_score", -1)],
+    "newest": [("created_at", -1)],
+}
+
+MAX_PAGE_SIZE = 200
+# Facet label (and listed value) for assets without the field; filtering on it matches them.
+UNKNOWN = "Unknown"
+
+
+def _search_filter(q, selected, skip=None):
+    query = {}
+    for param, values in selected.items():
+        if values and param != skip:
+            values = [None if value == UNKNOWN else value for value in values]
+            query[FACETS[param]] = values[0] if len(values) == 1 else {"$in": values}
+    if q:
+        query["name"] = {"$regex": "^" + re.escape(q), "$options": "i"}
+    return query
+
+
+def _label(value):
+    return UNKNOWN if value is None else value
+
+
+def _format_asset(asset):
+    return {
+        "id": str(asset["_id"]),
+        "name": asset.get("name", "Unknown Asset"),
+        "ip_address": asset.get("ip", "0.0.0.0"),
+        "type": _label(asset.get("type")),
+        "criticality": _label(asset.get("criticality")),
+        "status": _label(asset.get("status")),
+        "owner": _label(asset.get("owner")),
+        "business_unit": _label(asset.get("business_unit")),
+        "location": _label(asset.get("location")),
+        "risk_score": asset.get("risk_score"),
+    }
+
+
+@router.get("/assets/search")
+def search_assets(
+    q: str = Query(None, description="Name prefix (case-insensitive)"),
+    type: str = Query(None),
+    criticality: str = Query(None),
+    business_unit: str = Query(None),
+    owner: str = Query(None),
+    location: str = Query(None),
+    status: str = Query(None),
+    sort: str = Query("name"),
+    page: int = Query(1, ge=1),
+    page_size: int = Query(50, ge=1, le=MAX_PAGE_SIZE),
+):
+    """
+    GET /api/assets/search?type=Server,Database&criticality=High&page=2
+
+    One page of matching assets plus, for every filter panel, the counts of each value
+    under all the other filters (so picking a value doesn't zero its siblings), all from
+    a single $facet aggregation.
+    Comma-separated values in a filter are OR'ed; different filters are AND'ed.
+    """
+    try:
+        if sort not in SORTS:
+            raise HTTPException(status_code=400, detail=f"sort must be one of: {', '.join(SORTS)}")
+
+        raw = {"type": type, "criticality": criticality, "business_unit": business_unit,
+               "owner": owner, "location": location, "status": status}
+        selected = {param: [v.strip() for v in value.split(",") if v.strip()] if value else []
+                    for param, value in raw.items()}
+
+        matched = _search_filter(None, selected)
+        facet_stages = {
+            "results": [
+                {"$match": matched},
+                {"$sort": dict(SORTS[sort] + [("_id", 1)])},
+                {"$skip": (page - 1) * page_size},
+                {"$limit": page_size},
+            ],
+            "total": [{"$match": matched}, {"$count": "count"}],
+        }
+        for param, field in FACETS.items():
+            facet_stages[param] = [
+                {"$match": _search_filter(None, selected, skip=param)},
+                {"$group": {"_id": f"${field}", "count": {"$sum": 1}}},
+                {"$sort": {"count": -1, "_id": 1}},
+            ]
+
+        # The $match runs first so it can use the indexes declared in indexes.py. It keeps
+        # what every branch needs: assets missing at most one of the selected filters.
+        active = [param for param, values in selected.items() if values]
+        prefilter = _search_filter(q, {})
+        if len(active) > 1:
+            prefilter["$or"] = [_search_filter(None, selected, skip=param) for param in active]
+        pipeline = [{"$match": prefilter}, {"$facet": facet_stages}]
+        result = next(db["assets"].aggregate(pipeline), {})
+
+        total = result["total"][0]["count"] if result.get("total") else 0
+        return {
+            "assets": [_format_asset(asset) for asset in result.get("results", [])],
+            "total": total,
+            "page": page,
+            "page_size": page_size,
+            "pages": (total + page_size - 1) // page_size,
+            "facets": {
+                param: [{"value": _label(group["_id"]), "count": group["count"]}
+                        for group in result.get(param, [])]
+                for param in FACETS
+            },
+        }
+    except HTTPException as he:
+        raise he
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+# ============================================
+# IP / CIDR LOOKUP
+# ============================================
+# All three are range scans over the ip_norm index (see ip_index.py).
+
+MAX_IP_RESULTS = 1000
+
+
+def _ip_results(query, limit):
+    cursor = db["assets"].find(query).sort([("ip_norm", 1), ("_id", 1)]).limit(limit + 1)
+    assets = [dict(_format_asset(asset), ip_version=asset.get("ip_version")) for asset in cursor]
+    return {"assets": assets[:limit], "count": min(len(assets), limit), "truncated": len(assets) > limit}
+
+
+@router.get("/assets/by-ip")
+def get_assets_by_ip(ip: str = Query(..., description="IPv4 or IPv6 address")):
+    """
+    GET /api/assets/by-ip?ip=10.0.5.20
+    Assets with exactly this address, however it was written when stored.
+    """
+    try:
+        ip_norm, _ = ip_index.normalize(ip)
+        if ip_norm is None:
+            raise HTTPException(status_code=400, detail=f"Invalid IP address: {ip}")
+        return _ip_results({"ip_norm": ip_norm}, MAX_IP_RESULTS)
+    except HTTPException as he:
+        raise he
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/assets/cidr")
+def get_assets_in_cidr(
+    cidr: str = Query(..., description="Network, e.g. 10.0.0.0/16 or 2001:db8::/32"),
+    limit: int = Query(200, ge=1, le=MAX_IP_RESULTS),
+):
+    """
+    GET /api/assets/cidr?cidr=10.0.0.0/16
+    Assets inside a network, in address order.
+    """
+    try:
+        try:
+            low, high = ip_index.cidr_bounds(cidr)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=f"Invalid CIDR: {e}")
+        return dict(_ip_results({"ip_norm": {"$gte": low, "$lte": high}}, limit), cidr=cidr)
+    except HTTPException as he:
+        raise he
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/assets/ip-range")
+def get_assets_in_ip_range(
+    start: str = Query(..., description="First address (inclusive)"),
+    end: str = Query(..., description="Last address (inclusive)"),
+    limit: int = Query(200, ge=1, le=MAX_IP_RESULTS),
+):
+    """
+    GET /api/assets/ip-range?start=10.0.5.0&end=10.0.5.127
+    Assets between two addresses of the same family, in address order.
+    """
+    try:
+        try:
+            low, high = ip_index.range_bounds(start, end)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        return _ip_results({"ip_norm": {"$gte": low, "$lte": high}}, limit)
+    except HTTPException as he:
+        raise he
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+# ============================================
+# HISTORY / POINT-IN-TIME
+# ============================================
+# See asset_history.py. Times are UTC; offsets in `at` are honoured.
+
+def _utc(at):
+    if at.tzinfo is not None:
+        at = at.astimezone(timezone.utc).replace(tzinfo=None)
+    return at
+
+
+def _as_of_doc(doc):
+    doc = dict(doc)
+    return dict(id=str(doc.pop("_id")), **doc)
+
+
+def _history_entry(entry):
+    formatted = {"seq": entry["seq"], "at": entry["at"], "kind": entry["kind"]}
+    if entry["kind"] == asset_history.DELTA:
+        formatted["set"] = entry.get("set", {})
+        formatted["unset"] = entry.get("unset", [])
+    elif entry.get("doc") is not None:
+        formatted["doc"] = entry["doc"]
+    return formatted
+
+
+@router.get("/assets/history/storage")
+def get_asset_history_storage():
+    """
+    GET /api/assets/history/storage
+    Size of the asset change history by entry kind, next to the live inventory's size.
+    """
+    try:
+        return asset_history.storage_report()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/assets/as-of")
+def get_inventory_as_of(
+    at: datetime = Query(..., description="ISO timestamp, e.g. 2025-06-30T23:59:59Z"),
+    after: str = Query(None, description="next_after from the previous page"),
+    limit: int = Query(100, ge=1, le=500),
+):
+    """
+    GET /api/assets/as-of?at=2025-06-30T23:59:59Z
+    The inventory as it was at `at`, one page at a time.
+    """
+    try:
+        if after is not None and not ObjectId.is_valid(after):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        assets, next_after = asset_history.inventory_as_of(_utc(at), ObjectId(after) if after else None, limit)
+        return {
+            "at": at,
+            "assets": [_as_of_doc(doc) for doc in assets],
+            "next_after": str(next_after) if next_after else None,
+        }
+    except HTTPException as he:
+        raise he
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/assets/{asset_id}/as-of")
+def get_asset_as_of(asset_id: str, at: datetime = Query(..., description="ISO timestamp")):
+    """
+    GET /api/assets/{asset_id}/as-of?at=2025-06-30T23:59:59Z
+    One asset as it was at `at`.
+    """
+    try:
+        if not ObjectId.is_valid(asset_id):
+            raise HTTPException(status_code=400, detail="Invalid asset id")
+        doc = asset_history.as_of(ObjectId(asset_id), _utc(at))
+        if doc is None:
+            raise HTTPException(status_code=404, detail="Asset did not exist at that time")
+        return _as_of_doc(doc)
+    except HTTPException as he:
+        raise he
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/assets/{asset_id}/history")
+def get_asset_history(
+    asset_id: str,
+    before_seq: int = Query(None, description="Only entries older than this sequence number"),
+    limit: int = Query(50, ge=1, le=500),
+):
+    """
+    GET /api/assets/{asset_id}/history
+    The asset's change log, newest first: creation, changed fields, snapshots, deletion.
+    """
+    try:
+        if not ObjectId.is_valid(asset_id):
+            raise HTTPException(status_code=400, detail="Invalid asset id")
+        entries = asset_history.changes_for(ObjectId(asset_id), before_seq, limit)
+        return {"asset_id": asset_id, "entries": [_history_entry(entry) for entry in entries]}
+    except HTTPException as he:
+        raise he
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
@@ -1,15 +1,7 @@
 from fastapi import APIRouter, HTTPException, Query
-from pymongo import MongoClient
 from datetime import datetime
-import os
-from dotenv import load_dotenv
 
-load_dotenv()
-
-# MongoDB Connection
-MONGO_URI = os.getenv("MONGODB_URI", "mongodb://localhost:27017/")
-client = MongoClient(MONGO_URI)
-db = client["product"]
+from database import db
 
 # Create router
 router = APIRouter()
@@ -35,7 +27,7 @@ class ComplianceAction:
 # ============================================
 
 @router.get("/frameworks")
-async def get_all_frameworks():
+def get_all_frameworks():
     """
     GET /api/compliance/frameworks
     
@@ -56,7 +48,7 @@ async def get_all_frameworks():
 
 
 @router.get("/frameworks/{framework_id}")
-async def get_framework_details(framework_id: str):
+def get_framework_details(framework_id: str):
     """
     GET /api/compliance/frameworks/{framework_id}
     
@@ -87,7 +79,7 @@ async def get_framework_details(framework_id: str):
 # ============================================
 
 @router.get("/violations")
-async def get_all_violations(severity: str = Query(None)):
+def get_all_violations(severity: str = Query(None)):
     """
     GET /api/compliance/violations
     
@@ -115,7 +107,7 @@ async def get_all_violations(severity: str = Query(None)):
 
 
 @router.get("/violations/{violation_id}")
-async def get_violation_details(violation_id: int):
+def get_violation_details(violation_id: int):
     """
     GET /api/compliance/violations/{violation_id}
     
@@ -144,7 +136,7 @@ async def get_violation_details(violation_id: int):
 
 
 @router.post("/violations/{violation_id}/status")
-async def update_violation_status(violation_id: int, new_status: str):
+def update_violation_status(violation_id: int, new_status: str):
     """
     POST /api/compliance/violations/{violation_id}/status
     
@@ -193,7 +185,7 @@ async def update_violation_status(violation_id: int, new_status: str):
 # ============================================
 
 @router.get("/actions")
-async def get_all_actions(priority: str = Query(None)):
+def get_all_actions(priority: str = Query(None)):
     """
     GET /api/compliance/actions
     
@@ -221,7 +213,7 @@ async def get_all_actions(priority: str = Query(None)):
 
 
 @router.post("/actions/{action_id}/take-action")
-async def take_action(action_id: int, assigned_to: str = None):
+def take_action(action_id: int, assigned_to: str = None):
     """
     POST /api/compliance/actions/{action_id}/take-action
     
@@ -266,7 +258,7 @@ async def take_action(action_id: int, assigned_to: str = None):
 
 
 @router.post("/actions/{action_id}/complete")
-async def complete_action(action_id: int):
+def complete_action(action_id: int):
     """
     POST /api/compliance/actions/{action_id}/complete
     
@@ -310,7 +302,7 @@ async def complete_action(action_id: int):
 # ============================================
 
 @router.get("/evidence")
-async def get_evidence_intelligence():
+def get_evidence_intelligence():
     """
     GET /api/compliance/evidence
     
@@ -338,7 +330,7 @@ async def get_evidence_intelligence():
 
 
 @router.post("/evidence/generate-gap-report")
-async def generate_gap_report():
+def generate_gap_report():
     """
     POST /api/compliance/evidence/generate-gap-report
     
@@ -389,7 +381,7 @@ async def generate_gap_report():
 
 
 @router.get("/evidence/gap-reports")
-async def get_gap_reports():
+def get_gap_reports():
     """
     GET /api/compliance/evidence/gap-reports
     
@@ -413,7 +405,7 @@ async def get_gap_reports():
 # ============================================
 
 @router.get("/controls")
-async def get_all_controls():
+def get_all_controls():
     """
     GET /api/compliance/controls
     
@@ -500,7 +492,7 @@ async def get_all_controls():
 # ============================================
 
 @router.get("/executive-kpis")
-async def get_executive_kpis():
+def get_executive_kpis():
     """
     GET /api/compliance/executive-kpis
     
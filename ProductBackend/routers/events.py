@@ -1,14 +1,7 @@
 from fastapi import APIRouter, HTTPException, Query
-from pymongo import MongoClient
 from datetime import datetime
-import os
-from dotenv import load_dotenv
 
-load_dotenv()
-
-MONGO_URI = os.getenv("MONGODB_URI", "mongodb://localhost:27017/")
-client = MongoClient(MONGO_URI)
-db = client["product"]
+from database import db
 
 router = APIRouter(prefix="/events", tags=["events"])
 
@@ -17,7 +10,7 @@ router = APIRouter(prefix="/events", tags=["events"])
 # ============================================
 
 @router.get("/campaigns")
-async def get_all_campaigns(severity: str = Query(None)):
+def get_all_campaigns(severity: str = Query(None)):
     """
     GET /api/events/campaigns
     
@@ -39,7 +32,7 @@ async def get_all_campaigns(severity: str = Query(None)):
 
 
 @router.get("/campaigns/{campaign_id}")
-async def get_campaign_details(campaign_id: str):
+def get_campaign_details(campaign_id: str):
     """
     GET /api/events/campaigns/{campaign_id}
     
@@ -61,7 +54,7 @@ async def get_campaign_details(campaign_id: str):
 
 
 @router.post("/campaigns/{campaign_id}/launch-response")
-async def launch_incident_response(campaign_id: str):
+def launch_incident_response(campaign_id: str):
     """
     POST /api/events/campaigns/{campaign_id}/launch-response
     
@@ -99,7 +92,7 @@ async def launch_incident_response(campaign_id: str):
 
 
 @router.get("/campaigns/{campaign_id}/related-alerts")
-async def get_campaign_alerts(campaign_id: str):
+def get_campaign_alerts(campaign_id: str):
     """
     GET /api/events/campaigns/{campaign_id}/related-alerts
     
@@ -123,7 +116,7 @@ async def get_campaign_alerts(campaign_id: str):
 # ============================================
 
 @router.get("/alerts")
-async def get_all_alerts(severity: str = Query(None), status: str = Query(None)):
+def get_all_alerts(severity: str = Query(None), status: str = Query(None)):
     """
     GET /api/events/alerts
     
@@ -147,7 +140,7 @@ async def get_all_alerts(severity: str = Query(None), status: str = Query(None))
 
 
 @router.get("/alerts/{alert_id}")
-async def get_alert_details(alert_id: str):
+def get_alert_details(alert_id: str):
     """
     GET /api/events/alerts/{alert_id}
     
@@ -169,7 +162,7 @@ async def get_alert_details(alert_id: str):
 
 
 @router.post("/alerts/{alert_id}/update-status")
-async def update_alert_status(alert_id: str, new_status: str):
+def update_alert_status(alert_id: str, new_status: str):
     """
     POST /api/events/alerts/{alert_id}/update-status
     
@@ -203,7 +196,7 @@ async def update_alert_status(alert_id: str, new_status: str):
 # ============================================
 
 @router.get("/responses")
-async def get_all_responses(campaign_id: str = Query(None)):
+def get_all_responses(campaign_id: str = Query(None)):
     """
     GET /api/events/responses
     
@@ -225,7 +218,7 @@ async def get_all_responses(campaign_id: str = Query(None)):
 
 
 @router.get("/responses/{response_id}")
-async def get_response_details(response_id: str):
+def get_response_details(response_id: str):
     """
     GET /api/events/responses/{response_id}
     
@@ -250,7 +243,7 @@ async def get_response_details(response_id: str):
 # ============================================
 
 @router.get("/metrics")
-async def get_alert_metrics():
+def get_alert_metrics():
     """
     GET /api/events/metrics
     
@@ -276,7 +269,7 @@ async def get_alert_metrics():
 # ============================================
 
 @router.post("/campaigns/{campaign_id}/generate-executive-brief")
-async def generate_executive_brief(campaign_id: str):
+def generate_executive_brief(campaign_id: str):
     """
     POST /api/events/campaigns/{campaign_id}/generate-executive-brief
     
@@ -324,7 +317,7 @@ async def generate_executive_brief(campaign_id: str):
 
 
 @router.post("/alerts/{alert_id}/generate-report")
-async def generate_alert_report(alert_id: str):
+def generate_alert_report(alert_id: str):
     """
     POST /api/events/alerts/{alert_id}/generate-report
     
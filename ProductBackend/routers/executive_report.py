@@ -1,22 +1,13 @@
 from fastapi import APIRouter, HTTPException
 from fastapi.responses import StreamingResponse
-from pymongo import MongoClient
-from reportlab.pdfgen import canvas
-from reportlab.lib.pagesizes import letter
 import io
-import os
-from dotenv import load_dotenv
 
-load_dotenv()
-
-MONGO_URI = os.getenv("MONGODB_URI", "mongodb://localhost:27017/")
-client = MongoClient(MONGO_URI)
-db = client["product"]
+from database import db
 
 router = APIRouter(prefix="/executive-report", tags=["executive-report"])
 
 @router.get("/latest")
-async def get_latest_report():
+def get_latest_report():
     """
     GET /api/executive-report/latest
     Fetches the latest executive report data.
@@ -30,7 +21,7 @@ async def get_latest_report():
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/export-pdf")
-async def export_pdf():
+def export_pdf():
     """
     GET /api/executive-report/export-pdf
     Generates and downloads a PDF version of the report.
@@ -40,6 +31,10 @@ async def export_pdf():
         if not report:
             raise HTTPException(status_code=404, detail="No report found")
 
+        # reportlab is only needed here, so keep it out of app startup
+        from reportlab.pdfgen import canvas
+        from reportlab.lib.pagesizes import letter
+
         # Create PDF in memory
         buffer = io.BytesIO()
         p = canvas.Canvas(buffer, pagesize=letter)
@@ -0,0 +1,98 @@
+import os
+import threading
+import time
+
+from fastapi import APIRouter, Request
+from fastapi.responses import JSONResponse
+
+import cache
+from breaker import mongo_breaker
+import counters
+import database
+import limiter
+
+router = APIRouter(prefix="/health", tags=["health"])
+
+# Readiness fails once this share of a server's pool is checked out: shed traffic before
+# requests queue for a connection. (Every checkout passes through "pending" briefly, so
+# in-flight checkouts alone say nothing about saturation.)
+POOL_SATURATION = float(os.getenv("HEALTH_POOL_SATURATION", "0.9"))
+PING_TIMEOUT = float(os.getenv("HEALTH_PING_TIMEOUT", "2"))
+# However many probes arrive, MongoDB sees at most one health ping per interval.
+PING_INTERVAL = float(os.getenv("HEALTH_PING_INTERVAL", "1"))
+
+_last_ping = {"at": 0.0, "ms": None, "error": None}
+_ping_lock = threading.Lock()
+
+
+def mongo_health():
+    """(ping_ms, error). Never pings while the breaker is open: its monitor owns recovery probes."""
+    if mongo_breaker.is_open():
+        return None, "circuit breaker open"
+    with _ping_lock:
+        if time.monotonic() - _last_ping["at"] >= PING_INTERVAL:
+            try:
+                _last_ping.update(ms=round(database.ping(PING_TIMEOUT) * 1000, 2), error=None)
+            except Exception as e:
+                _last_ping.update(ms=None, error=str(e))
+            _last_ping["at"] = time.monotonic()
+        return _last_ping["ms"], _last_ping["error"]
+
+
+def pool_health():
+    """Pool counters per server plus whether any of them is saturated."""
+    pools = database.pool_stats.snapshot()
+    saturated = [
+        address for address, pool in pools.items()
+        if pool["checked_out"] >= pool["max_size"] * POOL_SATURATION
+    ]
+    return {"saturated": saturated, "servers": pools}
+
+
+def cache_health(app):
+    primed = getattr(app.state, "primed", {})
+    warm = [path for path, status in primed.items() if status == 200]
+    return {"warm": bool(primed) and len(warm) == len(primed),
+            "primed": len(warm), "routes": len(cache.CACHED_ROUTES), **cache.response_cache.stats()}
+
+
+@router.get("/live")
+async def liveness():
+    """
+    GET /health/live
+    The process is up and the event loop answers. Never touches MongoDB.
+    """
+    return {"status": "alive"}
+
+
+@router.get("/ready")
+def readiness(request: Request):
+    """
+    GET /health/ready
+    200 once startup finished, MongoDB answers a ping and the pool has headroom; 503 otherwise.
+    Pings are shared across probes and skipped while the circuit breaker is open.
+    """
+    checks = {"startup": bool(getattr(request.app.state, "ready", False))}
+    body = {"pool": pool_health(), "cache": cache_health(request.app)}
+
+    body["ping_ms"], error = mongo_health()
+    body["breaker"] = mongo_breaker.stats()
+    checks["mongo"] = error is None
+    if error:
+        body["mongo_error"] = error
+    checks["pool"] = not body["pool"]["saturated"]
+
+    ready = all(checks.values())
+    return JSONResponse(status_code=200 if ready else 503,
+                        content={"status": "ready" if ready else "not_ready", "checks": checks, **body})
+
+
+@router.get("/metrics")
+async def metrics():
+    """
+    GET /health/metrics
+    Process counters (budget violations, killed queries, shed requests, ...),
+    the adaptive concurrency limit and pool state.
+    """
+    return {"counters": counters.snapshot(), "limiter": limiter.concurrency_limiter.stats(),
+            "breaker": mongo_breaker.stats(), "pool": pool_health()}
@@ -0,0 +1,108 @@
+from fastapi import APIRouter, HTTPException, UploadFile, File, Query
+from fastapi.concurrency import run_in_threadpool
+from bson import ObjectId
+import os
+import tempfile
+
+import scan_import
+from database import db
+
+router = APIRouter()
+
+
+def _format_job(job):
+    total = job.get("bytes_total") or 0
+    return {
+        "job_id": str(job["_id"]),
+        "filename": job.get("filename"),
+        "format": job.get("format"),
+        "status": job.get("status"),
+        "progress": 100.0 if job.get("status") == "completed"
+        else round(job.get("bytes_read", 0) / total * 100, 1) if total else 0.0,
+        "bytes_read": job.get("bytes_read", 0),
+        "bytes_total": total,
+        "stats": job.get("stats", {}),
+        "error": job.get("error"),
+        "created_at": job.get("created_at"),
+        "started_at": job.get("started_at"),
+        "updated_at": job.get("updated_at"),
+        "finished_at": job.get("finished_at"),
+    }
+
+
+def _too_large():
+    return HTTPException(status_code=413,
+                         detail=f"Report exceeds the {scan_import.MAX_UPLOAD_BYTES // (1024 * 1024)} MiB upload limit")
+
+
+def _save_upload(upload):
+    # Starlette already spooled the upload to disk; copy it out so it outlives the request.
+    fd, path = tempfile.mkstemp(prefix="scan-import-", suffix=os.path.splitext(upload.filename or "")[1])
+    copied = 0
+    with os.fdopen(fd, "wb") as out:
+        while chunk := upload.file.read(1024 * 1024):
+            copied += len(chunk)
+            if copied > scan_import.MAX_UPLOAD_BYTES:
+                break
+            out.write(chunk)
+    if copied > scan_import.MAX_UPLOAD_BYTES:
+        os.unlink(path)
+        raise _too_large()
+    return path
+
+
+@router.post("/imports/upload", status_code=202)
+async def upload_scan(
+    file: UploadFile = File(...),
+    format: str = Query(None, description="nmap or nessus; detected from the file when omitted"),
+):
+    """
+    POST /api/imports/upload
+    Accepts an Nmap XML or .nessus report and imports it in the background.
+    Poll GET /api/imports/jobs/{job_id} for progress.
+    """
+    if format and format not in scan_import.PARSERS:
+        raise HTTPException(status_code=400, detail=f"format must be one of: {', '.join(scan_import.PARSERS)}")
+    if file.size is not None and file.size > scan_import.MAX_UPLOAD_BYTES:
+        raise _too_large()
+    path = await run_in_threadpool(_save_upload, file)  # checks the size again as it copies
+    try:
+        fmt = format or await run_in_threadpool(scan_import.detect_format, path)
+        job_id = await run_in_threadpool(scan_import.start_job, path, file.filename, fmt)
+    except Exception as e:
+        os.unlink(path)
+        status = 400 if isinstance(e, (ValueError, SyntaxError)) else 500
+        raise HTTPException(status_code=status, detail=str(e))
+    return {"job_id": str(job_id), "status": "queued", "format": fmt}
+
+
+@router.get("/imports/jobs")
+def list_import_jobs(limit: int = Query(20, ge=1, le=100)):
+    """
+    GET /api/imports/jobs
+    Most recent import jobs first.
+    """
+    try:
+        jobs = db["import_jobs"].find().sort("created_at", -1).limit(limit)
+        return {"jobs": [_format_job(job) for job in jobs]}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/imports/jobs/{job_id}")
+def get_import_job(job_id: str):
+    """
+    GET /api/imports/jobs/{job_id}
+    Status, percent of the file read, and running counts for one import.
+    """
+    try:
+        if not ObjectId.is_valid(job_id):
+            raise HTTPException(status_code=400, detail="Invalid job id")
+        job = scan_import.get_job(job_id)
+        if not job:
+            raise HTTPException(status_code=404, detail="Import job not found")
+        return _format_job(job)
+    except HTTPException as he:
+        raise he
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
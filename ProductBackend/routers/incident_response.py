@@ -1,16 +1,9 @@
 from fastapi import APIRouter, HTTPException, Query
-from pymongo import MongoClient
 from datetime import datetime
 from pydantic import BaseModel
 from typing import List, Optional
-import os
-from dotenv import load_dotenv
 
-load_dotenv()
-
-MONGO_URI = os.getenv("MONGODB_URI", "mongodb://localhost:27017/")
-client = MongoClient(MONGO_URI)
-db = client["product"]
+from database import db
 
 router = APIRouter(prefix="/incident-response", tags=["incident-response"])
 
@@ -31,7 +24,7 @@ class IncidentCreate(BaseModel):
 # ============================================
 
 @router.get("/incidents")
-async def get_incidents():
+def get_incidents():
     """
     GET /api/incident-response/incidents
     Fetches all incidents sorted by detection date.
@@ -43,7 +36,7 @@ async def get_incidents():
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.post("/incidents/create")
-async def create_incident(incident: IncidentCreate):
+def create_incident(incident: IncidentCreate):
     """
     POST /api/incident-response/incidents/create
     Creates a new incident manually.
@@ -74,7 +67,7 @@ async def create_incident(incident: IncidentCreate):
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/stats")
-async def get_incident_stats():
+def get_incident_stats():
     """
     GET /api/incident-response/stats
     Calculates executive KPIs for the dashboard.
@@ -102,7 +95,7 @@ async def get_incident_stats():
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.post("/incidents/{incident_id}/status")
-async def update_status(incident_id: str, status: str):
+def update_status(incident_id: str, status: str):
     """
     POST /api/incident-response/incidents/{incident_id}/status
     Updates the status of an incident.
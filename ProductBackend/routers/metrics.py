@@ -4,7 +4,7 @@ from database import db
 router = APIRouter()
 
 @router.get("/metrics/key")
-async def get_key_metrics():
+def get_key_metrics():
     metrics_collection = db["metrics"]
     
     # Get all documents from the metrics collection
@@ -18,7 +18,7 @@ async def get_key_metrics():
     return result
 
 @router.get("/metrics/operational")
-async def get_operational_indicators():
+def get_operational_indicators():
     collection = db["operational_indicators"]
     indicators = list(collection.find({}, {"_id": 0}))
     result = {}
@@ -27,25 +27,25 @@ async def get_operational_indicators():
     return result
 
 @router.get("/metrics/trends/5days")
-async def get_5day_trends():
+def get_5day_trends():
     collection = db["daily_trends"]
     trends = list(collection.find({}, {"_id": 0}).sort("date", 1))
     return {"trends": trends}
 
 @router.get("/calendar/upcoming")
-async def get_upcoming_events():
+def get_upcoming_events():
     collection = db["calendar_events"]
     events = list(collection.find({}, {"_id": 0}).sort("date", 1).limit(6))
     return {"events": events}
 
 @router.get("/metrics/module-health")
-async def get_module_health():
+def get_module_health():
     collection = db["module_health"]
     health = list(collection.find({}, {"_id": 0}).sort("name", 1))
     return {"modules": health}
 
 @router.get("/metrics/alerts/today")
-async def get_today_alerts():
+def get_today_alerts():
     collection = db["daily_alerts"]
     alert = collection.find_one({}, {"_id": 0})
     if not alert:
@@ -53,7 +53,7 @@ async def get_today_alerts():
     return alert
 
 @router.get("/risks/top")
-async def get_top_risks():
+def get_top_risks():
     collection = db["top_risks"]
     risks = list(collection.find({}, {"_id": 0}).limit(3))
     return {"risks": risks}
\ No newline at end of file
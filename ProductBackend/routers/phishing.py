@@ -1,15 +1,7 @@
 from fastapi import APIRouter, HTTPException, Query
-from pymongo import MongoClient
 from datetime import datetime, timedelta
-import os
-from dotenv import load_dotenv
 
-load_dotenv()
-
-# Connect to MongoDB
-MONGO_URI = os.getenv("MONGODB_URI", "mongodb://localhost:27017/")
-client = MongoClient(MONGO_URI)
-db = client["product"]
+from database import db
 
 # Create Router
 router = APIRouter(prefix="/phishing", tags=["phishing"])
@@ -19,7 +11,7 @@ router = APIRouter(prefix="/phishing", tags=["phishing"])
 # ============================================
 
 @router.get("/intelligence")
-async def get_phishing_intelligence():
+def get_phishing_intelligence():
     """
     GET /api/phishing/intelligence
     
@@ -39,7 +31,7 @@ async def get_phishing_intelligence():
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/intelligence/stats")
-async def get_phishing_stats():
+def get_phishing_stats():
     """
     GET /api/phishing/intelligence/stats
     
@@ -67,7 +59,7 @@ async def get_phishing_stats():
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.post("/intelligence/{threat_id}/block-domain")
-async def block_phishing_domain(threat_id: str):
+def block_phishing_domain(threat_id: str):
     """
     POST /api/phishing/intelligence/{threat_id}/block-domain
     
@@ -1,16 +1,9 @@
 from fastapi import APIRouter, HTTPException, Query
-from pymongo import MongoClient
 from datetime import datetime
 from pydantic import BaseModel
 from typing import List, Optional
-import os
-from dotenv import load_dotenv
 
-load_dotenv()
-
-MONGO_URI = os.getenv("MONGODB_URI", "mongodb://localhost:27017/")
-client = MongoClient(MONGO_URI)
-db = client["product"]
+from database import db
 
 router = APIRouter(prefix="/phishing-simulation", tags=["phishing-simulation"])
 
@@ -28,7 +21,7 @@ class CampaignCreate(BaseModel):
 # ============================================
 
 @router.get("/campaigns")
-async def get_simulations():
+def get_simulations():
     """
     GET /api/phishing-simulation/campaigns
     Fetches list of all simulation campaigns.
@@ -40,7 +33,7 @@ async def get_simulations():
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.post("/campaigns/create")
-async def create_campaign(campaign: CampaignCreate):
+def create_campaign(campaign: CampaignCreate):
     """
     POST /api/phishing-simulation/campaigns/create
     Creates a new simulation campaign.
@@ -64,7 +57,7 @@ async def create_campaign(campaign: CampaignCreate):
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/templates")
-async def get_templates():
+def get_templates():
     """
     GET /api/phishing-simulation/templates
     Fetches all phishing templates for the gallery.
@@ -76,7 +69,7 @@ async def get_templates():
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/templates/{template_id}")
-async def get_template_preview(template_id: str):
+def get_template_preview(template_id: str):
     """
     GET /api/phishing-simulation/templates/{template_id}
     Fetches details of a specific template for preview.
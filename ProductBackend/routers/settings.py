@@ -1,16 +1,9 @@
 from fastapi import APIRouter, HTTPException, UploadFile, File
-from pymongo import MongoClient
 from pydantic import BaseModel
 from typing import List, Optional, Any
 from datetime import datetime
-import os
-from dotenv import load_dotenv
 
-load_dotenv()
-
-MONGO_URI = os.getenv("MONGODB_URI", "mongodb://localhost:27017/")
-client = MongoClient(MONGO_URI)
-db = client["product"]
+from database import db
 
 router = APIRouter(prefix="/settings", tags=["settings"])
 
@@ -28,14 +21,14 @@ class WebhookConfig(BaseModel):
 # --- General Settings APIs ---
 
 @router.get("/")
-async def get_all_settings():
+def get_all_settings():
     settings = db["system_settings"].find_one({}, {"_id": 0})
     if not settings:
         raise HTTPException(status_code=404, detail="Settings not initialized")
     return {"status": "success", "data": settings}
 
 @router.put("/update-section")
-async def update_settings_section(section: str, data: dict):
+def update_settings_section(section: str, data: dict):
     """
     Generic endpoint to update a specific section of settings (profile, security, notifications, etc.)
     """
@@ -50,7 +43,7 @@ async def update_settings_section(section: str, data: dict):
 # --- Security Specific ---
 
 @router.post("/security/regenerate-api-key")
-async def regenerate_api_key():
+def regenerate_api_key():
     import secrets
     new_key = f"sk_live_{secrets.token_hex(16)}"
     db["system_settings"].update_one({}, {"$set": {"security_policy.api_key": new_key}})
@@ -59,7 +52,7 @@ async def regenerate_api_key():
 # --- Integrations ---
 
 @router.post("/integrations/{name}/toggle")
-async def toggle_integration(name: str):
+def toggle_integration(name: str):
     # Find current status
     doc = db["system_settings"].find_one({"integrations.name": name}, {"integrations.$": 1})
     if not doc:
@@ -75,7 +68,7 @@ async def toggle_integration(name: str):
     return {"status": "success", "new_status": new_status}
 
 @router.post("/integrations/add")
-async def add_integration(data: dict):
+def add_integration(data: dict):
     # Mock adding logic
     new_integration = {
         "name": data.get("name", "New Tool"),
@@ -89,12 +82,12 @@ async def add_integration(data: dict):
 # --- User Management ---
 
 @router.get("/users")
-async def get_users():
+def get_users():
     users = list(db["users"].find({}, {"_id": 0}))
     return {"status": "success", "data": users}
 
 @router.post("/users/add")
-async def add_user(user: UserCreate):
+def add_user(user: UserCreate):
     new_user = {
         "id": f"u{int(datetime.utcnow().timestamp())}",
         "name": user.name,
@@ -108,7 +101,7 @@ async def add_user(user: UserCreate):
     return {"status": "success", "data": new_user}
 
 @router.delete("/users/{user_id}")
-async def delete_user(user_id: str):
+def delete_user(user_id: str):
     result = db["users"].delete_one({"id": user_id})
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="User not found")
@@ -117,17 +110,17 @@ async def delete_user(user_id: str):
 # --- System ---
 
 @router.post("/system/clear-cache")
-async def clear_cache():
+def clear_cache():
     # Mock
     return {"status": "success", "message": "System cache cleared"}
 
 @router.get("/system/logs/export")
-async def export_logs():
+def export_logs():
     # Mock log content
     content = "TIMESTAMP,LEVEL,MESSAGE\n2024-12-14 10:00:00,INFO,System started\n2024-12-14 10:05:00,WARN,High memory usage"
     return {"status": "success", "content": content}
 
 @router.post("/profile/upload-photo")
-async def upload_photo(file: UploadFile = File(...)):
+def upload_photo(file: UploadFile = File(...)):
     # Mock upload - just return success
     return {"status": "success", "message": f"Uploaded {file.filename}"}
\ No newline at end of file
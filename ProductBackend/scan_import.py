@@ -0,0 +1,398 @@
+# Streaming import of scanner reports into assets and vulnerabilities.
+#
+#   python scan_import.py scan.xml                  # Nmap -oX; format taken from the root element
+#   python scan_import.py weekly.nessus --batch-size 200
+#
+# Reports are read with defusedxml's iterparse, which refuses entity declarations and
+# external references, and every host is detached from the tree as soon as it has been
+# mapped, so memory stays flat however large the file is. Hosts go through identity
+# resolution (asset_identity.py) and findings become vulnerability upserts keyed by
+# fingerprint (vuln_fingerprint.py), both written in batches. Uploads through
+# POST /api/imports/upload (at most MAX_UPLOAD_BYTES) run here on a background thread
+# and record progress in the import_jobs collection.
+
+import argparse
+import os
+import re
+import threading
+import time
+from datetime import datetime
+
+import defusedxml.ElementTree as ET
+from bson import ObjectId
+
+import asset_identity
+import cache
+import cpe_match
+import cve_catalog
+import risk_scoring
+import vuln_fingerprint
+import vuln_priority
+from database import db
+
+FORMATS = {"nmaprun": "nmap", "NessusClientData_v2": "nessus"}
+HOST_TAGS = {"nmap": "host", "nessus": "ReportHost"}
+
+BATCH_SIZE = int(os.getenv("SCAN_IMPORT_BATCH_SIZE", "500"))
+MAX_UPLOAD_BYTES = int(os.getenv("SCAN_IMPORT_MAX_BYTES", str(512 * 1024 * 1024)))
+
+# Imports running at once in this process; later uploads wait as "queued".
+_slots = threading.BoundedSemaphore(int(os.getenv("SCAN_IMPORT_WORKERS", "1")))
+
+CVE_RE = re.compile(r"CVE-\d{4}-\d{4,}")
+
+NESSUS_SEVERITIES = {4: "Critical", 3: "High", 2: "Medium", 1: "Low"}
+
+# Device class reported by the scanner -> asset type. Only set when the asset is new.
+TYPE_HINTS = {
+    "router": "Network Device",
+    "switch": "Network Device",
+    "firewall": "Network Device",
+    "wap": "Network Device",
+    "load balancer": "Network Device",
+    "phone": "Mobile Device",
+    "hypervisor": "Application Server",
+    "general purpose": "Endpoint",
+    "general-purpose": "Endpoint",
+}
+
+
+# ============================================
+# PARSING
+# ============================================
+
+def detect_format(path):
+    """"nmap" or "nessus" from the report's root element."""
+    for _, elem in ET.iterparse(path, events=("start",)):
+        if elem.tag in FORMATS:
+            return FORMATS[elem.tag]
+        raise ValueError(f"Unrecognised report root <{elem.tag}>; expected Nmap XML or .nessus")
+    raise ValueError("Empty report")
+
+
+def _stream(source, tag):
+    """Yields each complete `tag` element, then detaches it (and top-level siblings) from the tree."""
+    stack = []
+    for event, elem in ET.iterparse(source, events=("start", "end")):
+        if event == "start":
+            stack.append(elem)
+            continue
+        stack.pop()
+        if elem.tag == tag:
+            yield elem
+        if stack and (elem.tag == tag or len(stack) == 1):
+            stack[-1].remove(elem)
+
+
+def _float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _severity(cvss):
+    if cvss is None:
+        return "Medium"  # unscored findings, e.g. NSE output with only a CVE id
+    if cvss >= 9.0:
+        return "Critical"
+    if cvss >= 7.0:
+        return "High"
+    if cvss >= 4.0:
+        return "Medium"
+    return "Low"
+
+
+def _nmap_findings(script, port, protocol):
+    findings = {}
+    # Structured output (vulners): <table><elem key="id">CVE-…</elem><elem key="cvss">…</elem></table>
+    for table in script.iter("table"):
+        elems = {e.get("key"): (e.text or "").strip() for e in table.findall("elem")}
+        if CVE_RE.fullmatch(elems.get("id", "")):
+            findings[elems["id"]] = {
+                "cvss": _float(elems.get("cvss")),
+                "exploitability": "PoC Available" if elems.get("is_exploit") == "true" else "None",
+            }
+    for cve in CVE_RE.findall(script.get("output", "")):
+        findings.setdefault(cve, {"cvss": None, "exploitability": "None"})
+    return [{
+        "cve_id": cve,
+        "title": f"{cve} ({script.get('id')})",
+        "cvss": details["cvss"],
+        "severity": _severity(details["cvss"]),
+        "exploitability": details["exploitability"],
+        "port": port,
+        "protocol": protocol,
+    } for cve, details in findings.items()]
+
+
+def parse_nmap_host(host):
+    """{"asset", "findings", "skipped"} for one <host>, or None if it was down."""
+    status = host.find("status")
+    if status is not None and status.get("state") != "up":
+        return None
+
+    ip = mac = None
+    for address in host.findall("address"):
+        kind = address.get("addrtype")
+        if kind in ("ipv4", "ipv6") and ip is None:
+            ip = address.get("addr")
+        elif kind == "mac":
+            mac = address.get("addr")
+    hostnames = host.findall("hostnames/hostname")
+    hostname = next((h.get("name") for h in hostnames if h.get("type") == "user"),
+                    hostnames[0].get("name") if hostnames else None)
+    osmatch = host.find("os/osmatch")
+    osclass = host.find("os/osmatch/osclass")
+
+    services, software, findings = [], [], []
+    for port in host.findall("ports/port"):
+        state = port.find("state")
+        if state is None or state.get("state") != "open":
+            continue
+        number, protocol = int(port.get("portid")), port.get("protocol")
+        service = port.find("service")
+        if service is not None:
+            # Version detection (-sV) names what it found as CPEs; cpe_match.py links them to CVEs.
+            software.extend({"cpe": cpe.text, "port": number} for cpe in service.findall("cpe") if cpe.text)
+        service = service.attrib if service is not None else {}
+        services.append({"port": number, "protocol": protocol, "service": service.get("name"),
+                         "product": " ".join(filter(None, (service.get("product"), service.get("version")))) or None})
+        for script in port.findall("script"):
+            findings.extend(_nmap_findings(script, number, protocol))
+    for script in host.findall("hostscript/script"):
+        findings.extend(_nmap_findings(script, 0, None))
+    if osmatch is not None:
+        software.extend({"cpe": cpe.text, "port": None} for cpe in osmatch.findall("osclass/cpe") if cpe.text)
+
+    return {
+        "asset": {
+            "name": hostname or ip,
+            "hostname": hostname,
+            "ip": ip,
+            "mac": mac,
+            "os": osmatch.get("name") if osmatch is not None else None,
+            "services": services,
+            "software": software or None,
+        },
+        "type_hint": TYPE_HINTS.get((osclass.get("type") or "").lower()) if osclass is not None else None,
+        "findings": findings,
+        "skipped": 0,
+    }
+
+
+def _exploitability(item):
+    if item.findtext("exploited_by_malware") == "true":
+        return "Exploited in Wild"
+    if any(e.text == "true" for e in item if e.tag.startswith("exploit_framework_")):
+        return "Weaponized"
+    if item.findtext("exploit_available") == "true":
+        return "PoC Available"
+    return "None"
+
+
+def parse_nessus_host(report_host):
+    """{"asset", "findings", "skipped"} for one <ReportHost>."""
+    tags = {tag.get("name"): (tag.text or "").strip() for tag in report_host.findall("HostProperties/tag")}
+    ip = tags.get("host-ip") or report_host.get("name")
+    macs = tags.get("mac-address", "").split()
+    hostname = tags.get("host-fqdn") or tags.get("hostname") or tags.get("netbios-name")
+
+    services, seen_ports, findings, skipped = [], set(), [], 0
+    for item in report_host.findall("ReportItem"):
+        port, protocol = int(item.get("port", 0)), item.get("protocol")
+        if port and (port, protocol) not in seen_ports:
+            seen_ports.add((port, protocol))
+            services.append({"port": port, "protocol": protocol, "service": item.get("svc_name"), "product": None})
+        severity = int(item.get("severity", 0))
+        if severity == 0:
+            continue  # informational
+        cves = [c.text.strip() for c in item.findall("cve") if c.text]
+        if not cves:
+            skipped += 1
+            continue
+        cvss = _float(item.findtext("cvss3_base_score")) or _float(item.findtext("cvss_base_score"))
+        for cve in cves:
+            findings.append({
+                "cve_id": cve,
+                "title": item.get("pluginName"),
+                "cvss": cvss,
+                "severity": NESSUS_SEVERITIES.get(severity) or _severity(cvss),
+                "exploitability": _exploitability(item),
+                "port": port,
+                "protocol": protocol,
+                "plugin_id": item.get("pluginID"),
+            })
+
+    return {
+        "asset": {
+            "name": hostname or ip,
+            "hostname": hostname,
+            "ip": ip,
+            "mac": macs[0] if macs else None,
+            "os": tags.get("operating-system", "").split("\n")[0] or None,
+            "services": services,
+        },
+        "type_hint": TYPE_HINTS.get(tags.get("system-type", "").lower()),
+        "findings": findings,
+        "skipped": skipped,
+    }
+
+
+PARSERS = {"nmap": parse_nmap_host, "nessus": parse_nessus_host}
+
+
+# ============================================
+# BATCHED WRITES
+# ============================================
+
+def _write_batch(hosts, source, stats):
+    now = datetime.utcnow()
+
+    # Hosts already known from any source (CMDB, EDR, an earlier scan) are merged, not duplicated.
+    records = [dict(host["asset"], last_scanned=now) for host in hosts]
+    defaults = [{"status": "Active", "type": host["type_hint"]} if host["type_hint"] else {"status": "Active"}
+                for host in hosts]
+    resolved = asset_identity.upsert_many(records, source, defaults)
+    stats["assets_created"] += sum(1 for _, created in resolved if created)
+    stats["assets_updated"] += sum(1 for _, created in resolved if not created)
+
+    # Findings carry their asset's business unit and their own scores for the priority queue.
+    asset_ids = list({asset_id for asset_id, _ in resolved})
+    units = {asset["_id"]: asset.get("business_unit")
+             for asset in db["assets"].find({"_id": {"$in": asset_ids}}, {"business_unit": 1})}
+
+    # Scores, KEV status and missing titles come from the local CVE catalog where it has the CVE.
+    catalog = cve_catalog.lookup_many(finding["cve_id"] for host in hosts for finding in host["findings"])
+
+    sightings = []
+    for host, (asset_id, _) in zip(hosts, resolved):
+        for finding in host["findings"]:
+            finding = dict(finding, **cve_catalog.enrich(finding, catalog[finding["cve_id"]]))
+            exposure = risk_scoring.estimate_exposure(finding["cvss"], finding["exploitability"])
+            sightings.append((asset_id, finding, {
+                "business_units": [units[asset_id]] if units.get(asset_id) else [],
+                "exposure_score": exposure,
+                "risk_score": risk_scoring.vulnerability_score(finding["cvss"], finding["exploitability"], exposure),
+            }))
+    # A host repeated within the batch keeps its last sighting of each finding.
+    result = vuln_fingerprint.write(sightings, source, now)
+    if result:
+        stats["vulnerabilities_created"] += result.upserted_count
+        stats["vulnerabilities_updated"] += result.matched_count
+        vuln_priority.priority_queue.apply(list(db["vulnerabilities"].find(
+            {"asset_id": {"$in": asset_ids}, "last_seen": now}, vuln_priority.PROJECTION)))
+    with_software = {asset_id for host, (asset_id, _) in zip(hosts, resolved) if host["asset"].get("software")}
+    if with_software:
+        cpe_match.link_assets(with_software)  # rescores those assets itself
+    risk_scoring.recompute(set(asset_ids) - with_software)
+
+
+def import_report(path, fmt=None, batch_size=BATCH_SIZE, progress=None):
+    """
+    Imports one report file and returns its stats. `progress(stats, bytes_read)` is
+    called after every batch.
+    """
+    fmt = fmt or detect_format(path)
+    parse, tag = PARSERS[fmt], HOST_TAGS[fmt]
+    stats = {"hosts": 0, "hosts_down": 0, "findings": 0, "findings_skipped": 0,
+             "assets_created": 0, "assets_updated": 0,
+             "vulnerabilities_created": 0, "vulnerabilities_updated": 0}
+
+    batch = []
+    with open(path, "rb") as source:
+        for elem in _stream(source, tag):
+            host = parse(elem)
+            if host is None:
+                stats["hosts_down"] += 1
+                continue
+            stats["hosts"] += 1
+            stats["findings"] += len(host["findings"])
+            stats["findings_skipped"] += host["skipped"]
+            batch.append(host)
+            if len(batch) >= batch_size:
+                _write_batch(batch, fmt, stats)
+                batch = []
+                if progress:
+                    progress(stats, source.tell())
+        if batch:
+            _write_batch(batch, fmt, stats)
+        if progress:
+            progress(stats, source.tell())
+
+    if stats["hosts"]:
+        cache.invalidate_for("/api/assets")  # also evicts network and vulnerability summaries
+    return stats
+
+
+# ============================================
+# JOBS
+# ============================================
+
+def create_job(path, filename, fmt):
+    job = {
+        "filename": filename,
+        "format": fmt,
+        "status": "queued",
+        "bytes_total": os.path.getsize(path),
+        "bytes_read": 0,
+        "created_at": datetime.utcnow(),
+    }
+    return db["import_jobs"].insert_one(job).inserted_id
+
+
+def run_job(job_id, path, fmt, batch_size=BATCH_SIZE, remove=True):
+    """Runs one queued job to completion, recording progress and outcome on its document."""
+    jobs = db["import_jobs"]
+
+    def progress(stats, bytes_read):
+        jobs.update_one({"_id": job_id},
+                        {"$set": {"stats": stats, "bytes_read": bytes_read, "updated_at": datetime.utcnow()}})
+
+    try:
+        with _slots:
+            started = time.perf_counter()
+            jobs.update_one({"_id": job_id}, {"$set": {"status": "running", "started_at": datetime.utcnow()}})
+            stats = import_report(path, fmt, batch_size, progress)
+            jobs.update_one({"_id": job_id}, {"$set": {
+                "status": "completed",
+                "stats": stats,
+                "finished_at": datetime.utcnow(),
+                "duration_s": round(time.perf_counter() - started, 1),
+            }})
+    except Exception as e:
+        jobs.update_one({"_id": job_id}, {"$set": {"status": "failed", "error": str(e),
+                                                   "finished_at": datetime.utcnow()}})
+    finally:
+        if remove:
+            os.unlink(path)
+
+
+def start_job(path, filename, fmt):
+    """Queues an import of `path` (which the job deletes when done); returns the job id."""
+    job_id = create_job(path, filename, fmt)
+    threading.Thread(target=run_job, args=(job_id, path, fmt), name=f"scan-import-{job_id}", daemon=True).start()
+    return job_id
+
+
+def get_job(job_id):
+    return db["import_jobs"].find_one({"_id": ObjectId(job_id)})
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Import an Nmap XML or .nessus report.")
+    parser.add_argument("path")
+    parser.add_argument("--format", choices=sorted(PARSERS), help="default: detect from the file")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    size = os.path.getsize(args.path)
+
+    def report(stats, bytes_read):
+        print(f"   … {bytes_read / size:6.1%}  {stats['hosts']:,} hosts, {stats['findings']:,} findings")
+
+    stats = import_report(args.path, args.format, args.batch_size, report)
+    print(f"\n✅ Imported {stats['hosts']:,} hosts ({stats['assets_created']:,} new assets) and "
+          f"{stats['findings']:,} findings ({stats['vulnerabilities_created']:,} new vulnerabilities) "
+          f"in {time.perf_counter() - started:.1f}s")
@@ -0,0 +1,306 @@
+# One entry point for resetting a dev/test database.
+#
+#   python seed.py run                       # every module, upserted in parallel
+#   python seed.py run --modules risk,events
+#   python seed.py run --scale 5             # entity collections from generate_data.py at 5x
+#   python seed.py save snapshots/dev.bson.gz
+#   python seed.py restore snapshots/dev.bson.gz
+#
+# Seeding is idempotent: fixture documents are replaced by their natural key and
+# generated documents by their deterministic _id, so running it twice leaves the
+# same data behind. A snapshot is the whole database as one gzip'd BSON stream;
+# restoring it skips document building entirely.
+
+import argparse
+import gzip
+import hashlib
+import importlib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timezone
+
+import bson
+from bson import ObjectId
+from bson.codec_options import CodecOptions
+from bson.raw_bson import RawBSONDocument
+from pymongo import IndexModel, ReplaceOne
+
+import asset_counters
+import asset_history
+import asset_identity
+import generate_data
+import database
+import migrate_ip_norm
+import patch_velocity
+import risk_scoring
+import threat_exposure
+import vuln_fingerprint
+import vuln_priority
+import vuln_sla
+from database import db
+
+# ============================================
+# MODULE SEEDERS
+# ============================================
+
+# Module -> seed scripts. Each script exposes documents() -> {collection: [docs]}.
+MODULES = {
+    "dashboard": ["seed_metrics", "seed_operational_indicators", "seed_daily_trends", "seed_calendar",
+                  "seed_module_health", "seed_daily_alerts", "seed_top_risks"],
+    "assets": ["seed_assets", "seed_asset_categories", "seed_risky_assets"],
+    "vulnerabilities": ["seed_vulnerabilities", "seed_vuln_summary", "seed_vuln_severity_distribution",
+                        "seed_active_threats"],
+    "risk": ["seed_risk"],
+    "compliance": ["seed_compliance"],
+    "events": ["seed_events"],
+    "incident_response": ["seed_incident_response"],
+    "phishing": ["seed_phishing_intelligence", "seed_phishing_simulation"],
+    "executive_report": ["seed_executive_report"],
+    "settings": ["seed_settings_full"],
+    "auth": ["add_demo_users"],
+}
+
+# Fields that identify a fixture document. Missing fields match null, so one key can
+# cover collections shared by two scripts (incident_responses). Collections without a
+# natural key get an _id derived from the document's position instead.
+NATURAL_KEYS = {
+    "metrics": ("type",),
+    "operational_indicators": ("type",),
+    "daily_trends": ("day",),
+    "calendar_events": ("title",),
+    "module_health": ("module_id",),
+    "top_risks": ("title",),
+    "assets": ("name",),
+    "asset_categories": ("category",),
+    "risky_assets": ("asset_name",),
+    "vulnerabilities": ("cve_id",),
+    "vuln_severity_distribution": ("severity",),
+    "active_threats": ("cve_id", "title"),
+    "risk_business_units": ("name",),
+    "risk_internal_drivers": ("rank",),
+    "risk_external_drivers": ("rank",),
+    "risk_recommendations": ("title",),
+    "compliance_frameworks": ("framework_id",),
+    "compliance_violations": ("violation_id",),
+    "compliance_actions": ("action_id",),
+    "evidence_intelligence": ("evidence_type",),
+    "threat_campaigns": ("campaign_id",),
+    "security_alerts": ("alert_id",),
+    "incident_responses": ("incident_id", "response_id"),
+    "alert_metrics": ("metric_date",),
+    "phishing_intelligence": ("threat_id",),
+    "phishing_simulations": ("campaign_id",),
+    "phishing_templates": ("template_id",),
+    "users": ("email",),
+}
+
+
+def _positional_id(collection, index):
+    return ObjectId(hashlib.md5(f"{collection}:{index}".encode()).digest()[:12])
+
+
+def _upserts(collection, docs):
+    keys = NATURAL_KEYS.get(collection)
+    requests = []
+    for index, doc in enumerate(docs):
+        doc = dict(doc)
+        if keys:
+            doc.pop("_id", None)
+            key = {field: doc.get(field) for field in keys}
+        else:
+            doc["_id"] = _positional_id(collection, index)
+            key = {"_id": doc["_id"]}
+        requests.append(ReplaceOne(key, doc, upsert=True))
+    return requests
+
+
+def seed_module(module, skip_collections=()):
+    """Upserts every fixture document of `module`; returns {collection: documents written}."""
+    written = {}
+    for script in MODULES[module]:
+        for collection, docs in importlib.import_module(script).documents().items():
+            if collection in skip_collections or not docs:
+                continue
+            result = db[collection].bulk_write(_upserts(collection, docs), ordered=False)
+            written[collection] = written.get(collection, 0) + result.upserted_count + result.matched_count
+    return written
+
+
+def run(modules=None, scale=None, workers=8, reset=False):
+    modules = modules or list(MODULES)
+    unknown = [m for m in modules if m not in MODULES]
+    if unknown:
+        raise ValueError(f"Unknown module(s): {', '.join(unknown)}")
+
+    # With --scale the entity collections come from the generator instead of the fixtures.
+    generated = set(generate_data.KINDS) if scale else set()
+
+    if reset:
+        targets = set(generated)
+        for module in modules:
+            for script in MODULES[module]:
+                targets.update(importlib.import_module(script).documents())
+        for collection in sorted(targets):
+            db[collection].drop()
+        print(f"   ✓ Dropped {len(targets)} collections")
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(seed_module, module, generated): module for module in modules}
+        if generated:
+            counts = generate_data.counts_for(scale)
+            futures[pool.submit(generate_data.load, counts, uri=database.mongo_uri(), db_name=db.name, upsert=True)] = "generated"
+        for future in as_completed(futures):
+            module = futures[future]
+            result = future.result()
+            if module != "generated":
+                summary = ", ".join(f"{name}={count}" for name, count in sorted(result.items()))
+                print(f"   ✓ {module}: {summary}")
+    if "assets" in modules or generated:
+        migrate_ip_norm.backfill()  # fixture assets only carry "ip"
+        asset_identity.prune_name_keys()  # databases seeded when display names were host keys
+        asset_history.baseline()
+    if "vulnerabilities" in modules or generated:
+        vuln_fingerprint.backfill()  # generated findings may repeat a CVE on an asset
+    if {"assets", "vulnerabilities"} & set(modules) or generated:
+        risk_scoring.recompute()
+    if "vulnerabilities" in modules or generated:
+        vuln_priority.priority_queue.invalidate()  # running workers refill their queues
+        threat_exposure.refresh(full=True)
+        vuln_sla.backfill_first_seen()  # databases seeded before first_seen replaced age_days
+        vuln_sla.run()  # loaded findings may already be past due
+        patch_velocity.backfill()  # loaded findings that are already patched
+    if "assets" in modules or generated:
+        asset_counters.reconcile()  # bulk upserts bypass the per-write counter hooks
+    print(f"\n✅ Seeded {len(modules)} modules in {time.perf_counter() - started:.1f}s")
+
+
+# ============================================
+# SNAPSHOTS
+# ============================================
+# Layout: a header document per collection followed by that collection's documents,
+# all as raw BSON inside one gzip stream. Headers start with a "__snapshot__" string
+# element so they can be told apart without decoding the documents around them.
+
+_MARKER = b"\x02__snapshot__\x00"
+_RAW = CodecOptions(document_class=RawBSONDocument)
+
+
+def _is_header(raw):
+    return raw[4:4 + len(_MARKER)] == _MARKER
+
+
+def save(path, compresslevel=3):
+    started = time.perf_counter()
+    total = 0
+    with gzip.open(path, "wb", compresslevel=compresslevel) as out:
+        for name in sorted(db.list_collection_names()):
+            if name.startswith("system."):
+                continue
+            collection = db.get_collection(name, codec_options=_RAW)
+            indexes = [
+                {"key": list(index["key"].items()),
+                 "options": {k: v for k, v in index.items() if k not in ("key", "v", "ns")}}
+                for index in db[name].list_indexes() if index["name"] != "_id_"
+            ]
+            out.write(bson.encode({"__snapshot__": "collection", "name": name, "indexes": indexes,
+                                   "saved_at": datetime.now(timezone.utc)}))
+            count = 0
+            for doc in collection.find({}, batch_size=10_000):
+                out.write(doc.raw)
+                count += 1
+            total += count
+            print(f"   ✓ {name}: {count:,}")
+    print(f"\n✅ Saved {total:,} documents to {path} in {time.perf_counter() - started:.1f}s")
+
+
+def restore(path, workers=8, batch_bytes=8 * 1024 * 1024):
+    """Drops and reloads every collection in the snapshot; inserts run in parallel."""
+    started = time.perf_counter()
+    in_flight = threading.BoundedSemaphore(workers * 2)
+    futures = []
+    indexes = {}
+    counts = {}
+
+    def insert(name, batch):
+        try:
+            db.get_collection(name, codec_options=_RAW).insert_many(batch, ordered=False)
+        finally:
+            in_flight.release()
+
+    def flush(pool, name, batch):
+        in_flight.acquire()
+        futures.append(pool.submit(insert, name, batch))
+
+    with gzip.open(path, "rb") as src, ThreadPoolExecutor(max_workers=workers) as pool:
+        name, batch, size = None, [], 0
+        for doc in bson.decode_file_iter(src, codec_options=_RAW):
+            if _is_header(doc.raw):
+                if batch:
+                    flush(pool, name, batch)
+                header = bson.decode(doc.raw)
+                name, batch, size = header["name"], [], 0
+                indexes[name] = header["indexes"]
+                counts[name] = 0
+                db[name].drop()
+                continue
+            batch.append(doc)
+            size += len(doc.raw)
+            counts[name] += 1
+            if size >= batch_bytes:
+                flush(pool, name, batch)
+                batch, size = [], 0
+        if batch:
+            flush(pool, name, batch)
+        for future in futures:
+            future.result()
+
+    # Build indexes once, after the data is in: far cheaper than maintaining them per insert.
+    for name, specs in indexes.items():
+        if specs:
+            db[name].create_indexes([IndexModel([tuple(k) for k in spec["key"]], **spec["options"])
+                                     for spec in specs])
+    for name in sorted(counts):
+        print(f"   ✓ {name}: {counts[name]:,}")
+    print(f"\n✅ Restored {sum(counts.values()):,} documents in {time.perf_counter() - started:.1f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Seed, snapshot and restore the CRV360 database.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = sub.add_parser("run", help="upsert module fixtures (and generated data)")
+    run_parser.add_argument("--modules", help=f"comma-separated, from: {', '.join(MODULES)}")
+    run_parser.add_argument("--scale", type=float, help="generate entity collections at this scale")
+    run_parser.add_argument("--workers", type=int, default=8)
+    run_parser.add_argument("--reset", action="store_true", help="drop the seeded collections first")
+
+    save_parser = sub.add_parser("save", help="write a compressed BSON snapshot")
+    save_parser.add_argument("path")
+    save_parser.add_argument("--level", type=int, default=3, help="gzip level (1 = fastest)")
+
+    restore_parser = sub.add_parser("restore", help="replace collections with a snapshot")
+    restore_parser.add_argument("path")
+    restore_parser.add_argument("--workers", type=int, default=8)
+
+    sub.add_parser("list", help="show modules and the scripts behind them")
+
+    args = parser.parse_args()
+    try:
+        if args.command == "run":
+            modules = [m.strip() for m in args.modules.split(",")] if args.modules else None
+            run(modules, scale=args.scale, workers=args.workers, reset=args.reset)
+        elif args.command == "save":
+            save(args.path, compresslevel=args.level)
+        elif args.command == "restore":
+            restore(args.path, workers=args.workers)
+        else:
+            for module, scripts in MODULES.items():
+                print(f"{module:<20}{', '.join(scripts)}")
+    finally:
+        database.close()
+
+
+if __name__ == "__main__":
+    main()
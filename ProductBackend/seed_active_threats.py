@@ -35,7 +35,12 @@ threats = [
     }
 ]
 
-collection.delete_many({})
-collection.insert_many(threats)
+def documents():
+    return {"active_threats": threats}
 
-print("Active threats seeded!")
\ No newline at end of file
+
+if __name__ == "__main__":
+    collection.delete_many({})
+    collection.insert_many(threats)
+
+    print("Active threats seeded!")
@@ -10,7 +10,12 @@ categories = [
     {"category": "IoT Devices", "total": 134, "compliant": 92, "percentage": 68.7}
 ]
 
-collection.delete_many({})
-collection.insert_many(categories)
+def documents():
+    return {"asset_categories": categories}
 
-print("Asset categories seeded!")
\ No newline at end of file
+
+if __name__ == "__main__":
+    collection.delete_many({})
+    collection.insert_many(categories)
+
+    print("Asset categories seeded!")
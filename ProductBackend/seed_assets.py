@@ -66,7 +66,12 @@ assets = [
     }
 ]
 
-collection.delete_many({})
-collection.insert_many(assets)
+def documents():
+    return {"assets": assets}
 
-print("Assets seeded!")
\ No newline at end of file
+
+if __name__ == "__main__":
+    collection.delete_many({})
+    collection.insert_many(assets)
+
+    print("Assets seeded!")
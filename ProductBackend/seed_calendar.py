@@ -30,7 +30,12 @@ events = [
     }
 ]
 
-events_collection.delete_many({})
-events_collection.insert_many(events)
+def documents():
+    return {"calendar_events": events}
 
-print("Calendar events seeded!")
\ No newline at end of file
+
+if __name__ == "__main__":
+    events_collection.delete_many({})
+    events_collection.insert_many(events)
+
+    print("Calendar events seeded!")
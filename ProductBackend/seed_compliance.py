@@ -10,26 +10,7 @@ MONGO_URI = os.getenv("MONGODB_URI", "mongodb://localhost:27017/")
 client = MongoClient(MONGO_URI)
 db = client["product"]
 
-def seed_compliance_data():
-    """
-    Seeds the compliance module with sample data.
-    
-    This function creates 4 collections:
-    1. compliance_frameworks - Framework compliance scores
-    2. compliance_violations - Compliance violations and remediation
-    3. compliance_actions - CISO recommended actions
-    4. evidence_intelligence - Documentation and evidence tracking
-    """
-    
-    print("🔄 Starting Compliance Data Seeding...")
-    
-    # Drop existing collections to avoid duplicates
-    collections_to_drop = ["compliance_frameworks", "compliance_violations", "compliance_actions", "evidence_intelligence"]
-    for collection in collections_to_drop:
-        if collection in db.list_collection_names():
-            db[collection].drop()
-            print(f"   ✓ Dropped {collection}")
-    
+def documents():
     # ============================================
     # 1. COMPLIANCE FRAMEWORKS COLLECTION
     # ============================================
@@ -116,8 +97,6 @@ def seed_compliance_data():
         }
     ]
     
-    db["compliance_frameworks"].insert_many(frameworks_data)
-    print(f"   ✓ Inserted {len(frameworks_data)} frameworks")
     
     # ============================================
     # 2. COMPLIANCE VIOLATIONS COLLECTION
@@ -218,8 +197,6 @@ def seed_compliance_data():
         }
     ]
     
-    db["compliance_violations"].insert_many(violations_data)
-    print(f"   ✓ Inserted {len(violations_data)} violations")
     
     # ============================================
     # 3. COMPLIANCE ACTIONS COLLECTION
@@ -266,8 +243,6 @@ def seed_compliance_data():
         }
     ]
     
-    db["compliance_actions"].insert_many(actions_data)
-    print(f"   ✓ Inserted {len(actions_data)} recommended actions")
     
     # ============================================
     # 4. EVIDENCE INTELLIGENCE COLLECTION
@@ -310,10 +285,39 @@ def seed_compliance_data():
             "updated_at": datetime.utcnow()
         }
     ]
+
+    return {
+        "compliance_frameworks": frameworks_data,
+        "compliance_violations": violations_data,
+        "compliance_actions": actions_data,
+        "evidence_intelligence": evidence_data
+    }
+
+
+def seed_compliance_data():
+    """
+    Seeds the compliance module with sample data.
     
-    db["evidence_intelligence"].insert_many(evidence_data)
-    print(f"   ✓ Inserted {len(evidence_data)} evidence intelligence records")
+    This function creates 4 collections:
+    1. compliance_frameworks - Framework compliance scores
+    2. compliance_violations - Compliance violations and remediation
+    3. compliance_actions - CISO recommended actions
+    4. evidence_intelligence - Documentation and evidence tracking
+    """
     
+    print("🔄 Starting Compliance Data Seeding...")
+    
+    # Drop existing collections to avoid duplicates
+    collections_to_drop = ["compliance_frameworks", "compliance_violations", "compliance_actions", "evidence_intelligence"]
+    for collection in collections_to_drop:
+        if collection in db.list_collection_names():
+            db[collection].drop()
+            print(f"   ✓ Dropped {collection}")
+
+    for name, docs in documents().items():
+        db[name].insert_many(docs)
+        print(f"   ✓ Inserted {len(docs)} {name}")
+
     print("\n✅ Compliance data seeding completed successfully!")
     print("\nCollections created:")
     print("  - compliance_frameworks (5 frameworks)")
@@ -321,5 +325,6 @@ def seed_compliance_data():
     print("  - compliance_actions (3 actions)")
     print("  - evidence_intelligence (3 evidence types)")
 
+
 if __name__ == "__main__":
     seed_compliance_data()
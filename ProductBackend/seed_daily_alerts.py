@@ -12,7 +12,12 @@ alerts = {
     "total": 156
 }
 
-collection.delete_many({})
-collection.insert_one(alerts)
+def documents():
+    return {"daily_alerts": [alerts]}
 
-print("Daily alerts seeded!")
\ No newline at end of file
+
+if __name__ == "__main__":
+    collection.delete_many({})
+    collection.insert_one(alerts)
+
+    print("Daily alerts seeded!")
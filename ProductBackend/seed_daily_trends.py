@@ -19,8 +19,13 @@ for i in range(5):
         "compliance_percent": round(85 + i * 0.5, 1)
     })
 
-# Clear old and insert new
-trends_collection.delete_many({})
-trends_collection.insert_many(data)
+def documents():
+    return {"daily_trends": data}
 
-print("5-day trends seeded!")
\ No newline at end of file
+
+if __name__ == "__main__":
+    # Clear old and insert new
+    trends_collection.delete_many({})
+    trends_collection.insert_many(data)
+
+    print("5-day trends seeded!")
@@ -9,20 +9,7 @@ MONGO_URI = os.getenv("MONGODB_URI", "mongodb://localhost:27017/")
 client = MongoClient(MONGO_URI)
 db = client["product"]
 
-def seed_events_data():
-    """
-    Seeds the events & alert monitoring module with sample data.
-    """
-    
-    print("🔄 Starting Events & Alert Monitoring Data Seeding...")
-    
-    # Drop existing collections
-    collections_to_drop = ["threat_campaigns", "security_alerts", "incident_responses", "alert_metrics"]
-    for collection in collections_to_drop:
-        if collection in db.list_collection_names():
-            db[collection].drop()
-            print(f"   ✓ Dropped {collection}")
-    
+def documents():
     # Helper for current UTC time (Fixes DeprecationWarning)
     now = datetime.now(timezone.utc)
 
@@ -80,8 +67,6 @@ def seed_events_data():
         }
     ]
     
-    db["threat_campaigns"].insert_many(campaigns_data)
-    print(f"   ✓ Inserted {len(campaigns_data)} threat campaigns")
     
     # ============================================
     # 2. SECURITY ALERTS
@@ -173,8 +158,6 @@ def seed_events_data():
         }
     ]
     
-    db["security_alerts"].insert_many(alerts_data)
-    print(f"   ✓ Inserted {len(alerts_data)} security alerts")
     
     # ============================================
     # 3. INCIDENT RESPONSES
@@ -218,8 +201,6 @@ def seed_events_data():
         }
     ]
     
-    db["incident_responses"].insert_many(responses_data)
-    print(f"   ✓ Inserted {len(responses_data)} incident responses")
     
     # ============================================
     # 4. ALERT METRICS
@@ -244,11 +225,35 @@ def seed_events_data():
             "updated_at": now
         }
     ]
+
+    return {
+        "threat_campaigns": campaigns_data,
+        "security_alerts": alerts_data,
+        "incident_responses": responses_data,
+        "alert_metrics": metrics_data
+    }
+
+
+def seed_events_data():
+    """
+    Seeds the events & alert monitoring module with sample data.
+    """
     
-    db["alert_metrics"].insert_many(metrics_data)
-    print(f"   ✓ Inserted {len(metrics_data)} alert metrics")
+    print("🔄 Starting Events & Alert Monitoring Data Seeding...")
     
+    # Drop existing collections
+    collections_to_drop = ["threat_campaigns", "security_alerts", "incident_responses", "alert_metrics"]
+    for collection in collections_to_drop:
+        if collection in db.list_collection_names():
+            db[collection].drop()
+            print(f"   ✓ Dropped {collection}")
+
+    for name, docs in documents().items():
+        db[name].insert_many(docs)
+        print(f"   ✓ Inserted {len(docs)} {name}")
+
     print("\n✅ Events & Alert Monitoring data seeding completed successfully!")
 
+
 if __name__ == "__main__":
     seed_events_data()
\ No newline at end of file
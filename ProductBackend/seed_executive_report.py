@@ -9,19 +9,9 @@ MONGO_URI = os.getenv("MONGODB_URI", "mongodb://localhost:27017/")
 client = MongoClient(MONGO_URI)
 db = client["product"]
 
-def seed_executive_report_data():
-    """
-    Seeds executive_reports collection with sample data matching the screenshots.
-    """
-    print("🔄 Starting Executive Report Data Seeding...")
-
-    COLLECTION_NAME = "executive_reports"
-
-    # Drop existing
-    if COLLECTION_NAME in db.list_collection_names():
-        db[COLLECTION_NAME].drop()
-        print(f"   ✓ Dropped existing {COLLECTION_NAME} collection")
+COLLECTION_NAME = "executive_reports"
 
+def documents():
     now = datetime.now(timezone.utc)
 
     report_data = {
@@ -66,9 +56,29 @@ def seed_executive_report_data():
         "generated_at": now
     }
 
-    db[COLLECTION_NAME].insert_one(report_data)
-    print(f"   ✓ Inserted executive report for {report_data['reporting_period']}")
+    return {
+        COLLECTION_NAME: [report_data]
+    }
+
+
+def seed_executive_report_data():
+    """
+    Seeds executive_reports collection with sample data matching the screenshots.
+    """
+    print("🔄 Starting Executive Report Data Seeding...")
+
+
+    # Drop existing
+    if COLLECTION_NAME in db.list_collection_names():
+        db[COLLECTION_NAME].drop()
+        print(f"   ✓ Dropped existing {COLLECTION_NAME} collection")
+
+    for name, docs in documents().items():
+        db[name].insert_many(docs)
+        print(f"   ✓ Inserted {len(docs)} {name}")
+
     print("\n✅ Executive Report data seeding completed successfully!")
 
+
 if __name__ == "__main__":
     seed_executive_report_data()
\ No newline at end of file
@@ -9,19 +9,9 @@ MONGO_URI = os.getenv("MONGODB_URI", "mongodb://localhost:27017/")
 client = MongoClient(MONGO_URI)
 db = client["product"]
 
-def seed_incident_data():
-    """
-    Seeds incident_responses collection with detailed data for IR Lite module.
-    """
-    print("🔄 Starting Incident Response Data Seeding...")
-
-    COLLECTION_NAME = "incident_responses"
-
-    # Drop to ensure clean slate for this module's testing
-    if COLLECTION_NAME in db.list_collection_names():
-        db[COLLECTION_NAME].drop()
-        print(f"   ✓ Dropped existing {COLLECTION_NAME} collection")
+COLLECTION_NAME = "incident_responses"
 
+def documents():
     now = datetime.now(timezone.utc)
 
     incidents = [
@@ -102,9 +92,29 @@ def seed_incident_data():
         }
     ]
 
-    db[COLLECTION_NAME].insert_many(incidents)
-    print(f"   ✓ Inserted {len(incidents)} incidents")
+    return {
+        COLLECTION_NAME: incidents
+    }
+
+
+def seed_incident_data():
+    """
+    Seeds incident_responses collection with detailed data for IR Lite module.
+    """
+    print("🔄 Starting Incident Response Data Seeding...")
+
+
+    # Drop to ensure clean slate for this module's testing
+    if COLLECTION_NAME in db.list_collection_names():
+        db[COLLECTION_NAME].drop()
+        print(f"   ✓ Dropped existing {COLLECTION_NAME} collection")
+
+    for name, docs in documents().items():
+        db[name].insert_many(docs)
+        print(f"   ✓ Inserted {len(docs)} {name}")
+
     print("\n✅ Incident Response data seeding completed successfully!")
 
+
 if __name__ == "__main__":
     seed_incident_data()
\ No newline at end of file
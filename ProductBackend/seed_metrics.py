@@ -46,13 +46,18 @@ key_metrics = [
     }
 ]
 
-# Insert or update each metric
-for m in key_metrics:
-    metrics_collection.update_one(
-        {"type": m["type"]},
-        {"$set": m},
-        upsert=True  # create if not exists
-    )
+def documents():
+    return {"metrics": key_metrics}
 
-print("Key metrics seeded successfully! Check MongoDB Compass.")
-print("You can now delete this file or run it again to update values.")
\ No newline at end of file
+
+if __name__ == "__main__":
+    # Insert or update each metric
+    for m in key_metrics:
+        metrics_collection.update_one(
+            {"type": m["type"]},
+            {"$set": m},
+            upsert=True  # create if not exists
+        )
+
+    print("Key metrics seeded successfully! Check MongoDB Compass.")
+    print("You can now delete this file or run it again to update values.")
@@ -48,7 +48,12 @@ modules = [
     }
 ]
 
-collection.delete_many({})
-collection.insert_many(modules)
+def documents():
+    return {"module_health": modules}
 
-print("Module health seeded!")
\ No newline at end of file
+
+if __name__ == "__main__":
+    collection.delete_many({})
+    collection.insert_many(modules)
+
+    print("Module health seeded!")
@@ -40,11 +40,16 @@ indicators = [
     }
 ]
 
-for ind in indicators:
-    indicators_collection.update_one(
-        {"type": ind["type"]},
-        {"$set": ind},
-        upsert=True
-    )
+def documents():
+    return {"operational_indicators": indicators}
 
-print("Operational indicators seeded successfully!")
\ No newline at end of file
+
+if __name__ == "__main__":
+    for ind in indicators:
+        indicators_collection.update_one(
+            {"type": ind["type"]},
+            {"$set": ind},
+            upsert=True
+        )
+
+    print("Operational indicators seeded successfully!")
@@ -10,20 +10,9 @@ MONGO_URI = os.getenv("MONGODB_URI", "mongodb://localhost:27017/")
 client = MongoClient(MONGO_URI)
 db = client["product"]
 
-def seed_phishing_data():
-    """
-    Seeds the phishing_intelligence collection with realistic threat data.
-    """
-    print("🔄 Starting Phishing Intelligence Data Seeding...")
-
-    # Collection Name
-    COLLECTION_NAME = "phishing_intelligence"
-
-    # Drop existing collection to start fresh
-    if COLLECTION_NAME in db.list_collection_names():
-        db[COLLECTION_NAME].drop()
-        print(f"   ✓ Dropped existing {COLLECTION_NAME} collection")
+COLLECTION_NAME = "phishing_intelligence"
 
+def documents():
     now = datetime.now(timezone.utc)
 
     # Realistic Phishing Campaigns
@@ -115,9 +104,30 @@ def seed_phishing_data():
     ]
 
     # Insert Data
-    db[COLLECTION_NAME].insert_many(phishing_data)
-    print(f"   ✓ Inserted {len(phishing_data)} phishing intelligence records")
+
+    return {
+        COLLECTION_NAME: phishing_data
+    }
+
+
+def seed_phishing_data():
+    """
+    Seeds the phishing_intelligence collection with realistic threat data.
+    """
+    print("🔄 Starting Phishing Intelligence Data Seeding...")
+
+
+    # Drop existing collection to start fresh
+    if COLLECTION_NAME in db.list_collection_names():
+        db[COLLECTION_NAME].drop()
+        print(f"   ✓ Dropped existing {COLLECTION_NAME} collection")
+
+    for name, docs in documents().items():
+        db[name].insert_many(docs)
+        print(f"   ✓ Inserted {len(docs)} {name}")
+
     print("\n✅ Phishing Intelligence data seeding completed successfully!")
 
+
 if __name__ == "__main__":
     seed_phishing_data()
\ No newline at end of file
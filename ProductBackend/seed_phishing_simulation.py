@@ -9,22 +9,10 @@ MONGO_URI = os.getenv("MONGODB_URI", "mongodb://localhost:27017/")
 client = MongoClient(MONGO_URI)
 db = client["product"]
 
-def seed_simulation_data():
-    """
-    Seeds phishing_simulations and phishing_templates collections.
-    """
-    print("🔄 Starting Phishing Simulation Data Seeding...")
-
-    # Collections
-    SIM_COLLECTION = "phishing_simulations"
-    TMP_COLLECTION = "phishing_templates"
-
-    # Drop existing
-    for col in [SIM_COLLECTION, TMP_COLLECTION]:
-        if col in db.list_collection_names():
-            db[col].drop()
-            print(f"   ✓ Dropped {col}")
+SIM_COLLECTION = "phishing_simulations"
+TMP_COLLECTION = "phishing_templates"
 
+def documents():
     now = datetime.now(timezone.utc)
 
     # 1. Phishing Simulations
@@ -137,13 +125,31 @@ def seed_simulation_data():
         }
     ]
 
-    db[SIM_COLLECTION].insert_many(simulations)
-    print(f"   ✓ Inserted {len(simulations)} simulations")
+    return {
+        SIM_COLLECTION: simulations,
+        TMP_COLLECTION: templates
+    }
 
-    db[TMP_COLLECTION].insert_many(templates)
-    print(f"   ✓ Inserted {len(templates)} templates")
+
+def seed_simulation_data():
+    """
+    Seeds phishing_simulations and phishing_templates collections.
+    """
+    print("🔄 Starting Phishing Simulation Data Seeding...")
+
+
+    # Drop existing
+    for col in [SIM_COLLECTION, TMP_COLLECTION]:
+        if col in db.list_collection_names():
+            db[col].drop()
+            print(f"   ✓ Dropped {col}")
+
+    for name, docs in documents().items():
+        db[name].insert_many(docs)
+        print(f"   ✓ Inserted {len(docs)} {name}")
 
     print("\n✅ Phishing Simulation data seeding completed successfully!")
 
+
 if __name__ == "__main__":
     seed_simulation_data()
\ No newline at end of file
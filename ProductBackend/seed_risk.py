@@ -1,32 +1,27 @@
-from pymongo import MongoClient
+from database import db
 
-# Connect to MongoDB
-client = MongoClient("mongodb://localhost:27017/")
-db = client["security_db"]
-
-# Clear existing data (optional, for clean seeding)
-db.risk_summary.drop()
-db.risk_posture.drop()
-db.risk_category_breakdown.drop()
-db.risk_business_units.drop()
-db.risk_internal_drivers.drop()
-db.risk_external_drivers.drop()
-db.risk_recommendations.drop()
-
-print("Seeding risk exposure data...")
+RISK_COLLECTIONS = [
+    "risk_summary",
+    "risk_posture",
+    "risk_category_breakdown",
+    "risk_business_units",
+    "risk_internal_drivers",
+    "risk_external_drivers",
+    "risk_recommendations",
+]
 
 # 1. risk_summary
-db.risk_summary.insert_one({
+risk_summary = {
     "overall_risk": 7.2,
     "projected_risk": 5.9,
     "time_to_remediate": 23,
     "risk_velocity": -12,
     "top_drivers": ["Unpatched Vulns", "Weak Access Controls", "Cloud Misconfig"],
     "monthly_story": "Risk decreased 4% this month driven by aggressive vulnerability patching and MFA rollout. Production systems remain the highest priority area."
-})
+}
 
 # 2. risk_posture
-db.risk_posture.insert_one({
+risk_posture = {
     "categories": [
         {"category": "Vulnerabilities", "current": 7.5, "target": 5.5, "industry": 7.2, "peer": 7.4},
         {"category": "Threats", "current": 7.5, "target": 5.5, "industry": 7.2, "peer": 7.4},
@@ -35,44 +30,44 @@ db.risk_posture.insert_one({
         {"category": "Network Security", "current": 6.5, "target": 5.2, "industry": 6.8, "peer": 6.9},
         {"category": "Compliance", "current": 8.1, "target": 6.0, "industry": 7.8, "peer": 8.0}
     ]
-})
+}
 
 # 3. risk_category_breakdown
-db.risk_category_breakdown.insert_one({
+risk_category_breakdown = {
     "breakdown": [
         {"name": "Vulnerabilities", "value": 35, "color": "#ef4444"},
         {"name": "Compliance Gaps", "value": 25, "color": "#f97316"},
         {"name": "Threat Exposure", "value": 25, "color": "#eab308"},
         {"name": "Asset Exposure", "value": 15, "color": "#22c55e"}
     ]
-})
+}
 
 # 4. risk_business_units
-db.risk_business_units.insert_many([
+risk_business_units = [
     {"name": "Production Systems", "risk": 8.5, "contribution": 28.5, "assets": 89, "vulns": 34, "criticality": 95, "trend": -0.2},
     {"name": "Corporate Network", "risk": 7.1, "contribution": 22.3, "assets": 234, "vulns": 45, "criticality": 78, "trend": 0.3},
     {"name": "Remote Endpoints", "risk": 6.9, "contribution": 19.8, "assets": 445, "vulns": 67, "criticality": 65, "trend": -0.4},
     {"name": "Development Environment", "risk": 6.2, "contribution": 15.2, "assets": 67, "vulns": 23, "criticality": 52, "trend": 0.1}
-])
+]
 
 # 5. risk_internal_drivers
-db.risk_internal_drivers.insert_many([
+risk_internal_drivers = [
     {"rank": 1, "title": "Unpatched Systems", "description": "89 production servers missing critical patches", "risk": 8.5, "issues": 89, "incident": "INC-2024-0045"},
     {"rank": 2, "title": "Weak Authentication", "description": "234 admin accounts without MFA", "risk": 7.8, "issues": 234, "incident": "INC-2024-0031"},
     {"rank": 3, "title": "Cloud Misconfigurations", "description": "67 S3 buckets with public exposure", "risk": 7.1, "issues": 67},
     {"rank": 4, "title": "Data Access Controls", "description": "Over-privileged access to customer databases", "risk": 6.9, "issues": 45}
-])
+]
 
 # 6. risk_external_drivers
-db.risk_external_drivers.insert_many([
+risk_external_drivers = [
     {"rank": 1, "title": "APT29 Campaign Targeting", "description": "Active targeting of Apache servers with CVE-2024-12345", "risk": 8.8, "actor": "APT29 (Cozy Bear)", "incident": "INC-2024-0045"},
     {"rank": 2, "title": "Exposed Services", "description": "23 internet-facing services with known vulnerabilities", "risk": 8.1, "actor": "Multiple threat actors"},
     {"rank": 3, "title": "Phishing Campaigns", "description": "Finance-themed phishing targeting employees", "risk": 7.2, "actor": "FIN7 (Carbanak)", "incident": "INC-2024-0039"},
     {"rank": 4, "title": "Supply Chain Risk", "description": "Third-party vendor security assessments overdue", "risk": 6.5, "actor": "Nation-state actors"}
-])
+]
 
 # 7. risk_recommendations
-db.risk_recommendations.insert_many([
+risk_recommendations = [
     {
         "priority": "Critical",
         "roi": "High",
@@ -141,6 +136,28 @@ db.risk_recommendations.insert_many([
         "assets": 89,
         "businessUnits": ["Production Systems", "Cloud Infrastructure"]
     }
-])
+]
+
+
+def documents():
+    return {
+        "risk_summary": [risk_summary],
+        "risk_posture": [risk_posture],
+        "risk_category_breakdown": [risk_category_breakdown],
+        "risk_business_units": risk_business_units,
+        "risk_internal_drivers": risk_internal_drivers,
+        "risk_external_drivers": risk_external_drivers,
+        "risk_recommendations": risk_recommendations
+    }
+
+
+if __name__ == "__main__":
+    # Clear existing data (optional, for clean seeding)
+    for name in RISK_COLLECTIONS:
+        db[name].drop()
+
+    print("Seeding risk exposure data...")
+    for name, docs in documents().items():
+        db[name].insert_many(docs)
 
-print("Risk exposure data seeded successfully!")
\ No newline at end of file
+    print("Risk exposure data seeded successfully!")
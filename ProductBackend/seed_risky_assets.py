@@ -29,7 +29,12 @@ risks = [
     }
 ]
 
-collection.delete_many({})
-collection.insert_many(risks)
+def documents():
+    return {"risky_assets": risks}
 
-print("Risky assets seeded!")
\ No newline at end of file
+
+if __name__ == "__main__":
+    collection.delete_many({})
+    collection.insert_many(risks)
+
+    print("Risky assets seeded!")
@@ -9,15 +9,10 @@ MONGO_URI = os.getenv("MONGODB_URI", "mongodb://localhost:27017/")
 client = MongoClient(MONGO_URI)
 db = client["product"]
 
-def seed_full_settings():
-    print("🔄 Starting Full Settings Data Seeding...")
-
-    # 1. System Settings
-    if "system_settings" in db.list_collection_names():
-        db["system_settings"].drop()
-    
+def documents():
     now = datetime.now(timezone.utc)
 
+    # 1. System Settings
     settings = {
         "organization_name": "CyberDefense Corp",
         "contact_email": "admin@cyberdefense.com",
@@ -63,21 +58,29 @@ def seed_full_settings():
             "alerts_processed": 15632
         }
     }
-    db["system_settings"].insert_one(settings)
-    print("   ✓ Seeding system_settings")
 
     # 2. Users
-    if "users" in db.list_collection_names():
-        db["users"].drop()
-    
     users = [
         {"id": "u1", "name": "John Smith", "email": "john.smith@company.com", "role": "Admin", "status": "Active", "last_login": now},
         {"id": "u2", "name": "Sarah Johnson", "email": "sarah.johnson@company.com", "role": "Analyst", "status": "Active", "last_login": now},
         {"id": "u3", "name": "Mike Chen", "email": "mike.chen@company.com", "role": "Analyst", "status": "Active", "last_login": now},
         {"id": "u4", "name": "Lisa Davis", "email": "lisa.davis@company.com", "role": "Viewer", "status": "Inactive", "last_login": now}
     ]
-    db["users"].insert_many(users)
-    print("   ✓ Seeding users")
+
+    return {
+        "system_settings": [settings],
+        "users": users
+    }
+
+
+def seed_full_settings():
+    print("🔄 Starting Full Settings Data Seeding...")
+
+    for name, docs in documents().items():
+        if name in db.list_collection_names():
+            db[name].drop()
+        db[name].insert_many(docs)
+        print(f"   ✓ Seeding {name}")
 
     print("\n✅ Full Settings seeding completed!")
 
@@ -30,7 +30,12 @@ risks = [
     }
 ]
 
-collection.delete_many({})
-collection.insert_many(risks)
+def documents():
+    return {"top_risks": risks}
 
-print("Top risks seeded!")
\ No newline at end of file
+
+if __name__ == "__main__":
+    collection.delete_many({})
+    collection.insert_many(risks)
+
+    print("Top risks seeded!")
@@ -9,7 +9,12 @@ dist = [
     {"severity": "Low", "count": 123, "trend": -8}
 ]
 
-collection.delete_many({})
-collection.insert_many(dist)
+def documents():
+    return {"vuln_severity_distribution": dist}
 
-print("Severity distribution seeded!")
\ No newline at end of file
+
+if __name__ == "__main__":
+    collection.delete_many({})
+    collection.insert_many(dist)
+
+    print("Severity distribution seeded!")
@@ -17,7 +17,12 @@ summary = {
     "updated_at": datetime.utcnow()
 }
 
-collection.delete_many({})
-collection.insert_one(summary)
+def documents():
+    return {"vuln_summary": [summary]}
 
-print("Vuln summary seeded!")
\ No newline at end of file
+
+if __name__ == "__main__":
+    collection.delete_many({})
+    collection.insert_one(summary)
+
+    print("Vuln summary seeded!")
@@ -15,7 +15,7 @@ vulns = [
         "exposure_score": 95,
         "risk_score": 9.5,
         "status": "Open",
-        "age_days": 13,
+        "first_seen": datetime.utcnow() - timedelta(days=13),
         "threat_actors": ["APT29", "Lazarus Group"]
     },
     {
@@ -29,7 +29,7 @@ vulns = [
         "exposure_score": 82,
         "risk_score": 7.8,
         "status": "In Progress",
-        "age_days": 39
+        "first_seen": datetime.utcnow() - timedelta(days=39)
     },
     {
         "cve_id": "CVE-2024-22222",
@@ -42,7 +42,8 @@ vulns = [
         "exposure_score": 68,
         "risk_score": 5.2,
         "status": "Patched",
-        "age_days": 74
+        "first_seen": datetime.utcnow() - timedelta(days=74),
+        "patched_at": datetime.utcnow() - timedelta(days=12)
     },
     {
         "cve_id": "CVE-2024-33333",
@@ -55,12 +56,17 @@ vulns = [
         "exposure_score": 88,
         "risk_score": 8.3,
         "status": "Open",
-        "age_days": 27,
+        "first_seen": datetime.utcnow() - timedelta(days=27),
         "threat_actors": ["FIN7"]
     }
 ]
 
-collection.delete_many({})
-collection.insert_many(vulns)
+def documents():
+    return {"vulnerabilities": vulns}
 
-print("Vulnerabilities inventory seeded!")
\ No newline at end of file
+
+if __name__ == "__main__":
+    collection.delete_many({})
+    collection.insert_many(vulns)
+
+    print("Vulnerabilities inventory seeded!")
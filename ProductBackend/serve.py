@@ -0,0 +1,116 @@
+# Production entry point: N uvicorn workers forked from one preloaded parent.
+#
+#   python serve.py --port $PORT --workers 4
+#
+# The parent imports main (app code, routers, pydantic models) once and creates the
+# shared-memory response cache, then forks. Workers inherit both copy-on-write and
+# each opens its own MongoDB pool in the app lifespan (nothing connects at import).
+# They all accept on one listening socket; the parent only supervises and restarts
+# workers that die. Linux/macOS only (fork).
+
+import argparse
+import logging
+import os
+import signal
+import socket
+import sys
+import time
+
+import cache
+
+logger = logging.getLogger("crv360")
+
+
+def _bind(host, port, backlog=2048):
+    sock = socket.socket(socket.AF_INET6 if ":" in host else socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+def _run_worker(app, sock, args):
+    import uvicorn
+
+    # The parent's handlers would otherwise fire in every worker.
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    config = uvicorn.Config(app, lifespan="on", log_level=args.log_level,
+                            timeout_keep_alive=args.keep_alive, proxy_headers=True)
+    uvicorn.Server(config).run(sockets=[sock])
+
+
+def _spawn(app, sock, args):
+    pid = os.fork()
+    if pid == 0:
+        code = 0
+        try:
+            _run_worker(app, sock, args)
+        except BaseException:
+            logger.exception("Worker %d crashed", os.getpid())
+            code = 1
+        finally:
+            os._exit(code)
+    return pid
+
+
+def serve(args):
+    started = time.perf_counter()
+    # Workers on one host share memory; across hosts, CACHE_BACKEND=redis shares via Redis.
+    cache.configure(os.getenv("CACHE_BACKEND", "shm"), slots=args.cache_slots, slot_bytes=args.cache_slot_bytes)
+    import main  # preload once; workers inherit it
+
+    logger.info("Preloaded app in %.0f ms", (time.perf_counter() - started) * 1000)
+    sock = _bind(args.host, args.port)
+    workers = {_spawn(main.app, sock, args) for _ in range(args.workers)}
+    print(f"🚀 CRV360 serving on {args.host}:{args.port} with {len(workers)} workers (parent {os.getpid()})")
+
+    stopping = False
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in workers:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    while workers:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        except InterruptedError:
+            continue
+        workers.discard(pid)
+        if not stopping:
+            logger.warning("Worker %d exited (status %d); restarting", pid, status)
+            time.sleep(1)  # don't spin if workers die at startup
+            workers.add(_spawn(main.app, sock, args))
+    sock.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the backend with multiple preforked workers.")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT", "8000")))
+    parser.add_argument("--workers", type=int, default=int(os.getenv("WEB_CONCURRENCY", os.cpu_count() or 1)))
+    parser.add_argument("--keep-alive", type=int, default=5, help="seconds to hold idle keep-alive connections")
+    parser.add_argument("--log-level", default="info")
+    parser.add_argument("--cache-slots", type=int, default=int(os.getenv("SHM_CACHE_SLOTS", "2048")))
+    parser.add_argument("--cache-slot-bytes", type=int, default=int(os.getenv("SHM_CACHE_SLOT_BYTES", "32768")))
+    args = parser.parse_args()
+
+    logging.basicConfig(level=args.log_level.upper(), format="%(asctime)s %(process)d %(levelname)s %(message)s")
+    if not hasattr(os, "fork"):
+        sys.exit("serve.py needs fork(); use `uvicorn main:app` on this platform")
+    serve(args)
+
+
+if __name__ == "__main__":
+    main()
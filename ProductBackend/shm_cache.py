@@ -0,0 +1,191 @@
+# Response cache shared by every worker forked from serve.py.
+#
+# One mmap'd file (unlinked right after creation, so nothing is left behind) holds a
+# direct-mapped table of fixed-size slots. Readers never lock: each slot carries a
+# sequence number that writers make odd while they copy, and a reader that sees it
+# change simply retries or misses. Writers serialize with a POSIX record lock (per
+# process) plus a thread lock (per worker). Clearing everything bumps a generation
+# number in the header instead of touching every slot.
+
+import fcntl
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import time
+import zlib
+
+_MAGIC = b"CRV360SC"
+_HEADER = struct.Struct("<8sIIQ")          # magic, slots, slot_bytes, generation
+_HEADER_SIZE = 64
+_GENERATION_OFFSET = 16
+_SLOT = struct.Struct("<QQddII")           # seq, generation, expires_at, stored_at, key_len, value_len
+_SEQ = struct.Struct("<Q")
+_READ_RETRIES = 3
+
+
+def encode_response(response):
+    """(status, [(name, value)], body) -> bytes."""
+    status, headers, body = response
+    parts = [struct.pack("<HH", status, len(headers))]
+    for name, value in headers:
+        parts.append(struct.pack("<HH", len(name), len(value)))
+        parts.append(name)
+        parts.append(value)
+    parts.append(body)
+    return b"".join(parts)
+
+
+def decode_response(data):
+    status, count = struct.unpack_from("<HH", data, 0)
+    offset = 4
+    headers = []
+    for _ in range(count):
+        name_len, value_len = struct.unpack_from("<HH", data, offset)
+        offset += 4
+        name = data[offset:offset + name_len]
+        offset += name_len
+        headers.append((name, data[offset:offset + value_len]))
+        offset += value_len
+    return status, headers, data[offset:]
+
+
+class SharedMemoryCache:
+    """
+    Same interface as cache.TTLCache, but backed by shared memory so every worker
+    sees (and invalidates) the same entries. Create it in the parent before forking.
+    Values must be (status, headers, body) responses; ones that don't fit a slot are
+    not cached, and evict whatever the key held before.
+    """
+
+    def __init__(self, slots=2048, slot_bytes=32 * 1024, directory=None):
+        self.slots = slots
+        self.slot_bytes = slot_bytes
+        directory = directory or ("/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir())
+        fd, path = tempfile.mkstemp(prefix="crv360-cache-", dir=directory)
+        os.unlink(path)
+        os.ftruncate(fd, _HEADER_SIZE + slots * slot_bytes)
+        self._fd = fd
+        self._mm = mmap.mmap(fd, _HEADER_SIZE + slots * slot_bytes, mmap.MAP_SHARED)
+        self._view = memoryview(self._mm)
+        _HEADER.pack_into(self._mm, 0, _MAGIC, slots, slot_bytes, 1)
+        self._thread_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    # --- layout -------------------------------------------------------------
+
+    def _offset(self, key_bytes):
+        return _HEADER_SIZE + (zlib.crc32(key_bytes) % self.slots) * self.slot_bytes
+
+    def _generation(self):
+        return _SEQ.unpack_from(self._mm, _GENERATION_OFFSET)[0]
+
+    def _write_lock(self):
+        return _WriteLock(self._fd, self._thread_lock)
+
+    def _clear(self, offset):
+        """Empties a slot so readers miss; the caller holds the write lock."""
+        seq, _, _, stored_at, key_len, value_len = _SLOT.unpack_from(self._mm, offset)
+        _SEQ.pack_into(self._mm, offset, seq + 1)
+        _SLOT.pack_into(self._mm, offset, seq + 1, 0, 0.0, stored_at, key_len, value_len)
+        _SEQ.pack_into(self._mm, offset, seq + 2)
+
+    def _holds(self, offset, key_bytes):
+        key_len = _SLOT.unpack_from(self._mm, offset)[4]
+        start = offset + _SLOT.size
+        return key_len == len(key_bytes) and self._view[start:start + key_len] == key_bytes
+
+    # --- TTLCache interface -------------------------------------------------
+
+    def get(self, key):
+        """Returns (value, stored_at) or None."""
+        key_bytes = key.encode()
+        offset = self._offset(key_bytes)
+        data_start = offset + _SLOT.size
+        for _ in range(_READ_RETRIES):
+            seq, generation, expires_at, stored_at, key_len, value_len = _SLOT.unpack_from(self._mm, offset)
+            if seq & 1:
+                continue  # a writer is mid-copy
+            if (generation != self._generation() or expires_at < time.time()
+                    or key_len != len(key_bytes)
+                    or self._view[data_start:data_start + key_len] != key_bytes):
+                break
+            value = bytes(self._view[data_start + key_len:data_start + key_len + value_len])
+            if _SEQ.unpack_from(self._mm, offset)[0] != seq:
+                continue  # overwritten while we copied
+            self.hits += 1
+            return decode_response(value), stored_at
+        self.misses += 1
+        return None
+
+    def set(self, key, value, ttl):
+        key_bytes = key.encode()
+        data = encode_response(value)
+        offset = self._offset(key_bytes)
+        if _SLOT.size + len(key_bytes) + len(data) > self.slot_bytes:
+            # Too big to cache: the previous value for this key mustn't keep being served.
+            with self._write_lock():
+                if self._holds(offset, key_bytes):
+                    self._clear(offset)
+            return
+        now = time.time()
+        with self._write_lock():
+            seq = _SEQ.unpack_from(self._mm, offset)[0]
+            _SEQ.pack_into(self._mm, offset, seq + 1)
+            data_start = offset + _SLOT.size
+            self._mm[data_start:data_start + len(key_bytes)] = key_bytes
+            self._mm[data_start + len(key_bytes):data_start + len(key_bytes) + len(data)] = data
+            _SLOT.pack_into(self._mm, offset, seq + 1, self._generation(), now + ttl, now,
+                            len(key_bytes), len(data))
+            _SEQ.pack_into(self._mm, offset, seq + 2)
+
+    def invalidate(self, prefix=""):
+        """Evicts keys starting with `prefix` in every worker. "" bumps the generation instead."""
+        if not prefix:
+            evicted = self.stats()["entries"]
+            with self._write_lock():
+                _SEQ.pack_into(self._mm, _GENERATION_OFFSET, self._generation() + 1)
+            return evicted
+        with self._write_lock():
+            generation = self._generation()
+            prefix_bytes = prefix.encode()
+            evicted = 0
+            for offset in range(_HEADER_SIZE, _HEADER_SIZE + self.slots * self.slot_bytes, self.slot_bytes):
+                _, slot_generation, _, _, key_len, _ = _SLOT.unpack_from(self._mm, offset)
+                if slot_generation != generation or key_len < len(prefix_bytes):
+                    continue
+                start = offset + _SLOT.size
+                if self._view[start:start + len(prefix_bytes)] != prefix_bytes:
+                    continue
+                self._clear(offset)
+                evicted += 1
+            return evicted
+
+    def stats(self):
+        generation = self._generation()
+        now = time.time()
+        entries = 0
+        for offset in range(_HEADER_SIZE, _HEADER_SIZE + self.slots * self.slot_bytes, self.slot_bytes):
+            _, slot_generation, expires_at, _, _, _ = _SLOT.unpack_from(self._mm, offset)
+            if slot_generation == generation and expires_at >= now:
+                entries += 1
+        return {"entries": entries, "hits": self.hits, "misses": self.misses,
+                "backend": "shared-memory", "slots": self.slots}
+
+
+class _WriteLock:
+    """Thread lock (workers run handlers on threads) + lockf (workers are processes)."""
+
+    def __init__(self, fd, thread_lock):
+        self._fd = fd
+        self._thread_lock = thread_lock
+
+    def __enter__(self):
+        self._thread_lock.acquire()
+        fcntl.lockf(self._fd, fcntl.LOCK_EX)
+
+    def __exit__(self, *exc):
+        fcntl.lockf(self._fd, fcntl.LOCK_UN)
+        self._thread_lock.release()
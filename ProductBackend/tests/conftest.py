@@ -0,0 +1,35 @@
+# Shared fixtures. Tests that need MongoDB run against mongomock, an in-memory stand-in
+# (pip install mongomock), and are skipped when it isn't installed.
+
+import functools
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import database  # noqa: E402
+
+
+def _drop_sort(add):
+    # pymongo 4.11+ passes sort= to the bulk builder, which mongomock doesn't accept.
+    @functools.wraps(add)
+    def wrapper(*args, sort=None, **kwargs):
+        return add(*args, **kwargs)
+    return wrapper
+
+
+@pytest.fixture
+def db(monkeypatch):
+    """A fresh in-memory database behind `database.db`."""
+    mongomock = pytest.importorskip("mongomock")
+    from mongomock.collection import BulkOperationBuilder
+
+    monkeypatch.setattr(BulkOperationBuilder, "add_update", _drop_sort(BulkOperationBuilder.add_update))
+    monkeypatch.setattr(BulkOperationBuilder, "add_replace", _drop_sort(BulkOperationBuilder.add_replace))
+    monkeypatch.setattr(database, "MongoClient", lambda *args, **kwargs: mongomock.MongoClient())
+    monkeypatch.setattr(database, "_client", None)
+    database.connect()
+    yield database.db
+    database.close()
@@ -0,0 +1,61 @@
+import pytest
+
+import asset_identity
+from asset_identity import _hostname, strong_keys
+
+
+@pytest.fixture
+def identity(db, monkeypatch):
+    monkeypatch.setattr(asset_identity, "identity_index", asset_identity.IdentityIndex())
+    return asset_identity
+
+
+def test_hostname_ignores_display_names():
+    assert _hostname({"name": "Web Server"}) is None
+    assert _hostname({"hostname": "Web1.Corp.", "name": "Web Server"}) == "web1.corp"
+    assert _hostname({"fqdn": "db1.corp"}) == "db1.corp"
+    assert _hostname({"hostname": "10.0.0.5"}) is None
+
+
+def test_strong_keys():
+    assert strong_keys({"instance_id": "i-123", "mac": "00:11:22:AA:BB:CC", "hostname": "web1"}) == {
+        "iid": "iid:i-123", "mac": "mac:001122aabbcc", "host": "host:web1"}
+    assert strong_keys({"mac": "ff:ff:ff:ff:ff:ff", "name": "Web Server"}) == {}
+
+
+def test_assets_sharing_a_display_name_stay_separate(identity):
+    first, created_first = identity.upsert({"name": "Web Server", "ip": "10.0.0.1"}, "manual")
+    second, created_second = identity.upsert({"name": "Web Server", "ip": "10.0.0.2"}, "manual")
+    assert created_first and created_second
+    assert first != second
+
+
+def test_hostname_and_fqdn_merge_into_one_asset(identity, db):
+    asset_id, _ = identity.upsert({"name": "web", "hostname": "Web1.corp.", "ip": "10.0.0.3", "owner": "ops"}, "nmap")
+    same_id, created = identity.upsert({"fqdn": "web1.corp", "ip": "10.9.9.9", "owner": "it"}, "cmdb")
+    assert same_id == asset_id and not created
+    asset = db["assets"].find_one({"_id": asset_id})
+    assert asset["owner"] == "it"  # cmdb outranks nmap
+    assert asset["field_sources"]["owner"] == "cmdb"
+    assert asset["identity_keys"] == ["host:web1.corp"]
+    assert db["assets"].count_documents({}) == 1
+
+
+def test_lower_priority_source_does_not_overwrite(identity, db):
+    asset_id, _ = identity.upsert({"mac": "00:11:22:33:44:55", "owner": "it"}, "cmdb")
+    identity.upsert({"mac": "001122334455", "owner": "scanner", "os": "Linux"}, "nmap")
+    asset = db["assets"].find_one({"_id": asset_id})
+    assert asset["owner"] == "it"
+    assert asset["os"] == "Linux"
+
+
+def test_prune_name_keys(identity, db):
+    db["assets"].insert_many([
+        {"name": "legacy", "identity_keys": ["host:legacy", "mac:001122334455"]},
+        {"name": "legacy2", "hostname": "h2", "identity_keys": ["host:h2", "host:legacy2"]},
+        {"name": "web", "identity_keys": ["host:web"]},
+    ])
+    assert identity.prune_name_keys() == 3
+    keys = {doc["name"]: doc.get("identity_keys") for doc in db["assets"].find()}
+    assert keys == {"legacy": ["mac:001122334455"], "legacy2": ["host:h2"], "web": None}
+    assert identity.prune_name_keys() == 0
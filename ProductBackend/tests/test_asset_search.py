@@ -0,0 +1,39 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from routers import assets
+
+
+@pytest.fixture
+def client(db):
+    db["assets"].insert_many([
+        {"name": "web1", "type": "Server", "criticality": "High", "status": "Active"},
+        {"name": "web2", "type": "Server", "criticality": "Low", "status": "Active"},
+        {"name": "laptop1", "type": "Laptop", "criticality": "High", "status": "Active"},
+        {"name": "mystery", "criticality": "High", "status": "Active"},
+    ])
+    app = FastAPI()
+    app.include_router(assets.router, prefix="/api")
+    return TestClient(app)
+
+
+def _counts(facet):
+    return {group["value"]: group["count"] for group in facet}
+
+
+def test_each_facet_ignores_its_own_filter(client):
+    body = client.get("/api/assets/search", params={"type": "Server", "criticality": "High"}).json()
+    assert body["total"] == 1
+    assert _counts(body["facets"]["type"]) == {"Server": 1, "Laptop": 1, "Unknown": 1}
+    assert _counts(body["facets"]["criticality"]) == {"High": 1, "Low": 1}
+
+
+def test_unknown_facet_value_selects_assets_without_the_field(client):
+    body = client.get("/api/assets/search").json()
+    assert _counts(body["facets"]["type"])["Unknown"] == 1
+
+    body = client.get("/api/assets/search", params={"type": "Unknown"}).json()
+    assert [asset["name"] for asset in body["assets"]] == ["mystery"]
+    assert body["assets"][0]["type"] == "Unknown"
+    assert client.get("/api/assets/search", params={"type": "Unknown,Laptop"}).json()["total"] == 2
@@ -0,0 +1,85 @@
+import asyncio
+import time
+
+from fastapi import FastAPI, Request
+
+import budgets
+import counters
+
+
+def _app():
+    app = FastAPI()
+
+    @app.get("/api/assets/{asset_id}/as-of")
+    def as_of(asset_id: str):
+        time.sleep(0.2)  # a slow query
+        return {}
+
+    @app.post("/api/imports/upload")
+    async def upload(request: Request):
+        chunks = 0
+        async for _ in request.stream():
+            chunks += 1
+            await asyncio.sleep(0)
+        return {"chunks": chunks}
+
+    return budgets.QueryBudgetMiddleware(app), app
+
+
+def _scope(app, method, path):
+    return {"type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": method, "scheme": "http",
+            "path": path, "raw_path": path.encode(), "root_path": "", "query_string": b"", "headers": [],
+            "client": ("127.0.0.1", 0), "server": ("127.0.0.1", 0), "app": app}
+
+
+def test_route_template_labels_by_route():
+    _, app = _app()
+    assert budgets.route_template(_scope(app, "GET", "/api/assets/65f0c0ffee/as-of")) == "/api/assets/{asset_id}/as-of"
+    assert budgets.route_template(_scope(app, "GET", "/nowhere")) == "unmatched"
+
+
+def test_request_body_is_read_as_the_handler_consumes_it(monkeypatch):
+    middleware, app = _app()
+    read_ahead = []
+    state = {"sent": 0, "consumed": 0}
+
+    async def receive():
+        if state["sent"] == 50:
+            await asyncio.sleep(3600)  # body done: nothing until the client goes away
+        read_ahead.append(state["sent"] - state["consumed"])
+        state["sent"] += 1
+        return {"type": "http.request", "body": b"x" * 1024, "more_body": state["sent"] < 50}
+
+    class CountingQueue(asyncio.Queue):
+        async def get(self):
+            message = await super().get()
+            state["consumed"] += 1
+            return message
+
+    async def send(message):
+        pass
+
+    monkeypatch.setattr(budgets.asyncio, "Queue", CountingQueue)
+    asyncio.run(middleware(_scope(app, "POST", "/api/imports/upload"), receive, send))
+    assert max(read_ahead) <= 1
+
+
+def test_disconnect_is_seen_while_a_handler_runs(monkeypatch):
+    middleware, app = _app()
+    killed = []
+    monkeypatch.setattr(budgets, "kill_operations", lambda comment: killed.append(comment) or 1)
+    before = counters.get("client_disconnect", "/api/assets/{asset_id}/as-of")
+    messages = [{"type": "http.request", "body": b"", "more_body": False}]
+
+    async def receive():
+        if messages:
+            return messages.pop()
+        await asyncio.sleep(0.05)
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        pass
+
+    asyncio.run(middleware(_scope(app, "GET", "/api/assets/65f0c0ffee/as-of"), receive, send))
+    assert len(killed) == 1 and killed[0].startswith("/api/assets/65f0c0ffee/as-of #")
+    assert counters.get("client_disconnect", "/api/assets/{asset_id}/as-of") == before + 1
@@ -0,0 +1,99 @@
+from datetime import datetime
+
+import pytest
+
+import cpe_match
+import cve_catalog
+import risk_scoring
+import vuln_fingerprint
+from cache import TTLCache
+from cpe_match import CpeIndex, compile_rule, parse_cpe, version_key
+
+
+def test_version_key_orders_prereleases_patches_and_releases():
+    ordered = ["1.0rc1", "1.0", "1.0p1", "1.0.1", "1.2", "1.10"]
+    assert sorted(ordered, key=version_key) == ordered
+    assert version_key("1.0beta") < version_key("1.0rc1")
+
+
+def test_version_key_ignores_trailing_zeros():
+    assert version_key("2.4") == version_key("2.4.0") == version_key("2.4.0.0")
+    assert version_key("1.0rc1") == version_key("1rc1")
+    assert version_key("2.4.0") < version_key("2.4.1")
+
+
+def test_parse_cpe_both_formats():
+    assert parse_cpe("cpe:2.3:a:openbsd:openssh:7.4:p1:*:*:*:*:*:*") == ("openbsd", "openssh", "7.4p1")
+    assert parse_cpe("cpe:/a:apache:http_server:2.4.49") == ("apache", "http_server", "2.4.49")
+    assert parse_cpe("cpe:2.3:a:*:*:1.0") is None
+    assert parse_cpe("not a cpe") is None
+
+
+def test_compile_rule_range():
+    rule = compile_rule({"criteria": "cpe:2.3:a:apache:http_server:*:*:*:*:*:*:*:*",
+                         "versionStartIncluding": "2.4.0", "versionEndExcluding": "2.4.51"})
+    assert rule(version_key("2.4"))
+    assert rule(version_key("2.4.50"))
+    assert not rule(version_key("2.4.51"))
+    assert not rule(version_key("2.2.34"))
+
+
+def test_compile_rule_exact_version_and_wildcards():
+    exact = compile_rule({"criteria": "cpe:2.3:a:openbsd:openssh:7.4:p1:*:*:*:*:*:*"})
+    assert exact(version_key("7.4p1"))
+    assert not exact(version_key("7.4"))
+    every = compile_rule({"criteria": "cpe:2.3:a:vendor:product:*:*:*:*:*:*:*:*"})
+    assert every(version_key("0.1")) and every(version_key("99"))
+    assert compile_rule({"criteria": "cpe:2.3:a:vendor:product:-:*:*:*:*:*:*:*"}) is None
+    assert compile_rule({"criteria": "garbage"}) is None
+
+
+def test_refresh_compiles_entries_stamped_like_the_previous_batch(db):
+    # Loader batches share one nvd_updated_at, and may land in two parts around a refresh.
+    index = CpeIndex()
+    written = datetime.utcnow()
+    db["cve_catalog"].insert_one({"_id": "CVE-1", "nvd_updated_at": written,
+                                  "cpe": [{"criteria": "cpe:2.3:a:acme:a:1.0:*:*:*:*:*:*:*"}]})
+    index.refresh()
+    db["cve_catalog"].insert_one({"_id": "CVE-2", "nvd_updated_at": written,
+                                  "cpe": [{"criteria": "cpe:2.3:a:acme:b:1.0:*:*:*:*:*:*:*"}]})
+    index.refresh()
+    assert index.match("acme", "a", "1.0") == {"CVE-1"}
+    assert index.match("acme", "b", "1.0") == {"CVE-2"}
+    assert index.stats() == {"products": 2, "rules": 2, "cves": 2}
+
+
+@pytest.fixture
+def matcher(db, monkeypatch):
+    monkeypatch.setattr(cpe_match, "cpe_index", CpeIndex())
+    monkeypatch.setattr(cve_catalog, "_hot", TTLCache())
+    db["cve_catalog"].insert_one({"_id": "CVE-2021-41773", "cvss": 7.5, "severity": "High",
+                                  "description": "Path traversal in Apache HTTP Server 2.4.49. More.",
+                                  "nvd_updated_at": datetime.utcnow(),
+                                  "cpe": [{"criteria": "cpe:2.3:a:apache:http_server:2.4.49:*:*:*:*:*:*:*"}]})
+    db["assets"].insert_one({"_id": "a1", "software": [{"cpe": "cpe:/a:apache:http_server:2.4.49", "port": 443}]})
+    return cpe_match
+
+
+def test_link_creates_findings_with_defaults(matcher, db):
+    assert matcher.link_assets(["a1"])["created"] == 1
+    vuln = db["vulnerabilities"].find_one()
+    assert vuln["source"] == "cpe" and vuln["status"] == "Open"
+    assert (vuln["severity"], vuln["cvss"], vuln["exploitability"]) == ("High", 7.5, "None")
+    assert vuln["title"] == "Path traversal in Apache HTTP Server 2.4.49"
+    assert vuln["matched_software"] == "apache:http_server:2.4.49"
+
+
+def test_link_keeps_what_a_scanner_reported(matcher, db):
+    scanned = {"cve_id": "CVE-2021-41773", "port": 443, "title": "Apache 2.4.49 Path Traversal (plugin 153884)",
+               "severity": "High", "cvss": 7.5, "exploitability": "Exploited in Wild"}
+    vuln_fingerprint.write([("a1", scanned, {"risk_score": 7.4})], "nessus", datetime.utcnow())
+
+    matcher.link_assets(["a1"])
+    vuln = db["vulnerabilities"].find_one()
+    assert db["vulnerabilities"].count_documents({}) == 1
+    assert sorted(vuln["sources"]) == ["cpe", "nessus"]
+    assert vuln["title"] == scanned["title"]
+    assert vuln["exploitability"] == "Exploited in Wild"
+    assert vuln["risk_score"] == risk_scoring.vulnerability_score(
+        7.5, "Exploited in Wild", risk_scoring.estimate_exposure(7.5, "Exploited in Wild"))
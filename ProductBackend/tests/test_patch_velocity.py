@@ -0,0 +1,42 @@
+from datetime import datetime, timedelta
+
+import patch_velocity
+
+DAY = datetime(2026, 10, 19)
+CRITICAL = {"_id": "v1", "severity": "Critical"}
+LOW = {"_id": "v2", "severity": "Low"}
+
+
+def test_record_counts_a_replayed_transition_once(db):
+    transitions = [(CRITICAL, "Open", "Patched", DAY + timedelta(hours=9)),
+                   (LOW, "In Progress", "Patched", DAY + timedelta(hours=10))]
+    assert patch_velocity.record(transitions) == 2
+    assert patch_velocity.record(transitions) == 0
+    assert patch_velocity.record(transitions[:1] + [(LOW, "Patched", "Open", DAY + timedelta(hours=11))]) == 1
+
+    bucket = db[patch_velocity.BUCKETS].find_one({"_id": "2026-10-19"})
+    assert bucket["patched"] == 2
+    assert bucket["by_severity"] == {"Critical": 1, "Low": 1}
+    assert db["vulnerability_events"].count_documents({}) == 3
+
+
+def test_record_skips_non_changes(db):
+    assert patch_velocity.record([(CRITICAL, "Patched", "Patched", DAY)]) == 0
+    assert db["vulnerability_events"].count_documents({}) == 0
+
+
+def test_rebuild_matches_the_recorded_buckets(db):
+    patch_velocity.record([(CRITICAL, "Open", "Patched", DAY), (LOW, "Open", "Patched", DAY - timedelta(days=1))])
+    recorded = {bucket["_id"]: bucket["patched"] for bucket in db[patch_velocity.BUCKETS].find()}
+    db[patch_velocity.BUCKETS].update_one({"_id": "2026-10-19"}, {"$inc": {"patched": 5}})
+    assert patch_velocity.rebuild() == 2
+    assert {bucket["_id"]: bucket["patched"] for bucket in db[patch_velocity.BUCKETS].find()} == recorded
+
+
+def test_velocity_reads_the_window(db):
+    patch_velocity.record([(CRITICAL, "Open", "Patched", DAY), (LOW, "Open", "Patched", DAY),
+                           ({"_id": "v3"}, "Open", "Patched", DAY - timedelta(days=40))])
+    result = patch_velocity.velocity(now=DAY + timedelta(hours=12))
+    assert len(result["trend"]) == patch_velocity.WINDOW_DAYS
+    assert result["trend"][-1]["patches"] == 2
+    assert result["summary"]["total_30d"] == 2
@@ -0,0 +1,51 @@
+import time
+
+import pytest
+
+from shm_cache import SharedMemoryCache
+
+RESPONSE = (200, [(b"content-type", b"application/json")], b'{"ok": true}')
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return SharedMemoryCache(slots=256, slot_bytes=1024, directory=str(tmp_path))
+
+
+def test_set_then_get(cache):
+    cache.set("/api/assets/summary", RESPONSE, ttl=60)
+    value, stored_at = cache.get("/api/assets/summary")
+    assert value == RESPONSE
+    assert stored_at <= time.time()
+    assert cache.get("/api/other") is None
+    assert cache.hits == 1 and cache.misses == 1
+
+
+def test_expired_entries_miss(cache):
+    cache.set("/api/assets/summary", RESPONSE, ttl=-1)
+    assert cache.get("/api/assets/summary") is None
+
+
+def test_oversized_value_evicts_the_previous_one(cache):
+    cache.set("/api/assets/inventory", RESPONSE, ttl=60)
+    cache.set("/api/assets/inventory", (200, [], b"x" * 2048), ttl=60)
+    assert cache.get("/api/assets/inventory") is None
+
+
+def test_oversized_value_leaves_a_colliding_key_alone(tmp_path):
+    # With one slot every key collides; an oversized write for another key keeps this one.
+    cache = SharedMemoryCache(slots=1, slot_bytes=1024, directory=str(tmp_path))
+    cache.set("/api/a", RESPONSE, ttl=60)
+    cache.set("/api/b", (200, [], b"x" * 2048), ttl=60)
+    assert cache.get("/api/a")[0] == RESPONSE
+
+
+def test_invalidate_by_prefix_and_everything(cache):
+    cache.set("/api/assets/summary", RESPONSE, ttl=60)
+    cache.set("/api/vulnerabilities/summary", RESPONSE, ttl=60)
+    assert cache.invalidate("/api/assets") == 1
+    assert cache.get("/api/assets/summary") is None
+    assert cache.get("/api/vulnerabilities/summary") is not None
+    cache.invalidate()
+    assert cache.get("/api/vulnerabilities/summary") is None
+    assert cache.stats()["entries"] == 0
@@ -0,0 +1,31 @@
+from datetime import datetime, timedelta
+
+import threat_exposure
+
+
+def _finding(_id, actors, status="Open", risk=5.0):
+    return {"_id": _id, "threat_actors": actors, "status": status, "risk_score": risk,
+            "business_units": ["Finance"], "exploitability": "Exploited in Wild", "changed_at": datetime.utcnow()}
+
+
+def test_one_worker_per_interval_refreshes(db):
+    db["vulnerabilities"].insert_one(_finding("v1", ["APT29"]))
+    assert threat_exposure.refresh_if_due()
+    assert not threat_exposure.refresh_if_due()
+    assert [row["_id"] for row in threat_exposure.top_actors()] == ["APT29"]
+
+    stale = datetime.utcnow() - timedelta(seconds=threat_exposure.REFRESH_S + 1)
+    db["materialized_views"].update_one({"_id": threat_exposure.VIEW}, {"$set": {"claimed_at": stale}})
+    assert threat_exposure.refresh_if_due()
+
+
+def test_refresh_drops_actors_taken_off_findings(db):
+    db["vulnerabilities"].insert_many([_finding("v1", ["APT29", "FIN7"], risk=9.0), _finding("v2", ["FIN7"])])
+    threat_exposure.refresh(full=True)
+    assert threat_exposure.actor("APT29")["open_count"] == 1
+
+    db["vulnerabilities"].update_one({"_id": "v1"}, {"$set": {"threat_actors": ["FIN7"]}})
+    threat_exposure.touch(["APT29"])
+    threat_exposure.refresh()
+    assert threat_exposure.actor("APT29") is None
+    assert threat_exposure.actor("FIN7")["max_risk"] == 9.0
@@ -0,0 +1,70 @@
+from datetime import datetime, timedelta
+
+import vuln_fingerprint
+from vuln_fingerprint import fingerprint, sighting
+
+T0 = datetime(2026, 10, 1, 12, 0)
+T1 = T0 + timedelta(days=1)
+FINDING = {"cve_id": "CVE-2021-41773", "port": 443, "severity": "High", "cvss": 7.5}
+
+
+def test_fingerprint_is_stable_per_asset_cve_and_location():
+    assert fingerprint("a1", "cve-2021-41773", 443) == fingerprint("a1", "CVE-2021-41773", "443")
+    assert fingerprint("a1", "CVE-2021-41773", 443) != fingerprint("a1", "CVE-2021-41773", 80)
+    assert fingerprint("a1", "CVE-2021-41773", None, "openssl") != fingerprint("a1", "CVE-2021-41773")
+    assert fingerprint("a1", "CVE-2021-41773", 0) == fingerprint("a1", "CVE-2021-41773")
+
+
+def test_sighting_upserts_on_the_fingerprint(db):
+    for source, seen_at in (("nessus", T1), ("nmap", T0), ("nessus", T0)):
+        db["vulnerabilities"].bulk_write([sighting("a1", FINDING, source, seen_at)])
+    assert db["vulnerabilities"].count_documents({}) == 1
+    vuln = db["vulnerabilities"].find_one()
+    assert vuln["fingerprint"] == fingerprint("a1", "CVE-2021-41773", 443)
+    assert vuln["first_seen"] == T0 and vuln["last_seen"] == T1
+    assert vuln["source"] == "nessus" and sorted(vuln["sources"]) == ["nessus", "nmap"]
+    assert vuln["sightings"] == {"nessus": T0, "nmap": T0}
+    assert vuln["status"] == "Open"
+
+
+def test_write_keeps_the_last_sighting_per_fingerprint(db):
+    result = vuln_fingerprint.write([("a1", dict(FINDING, severity="Low"), {}),
+                                     ("a1", FINDING, {"risk_score": 80})], "nessus", T0)
+    assert result.upserted_count == 1
+    vuln = db["vulnerabilities"].find_one()
+    assert vuln["severity"] == "High" and vuln["risk_score"] == 80
+    assert vuln_fingerprint.write([], "nessus", T0) is None
+
+
+def test_write_reopens_findings_patched_before_the_sighting(db):
+    vuln_fingerprint.write([("a1", FINDING, {})], "nessus", T0)
+    db["vulnerabilities"].update_one({}, {"$set": {"status": "Patched", "patched_at": T0 + timedelta(hours=1)}})
+
+    vuln_fingerprint.write([("a1", FINDING, {})], "nessus", T0 + timedelta(minutes=30))  # older report
+    assert db["vulnerabilities"].find_one()["status"] == "Patched"
+
+    vuln_fingerprint.write([("a1", FINDING, {})], "nessus", T1)
+    vuln = db["vulnerabilities"].find_one()
+    assert vuln["status"] == "Open" and vuln["reopened_at"] == T1
+    assert [(event["from"], event["to"]) for event in db["vulnerability_events"].find()] == [("Patched", "Open")]
+
+
+def test_backfill_fingerprints_and_merges_duplicates(db):
+    db["assets"].insert_one({"_id": "a1", "criticality": "High"})
+    db["vulnerabilities"].insert_many([
+        {"asset_id": "a1", "cve_id": "CVE-2021-41773", "port": 443, "source": "nessus", "status": "Patched",
+         "first_seen": T1, "last_seen": T1},
+        {"asset_id": "a1", "cve_id": "cve-2021-41773", "port": 443, "source": "qualys", "status": "Open",
+         "first_seen": T0, "last_seen": T0},
+        {"asset_id": "a1", "cve_id": "CVE-2021-44228", "source": "nessus", "status": "Open"},
+        {"cve_id": "CVE-2021-44228", "status": "Open"},  # no asset: left alone
+    ])
+    stats = vuln_fingerprint.backfill(batch_size=2)
+    assert stats == {"scanned": 3, "fingerprinted": 2, "merged": 1}
+
+    merged = db["vulnerabilities"].find_one({"fingerprint": fingerprint("a1", "CVE-2021-41773", 443)})
+    assert merged["source"] == "nessus" and merged["sources"] == ["nessus", "qualys"]
+    assert merged["first_seen"] == T0 and merged["last_seen"] == T1
+    assert merged["status"] == "Open"  # still open on the other scanner
+    assert db["vulnerabilities"].count_documents({}) == 3
+    assert vuln_fingerprint.backfill() == {"scanned": 0, "fingerprinted": 0, "merged": 0}
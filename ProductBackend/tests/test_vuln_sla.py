@@ -0,0 +1,35 @@
+from datetime import datetime, timedelta
+
+import vuln_sla
+
+NOW = datetime(2026, 10, 19, 12, 0)
+
+
+def _breaches(db):
+    events = db["vulnerability_events"].find({"kind": vuln_sla.BREACH})
+    return sorted((event["vuln_id"], event["severity"]) for event in events)
+
+
+def test_findings_crossing_by_age_breach_once(db):
+    db["vulnerabilities"].insert_many([
+        {"_id": "old", "severity": "Critical", "status": "Open", "first_seen": NOW - timedelta(days=20)},
+        {"_id": "new", "severity": "Critical", "status": "Open", "first_seen": NOW - timedelta(days=10)},
+    ])
+    assert vuln_sla.check_breaches(NOW)["Critical"] == 1
+    assert vuln_sla.check_breaches(NOW + timedelta(days=6))["Critical"] == 1
+    assert vuln_sla.check_breaches(NOW + timedelta(days=7))["Critical"] == 0
+    assert _breaches(db) == [("new", "Critical"), ("old", "Critical")]
+    assert db["vulnerabilities"].count_documents({"sla_breached_at": {"$exists": True}}) == 2
+
+
+def test_raised_severity_and_reopened_findings_breach_on_the_next_run(db):
+    db["vulnerabilities"].insert_many([
+        {"_id": "raised", "severity": "Medium", "status": "Open", "first_seen": NOW - timedelta(days=40)},
+        {"_id": "reopened", "severity": "High", "status": "Patched", "first_seen": NOW - timedelta(days=60)},
+    ])
+    assert sum(vuln_sla.check_breaches(NOW).values()) == 0
+
+    db["vulnerabilities"].update_one({"_id": "raised"}, {"$set": {"severity": "High"}})
+    db["vulnerabilities"].update_one({"_id": "reopened"}, {"$set": {"status": "Open"}})
+    assert vuln_sla.check_breaches(NOW + timedelta(minutes=5))["High"] == 2
+    assert _breaches(db) == [("raised", "High"), ("reopened", "High")]
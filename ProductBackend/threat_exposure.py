@@ -0,0 +1,153 @@
+# Exposure by threat actor: open vulnerabilities, highest risk, affected business units and
+# exploitability mix per actor, materialized in threat_actor_exposure.
+#
+# Every vulnerability write stamps `changed_at`. A refresh asks the changed_at index which
+# actors appear on findings changed since its watermark and re-aggregates only those
+# actors, on the (threat_actors, status) multikey index, replacing their rows; actors
+# left with no open findings are dropped. A finding only names the actors it has now, so
+# writers that take an actor off a finding touch() it, queueing it in the state document
+# for the next refresh. main.py's scheduler refreshes every REFRESH_S; one worker per
+# interval claims the refresh in the materialized_views state document, and reads only
+# ever see the materialized rows, so the panel reads a few small documents and never
+# scans vulnerabilities.
+#
+#   python threat_exposure.py          # full rebuild (after bulk loads)
+
+import os
+import time
+from datetime import datetime, timedelta
+
+from pymongo import DeleteMany, ReplaceOne
+from pymongo.errors import DuplicateKeyError
+
+from database import db
+from risk_scoring import EXPLOITABILITY_WEIGHTS, OPEN_STATUSES
+
+VIEW = "threat_actor_exposure"
+REFRESH_S = int(os.getenv("THREAT_EXPOSURE_REFRESH_S", "30"))
+# Writes stamped just before a refresh may commit just after it; re-read that window next time.
+LAG = timedelta(seconds=60)
+# Past this many changed actors a full rebuild is cheaper than a filtered one.
+FULL_REBUILD_ACTORS = 500
+
+EXPLOITABILITY_LABELS = list(EXPLOITABILITY_WEIGHTS)
+
+
+def _pipeline(actors):
+    match = {"status": {"$in": OPEN_STATUSES}, "threat_actors.0": {"$exists": True}}
+    if actors is not None:
+        match["threat_actors"] = {"$in": actors}
+    pipeline = [
+        {"$match": match},
+        {"$project": {"threat_actors": 1, "risk_score": 1, "business_units": 1, "exploitability": 1}},
+        {"$unwind": "$threat_actors"},
+    ]
+    if actors is not None:
+        pipeline.append({"$match": {"threat_actors": {"$in": actors}}})
+    pipeline.append({"$group": {
+        "_id": "$threat_actors",
+        "open_count": {"$sum": 1},
+        "max_risk": {"$max": "$risk_score"},
+        # Distinct unit combinations are few, so collecting them stays small.
+        "unit_sets": {"$addToSet": "$business_units"},
+        **{f"x{i}": {"$sum": {"$cond": [{"$eq": ["$exploitability", label]}, 1, 0]}}
+           for i, label in enumerate(EXPLOITABILITY_LABELS)},
+    }})
+    return pipeline
+
+
+def _row(group, refreshed_at):
+    return {
+        "_id": group["_id"],
+        "open_count": group["open_count"],
+        "max_risk": group["max_risk"],
+        "business_units": sorted(set().union(*(units for units in group["unit_sets"] if units))),
+        "by_exploitability": {label: group[f"x{i}"] for i, label in enumerate(EXPLOITABILITY_LABELS)},
+        "refreshed_at": refreshed_at,
+    }
+
+
+def refresh(full=False):
+    """Re-aggregates actors touched since the last refresh (every actor when `full`); returns stats."""
+    started, timer = datetime.utcnow(), time.perf_counter()
+    state = db["materialized_views"].find_one({"_id": VIEW}) or {}
+    touched = state.get("touched", [])
+    actors = None
+    if state.get("watermark") and not full:
+        changed = db["vulnerabilities"].distinct("threat_actors", {"changed_at": {"$gte": state["watermark"]}})
+        actors = sorted(set(changed) | set(touched))
+        if len(actors) > FULL_REBUILD_ACTORS:
+            actors = None
+
+    if actors == []:
+        rows = []
+    else:
+        groups = db["vulnerabilities"].aggregate(_pipeline(actors), allowDiskUse=True)
+        rows = [_row(group, started) for group in groups]
+    ops = [ReplaceOne({"_id": row["_id"]}, row, upsert=True) for row in rows]
+    # Actors with no open findings left.
+    present = [row["_id"] for row in rows]
+    if actors is None:
+        ops.append(DeleteMany({"_id": {"$nin": present}}))
+    elif set(actors) - set(present):
+        ops.append(DeleteMany({"_id": {"$in": sorted(set(actors) - set(present))}}))
+    if ops:
+        db[VIEW].bulk_write(ops, ordered=False)
+
+    db["materialized_views"].update_one(
+        {"_id": VIEW},
+        {"$set": {"watermark": started - LAG, "refreshed_at": started}, "$pullAll": {"touched": touched}},
+        upsert=True)
+    return {"actors": len(rows), "full": actors is None, "ms": round((time.perf_counter() - timer) * 1000, 1)}
+
+
+def touch(actors):
+    """Queues actors that writers took off findings; the next refresh re-aggregates them."""
+    if actors:
+        db["materialized_views"].update_one(
+            {"_id": VIEW}, {"$addToSet": {"touched": {"$each": sorted(actors)}}}, upsert=True)
+
+
+def refresh_if_due():
+    """Refreshes unless another worker claimed the refresh within REFRESH_S; True if this one ran."""
+    now = datetime.utcnow()
+    try:
+        db["materialized_views"].find_one_and_update(
+            {"_id": VIEW, "$or": [{"claimed_at": {"$exists": False}},
+                                  {"claimed_at": {"$lte": now - timedelta(seconds=REFRESH_S)}}]},
+            {"$set": {"claimed_at": now}}, upsert=True)
+    except DuplicateKeyError:
+        return False  # the state document exists and its claim is recent
+    refresh()
+    return True
+
+
+def top_actors(limit=20, sort="open_count"):
+    order = [(sort, -1), ("max_risk" if sort == "open_count" else "open_count", -1), ("_id", 1)]
+    return list(db[VIEW].find().sort(order).limit(limit))
+
+
+def actor(name, limit=10):
+    """The actor's row plus its riskiest open findings, or None if it has none."""
+    row = db[VIEW].find_one({"_id": name})
+    if row is None:
+        return None
+    row["top_vulnerabilities"] = list(db["vulnerabilities"].find(
+        {"threat_actors": name, "status": {"$in": OPEN_STATUSES}},
+        {"cve_id": 1, "title": 1, "severity": 1, "exploitability": 1, "risk_score": 1, "asset_id": 1,
+         "business_units": 1, "first_seen": 1},
+    ).sort("risk_score", -1).limit(limit))
+    return row
+
+
+def exploitability_counts():
+    """Open findings per exploitability label, one index count each."""
+    vulns = db["vulnerabilities"]
+    return {label: vulns.count_documents({"exploitability": label, "status": {"$in": OPEN_STATUSES}})
+            for label in EXPLOITABILITY_LABELS}
+
+
+if __name__ == "__main__":
+    started = time.perf_counter()
+    stats = refresh(full=True)
+    print(f"✅ Rebuilt exposure for {stats['actors']:,} threat actors in {time.perf_counter() - started:.1f}s")
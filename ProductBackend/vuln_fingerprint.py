@@ -0,0 +1,179 @@
+# Vulnerability fingerprints: one document per (asset, CVE, port or component), however
+# many scanners report it.
+#
+#   fingerprint = sha1(asset_id | CVE id | port, else component, else "host")
+#
+# Writers upsert findings through sighting(): one write on the unique fingerprint index
+# that either creates the finding or merges the new sighting into it, without reading
+# it first. first_seen only ever moves back and last_seen forward, the reporting source
+# is added to `sources`, and `sightings.<source>` keeps when each source last saw it.
+# `source` stays the first reporter; defaults a writer only assumes (the matcher's
+# severity, say) are written on insert, never over a finding's own. write() upserts a
+# batch of sightings and reopens findings that were patched before being seen again,
+# recording the Patched -> Open transition for patch velocity (patch_velocity.py).
+# Threat actors a sighting takes off a finding are passed to threat_exposure.touch() so
+# the view re-aggregates them.
+#
+# Findings written before fingerprints existed (and generated data) are fingerprinted,
+# and duplicates among them merged into one, by:
+#
+#   python vuln_fingerprint.py
+
+import hashlib
+import time
+
+from pymongo import DeleteMany, UpdateOne
+
+import patch_velocity
+import risk_scoring
+import threat_exposure
+import vuln_priority
+from database import db
+from risk_scoring import OPEN_STATUSES
+
+HOST = "host"  # location of findings with neither a port nor a component
+
+
+def fingerprint(asset_id, cve_id, port=None, component=None):
+    location = str(port) if port else component or HOST  # port 0: host-level script output
+    return hashlib.sha1(f"{asset_id}|{cve_id.upper()}|{location}".encode()).hexdigest()
+
+
+def sighting(asset_id, finding, source, seen_at, defaults=None, **fields):
+    """
+    The upsert that records `source` seeing `finding` on `asset_id` at `seen_at`.
+    `defaults` are only written when this creates the finding.
+    """
+    fp = fingerprint(asset_id, finding["cve_id"], finding.get("port"), finding.get("component"))
+    update = dict(finding, fingerprint=fp, asset_id=asset_id, changed_at=seen_at, **fields,
+                  **{f"sightings.{source}": seen_at})
+    on_insert = {field: value for field, value in (defaults or {}).items() if field not in update}
+    return UpdateOne(
+        {"fingerprint": fp},
+        {"$set": update,
+         "$min": {"first_seen": seen_at},
+         "$max": {"last_seen": seen_at},
+         "$addToSet": {"sources": source},
+         "$setOnInsert": dict(on_insert, status="Open", source=source)},
+        upsert=True,  # concurrent first sightings: the server retries the loser as an update
+    )
+
+
+def write(sightings, source, seen_at):
+    """
+    Upserts (asset_id, finding, fields[, defaults]) sightings by `source`, the last one
+    winning per fingerprint, and reopens patched findings among them; returns the bulk
+    write result, or None when there was nothing to write.
+    """
+    ops, actors = {}, {}
+    for asset_id, finding, fields, *defaults in sightings:
+        fp = fingerprint(asset_id, finding["cve_id"], finding.get("port"), finding.get("component"))
+        ops[fp] = sighting(asset_id, finding, source, seen_at, *defaults, **fields)
+        if "threat_actors" in finding:
+            actors[fp] = set(finding["threat_actors"] or [])
+    if not ops:
+        return None
+
+    # Regressions (patched, then seen again since) and, when the sightings name threat
+    # actors, findings whose current actors they may replace.
+    regressed = {"status": patch_velocity.REMEDIATED, "patched_at": {"$not": {"$gte": seen_at}}}
+    query = {"fingerprint": {"$in": list(ops)}}
+    query.update({"$or": [regressed, {"threat_actors.0": {"$exists": True}}]} if actors else regressed)
+    reopen, transitions, dropped = [], [], set()
+    for vuln in db["vulnerabilities"].find(
+            query, {"fingerprint": 1, "status": 1, "patched_at": 1, "severity": 1, "threat_actors": 1}):
+        if vuln["fingerprint"] in actors:
+            dropped |= set(vuln.get("threat_actors") or []) - actors[vuln["fingerprint"]]
+        if vuln.get("status") == patch_velocity.REMEDIATED and not (
+                vuln.get("patched_at") and vuln["patched_at"] >= seen_at):
+            reopen.append(UpdateOne({"_id": vuln["_id"], "status": patch_velocity.REMEDIATED},
+                                    {"$set": {"status": "Open", "reopened_at": seen_at, "changed_at": seen_at}}))
+            transitions.append((vuln, patch_velocity.REMEDIATED, "Open", seen_at))
+    if reopen:
+        db["vulnerabilities"].bulk_write(reopen, ordered=False)
+        patch_velocity.record(transitions)
+    result = db["vulnerabilities"].bulk_write(list(ops.values()), ordered=False)
+    threat_exposure.touch(dropped)  # after the write, so their refresh no longer counts these findings
+    return result
+
+
+# ============================================
+# BACKFILL
+# ============================================
+
+_FIELDS = {"asset_id": 1, "cve_id": 1, "port": 1, "component": 1, "source": 1, "sources": 1,
+           "first_seen": 1, "last_seen": 1, "status": 1, "fingerprint": 1}
+
+
+def _merge(group):
+    """(keeper, $set for it, ids to delete) for documents sharing one fingerprint."""
+    group = sorted(group, key=lambda doc: (doc.get("fingerprint") is None, doc["_id"]))
+    keeper, duplicates = group[0], group[1:]
+    updates = {"fingerprint": fingerprint(keeper["asset_id"], keeper["cve_id"], keeper.get("port"),
+                                          keeper.get("component"))}
+    sources = sorted({source for doc in group for source in (doc.get("sources") or [doc.get("source")]) if source})
+    if sources:
+        updates["sources"] = sources
+    first_seen = [doc["first_seen"] for doc in group if doc.get("first_seen")]
+    last_seen = [doc["last_seen"] for doc in group if doc.get("last_seen")]
+    if first_seen:
+        updates["first_seen"] = min(first_seen)
+    if last_seen:
+        updates["last_seen"] = max(last_seen)
+    if keeper.get("status") not in OPEN_STATUSES:
+        # One scanner's copy being closed doesn't make the finding fixed while another's is open.
+        reopened = next((doc["status"] for doc in duplicates if doc.get("status") in OPEN_STATUSES), None)
+        if reopened:
+            updates["status"] = reopened
+    return keeper, updates, [doc["_id"] for doc in duplicates]
+
+
+def backfill(batch_size=1000):
+    """Fingerprints findings that have an asset but no fingerprint, merging duplicates; returns stats."""
+    vulns = db["vulnerabilities"]
+    stats = {"scanned": 0, "fingerprinted": 0, "merged": 0}
+    touched_assets = set()
+
+    def flush(batch):
+        groups = {}
+        for doc in batch:
+            fp = fingerprint(doc["asset_id"], doc["cve_id"], doc.get("port"), doc.get("component"))
+            groups.setdefault(fp, []).append(doc)
+        # Documents fingerprinted earlier (or by a writer since) win over the unfingerprinted ones.
+        for doc in vulns.find({"fingerprint": {"$in": list(groups)}}, _FIELDS):
+            groups[doc["fingerprint"]].append(doc)
+        ops, doomed = [], []
+        for group in groups.values():
+            keeper, updates, duplicates = _merge(group)
+            ops.append(UpdateOne({"_id": keeper["_id"]}, {"$set": updates}))
+            doomed.extend(duplicates)
+            if duplicates:
+                touched_assets.add(keeper["asset_id"])
+        if doomed:
+            ops.insert(0, DeleteMany({"_id": {"$in": doomed}}))  # before a keeper takes the fingerprint
+        vulns.bulk_write(ops, ordered=True)
+        stats["fingerprinted"] += len(groups)
+        stats["merged"] += len(doomed)
+
+    # Documents are only fingerprinted or deleted, so each pass shrinks what the query matches.
+    query = {"asset_id": {"$exists": True, "$ne": None}, "cve_id": {"$exists": True},
+             "fingerprint": {"$exists": False}}
+    while True:
+        batch = list(vulns.find(query, _FIELDS).sort("_id", 1).limit(batch_size))
+        if not batch:
+            break
+        stats["scanned"] += len(batch)
+        flush(batch)
+
+    if stats["merged"]:
+        risk_scoring.recompute(touched_assets)  # open counts per asset went down
+        vuln_priority.priority_queue.invalidate()
+        threat_exposure.refresh(full=True)  # merged-away copies may have named other actors
+    return stats
+
+
+if __name__ == "__main__":
+    started = time.perf_counter()
+    stats = backfill()
+    print(f"✅ Fingerprinted {stats['fingerprinted']:,} findings and merged {stats['merged']:,} duplicates "
+          f"in {time.perf_counter() - started:.1f}s")
@@ -0,0 +1,188 @@
+# Prioritization queue over open vulnerabilities: most important first, ordered by
+# risk_score then exposure_score (both descending), globally and per business unit.
+#
+# Each process keeps the top TOP_K of every scope it has been asked for in memory and
+# updates them in place as it writes vulnerabilities itself. A scope that loses an
+# entry while full is refilled from the index on its next read, since whatever moves up
+# into the top K isn't known locally. Writes by other workers are noticed through a
+# shared version counter, which marks every cached scope for refill.
+#
+# Reads past the cached top K are keyset range scans on the (status, risk_score,
+# exposure_score, _id) indexes, so no page re-sorts the collection.
+
+import bisect
+import os
+import threading
+import time
+
+from bson import ObjectId
+from pymongo import ReturnDocument
+
+from database import db
+from risk_scoring import OPEN_STATUSES
+
+TOP_K = int(os.getenv("VULN_QUEUE_TOP_K", "100"))
+VERSION_CHECK_S = float(os.getenv("VULN_QUEUE_VERSION_CHECK_S", "1"))
+
+GLOBAL = None  # scope for the whole organisation; otherwise a business unit name
+ORDER = [("risk_score", -1), ("exposure_score", -1), ("_id", 1)]
+PROJECTION = {"cve_id": 1, "title": 1, "cvss": 1, "severity": 1, "exploitability": 1, "risk_score": 1,
+              "exposure_score": 1, "status": 1, "business_units": 1, "asset_id": 1,
+              "threat_actors": 1, "first_seen": 1}
+
+
+def priority_key(doc):
+    """Sort key matching ORDER: smaller is more important."""
+    return -doc["risk_score"], -doc["exposure_score"], doc["_id"]
+
+
+def scope_query(scope):
+    # Unscored findings have no place in the order (and no cursor), so they're left out.
+    query = {"status": {"$in": OPEN_STATUSES}, "risk_score": {"$ne": None}, "exposure_score": {"$ne": None}}
+    if scope is not GLOBAL:
+        query["business_units"] = scope
+    return query
+
+
+def _in_scope(doc, scope):
+    return (doc.get("status") in OPEN_STATUSES
+            and doc.get("risk_score") is not None and doc.get("exposure_score") is not None
+            and (scope is GLOBAL or scope in (doc.get("business_units") or [])))
+
+
+def encode_cursor(doc):
+    return f"{doc['risk_score']}:{doc['exposure_score']}:{doc['_id']}"
+
+
+def decode_cursor(cursor):
+    """(risk_score, exposure_score, _id) from encode_cursor(); ValueError if malformed."""
+    risk, exposure, oid = cursor.split(":")
+    if not ObjectId.is_valid(oid):
+        raise ValueError(f"invalid cursor: {cursor}")
+    return float(risk), float(exposure), ObjectId(oid)
+
+
+class _TopK:
+    def __init__(self, k):
+        self.k = k
+        self.keys = []      # sorted priority keys
+        self.docs = {}      # _id -> doc
+        self.stale = True
+        self.exhausted = False  # the scope held fewer than k entries when last filled
+
+    def fill(self, docs):
+        self.docs = {doc["_id"]: doc for doc in docs}
+        self.keys = sorted(priority_key(doc) for doc in docs)
+        self.exhausted = len(docs) < self.k
+        self.stale = False
+
+    def discard(self, oid):
+        doc = self.docs.pop(oid, None)
+        if doc is None:
+            return
+        was_full = len(self.keys) >= self.k
+        self.keys.remove(priority_key(doc))
+        if was_full and not self.exhausted:
+            self.stale = True  # the next entry in line is only known to MongoDB
+
+    def offer(self, doc):
+        key = priority_key(doc)
+        if len(self.keys) >= self.k and key > self.keys[-1]:
+            return
+        bisect.insort(self.keys, key)
+        self.docs[doc["_id"]] = doc
+        if len(self.keys) > self.k:
+            dropped = self.keys.pop()
+            del self.docs[dropped[2]]
+            self.exhausted = False
+
+    def head(self, limit):
+        return [self.docs[key[2]] for key in self.keys[:limit]]
+
+
+class PriorityQueue:
+    def __init__(self, k=TOP_K):
+        self.k = k
+        self._lock = threading.Lock()
+        self._scopes = {}
+        self._version = None
+        self._checked = 0.0
+
+    def _shared_version(self):
+        state = db["vuln_priority_state"].find_one({"_id": "version"})
+        return state["value"] if state else 0
+
+    def _check_version(self):
+        if time.monotonic() - self._checked < VERSION_CHECK_S:
+            return
+        version = self._shared_version()
+        if version != self._version:
+            for entry in self._scopes.values():
+                entry.stale = True
+            self._version = version
+        self._checked = time.monotonic()
+
+    def top(self, scope=GLOBAL, limit=None):
+        """The most important open vulnerabilities in `scope`, at most k of them."""
+        with self._lock:
+            self._check_version()
+            entry = self._scopes.setdefault(scope, _TopK(self.k))
+            if entry.stale:
+                entry.fill(list(db["vulnerabilities"].find(scope_query(scope), PROJECTION).sort(ORDER).limit(self.k)))
+            return entry.head(limit or self.k)
+
+    def page(self, scope=GLOBAL, limit=50, after=None):
+        """
+        (docs, next_cursor) in priority order. The first page within the top k comes from
+        memory; any other page is an index range scan starting after `after`.
+        """
+        if after is None and limit < self.k:
+            docs = self.top(scope, limit + 1)
+        else:
+            query = scope_query(scope)
+            if after is not None:
+                risk, exposure, oid = decode_cursor(after)
+                query["$or"] = [
+                    {"risk_score": {"$lt": risk}},
+                    {"risk_score": risk, "exposure_score": {"$lt": exposure}},
+                    {"risk_score": risk, "exposure_score": exposure, "_id": {"$gt": oid}},
+                ]
+            docs = list(db["vulnerabilities"].find(query, PROJECTION).sort(ORDER).limit(limit + 1))
+        more = len(docs) > limit
+        docs = docs[:limit]
+        return docs, encode_cursor(docs[-1]) if more and docs else None
+
+    def apply(self, docs):
+        """
+        Updates cached scopes with the current state of `docs`, which this process has
+        just written, and tells other workers to refill theirs.
+        """
+        state = db["vuln_priority_state"].find_one_and_update(
+            {"_id": "version"}, {"$inc": {"value": 1}}, upsert=True, return_document=ReturnDocument.AFTER)
+        with self._lock:
+            in_sync = self._version is not None and state["value"] == self._version + 1
+            self._version = state["value"]
+            for scope, entry in self._scopes.items():
+                if not in_sync:
+                    entry.stale = True  # someone else wrote in between; our copies can't be patched
+                    continue
+                for doc in docs:
+                    entry.discard(doc["_id"])
+                    if _in_scope(doc, scope):
+                        entry.offer(doc)
+
+    def invalidate(self):
+        """After writes that bypassed apply() (bulk loads): every worker refills."""
+        db["vuln_priority_state"].update_one({"_id": "version"}, {"$inc": {"value": 1}}, upsert=True)
+        with self._lock:
+            for entry in self._scopes.values():
+                entry.stale = True
+
+    def stats(self):
+        with self._lock:
+            return {"k": self.k, "version": self._version,
+                    "scopes": {scope or "global": {"cached": len(entry.keys), "stale": entry.stale}
+                               for scope, entry in self._scopes.items()}}
+
+
+priority_queue = PriorityQueue()
@@ -0,0 +1,180 @@
+# Vulnerability aging and SLA breaches, from each finding's first_seen.
+#
+# A finding's age is now - first_seen, and it breaches its SLA once it has been open for
+# SLA_DAYS[severity]. The scheduler (main.py calls run_if_due() every CHECK_INTERVAL_S)
+# finds the open findings past their threshold that haven't been flagged yet with one
+# range query per severity on the (severity, status, first_seen) index:
+#
+#   first_seen <= now - SLA_DAYS[severity], no sla_breached_at
+#
+# Besides the findings that crossed by age since the previous run, that catches ones
+# whose severity was raised (catalog enrichment), reopened findings already past due and
+# bulk loads of old findings. Each breach becomes a vulnerability_events entry with a
+# deterministic _id, so overlapping runs on several workers emit it once, and stamps
+# sla_breached_at on the finding, which takes it out of the next run's query.
+#
+# Every run also rewrites vuln_aging_rollup (open findings per severity and age bucket,
+# and how many are past due) from index range counts; GET /api/vulnerabilities/aging
+# serves that document.
+#
+#   python vuln_sla.py                # check for breaches and rebuild the rollup
+#   python vuln_sla.py backfill       # first_seen from the legacy age_days field
+
+import argparse
+import os
+import time
+from datetime import datetime, timedelta
+
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+
+from database import db
+from risk_scoring import OPEN_STATUSES
+
+SLA_DAYS = {"Critical": 15, "High": 30, "Medium": 90, "Low": 180}
+# (label, from days, to days): open findings by age.
+AGING_BUCKETS = [("0-7d", 0, 7), ("7-30d", 7, 30), ("30-90d", 30, 90), ("90-180d", 90, 180), ("180d+", 180, None)]
+CHECK_INTERVAL_S = int(os.getenv("VULN_SLA_CHECK_INTERVAL_S", "300"))
+
+BREACH = "sla_breach"
+_FIELDS = {"cve_id": 1, "asset_id": 1, "severity": 1, "business_units": 1, "first_seen": 1}
+
+
+def age_days(first_seen, now=None):
+    if not isinstance(first_seen, datetime):
+        return None
+    return max(0, ((now or datetime.utcnow()) - first_seen).days)
+
+
+def _open(severity, **first_seen):
+    return {"severity": severity, "status": {"$in": OPEN_STATUSES}, "first_seen": first_seen}
+
+
+def _emit(events):
+    try:
+        db["vulnerability_events"].insert_many(events, ordered=False)
+    except BulkWriteError as e:
+        # Already emitted by an overlapping run; anything else is real.
+        if any(error.get("code") != 11000 for error in e.details.get("writeErrors", [])):
+            raise
+
+
+# ============================================
+# SCHEDULER
+# ============================================
+
+def check_breaches(now=None):
+    """Emits an event for every open finding past its SLA that wasn't flagged yet; returns counts."""
+    now = now or datetime.utcnow()
+    breaches = {}
+    for severity, days in SLA_DAYS.items():
+        query = _open(severity, **{"$lte": now - timedelta(days=days)})
+        query["sla_breached_at"] = {"$exists": False}
+        vulns = list(db["vulnerabilities"].find(query, _FIELDS))
+        if vulns:
+            _emit([{
+                "_id": f"{BREACH}:{vuln['_id']}:{severity}",
+                "kind": BREACH,
+                "vuln_id": vuln["_id"],
+                "cve_id": vuln.get("cve_id"),
+                "asset_id": vuln.get("asset_id"),
+                "business_units": vuln.get("business_units") or [],
+                "severity": severity,
+                "first_seen": vuln["first_seen"],
+                "due_at": vuln["first_seen"] + timedelta(days=days),
+                "at": now,
+            } for vuln in vulns])
+            db["vulnerabilities"].bulk_write([
+                UpdateOne({"_id": vuln["_id"], "sla_breached_at": {"$exists": False}},
+                          {"$set": {"sla_breached_at": now}}) for vuln in vulns
+            ], ordered=False)
+        breaches[severity] = len(vulns)
+    db["vuln_sla_state"].update_one({"_id": "cutoffs"}, {"$set": {"ran_at": now}}, upsert=True)
+    return breaches
+
+
+def refresh_rollup(now=None):
+    """Rewrites the aging rollup from range counts on the (severity, status, first_seen) index."""
+    now = now or datetime.utcnow()
+    vulns = db["vulnerabilities"]
+    by_severity = {}
+    for severity, days in SLA_DAYS.items():
+        buckets = {}
+        for label, start, end in AGING_BUCKETS:
+            window = {"$lte": now - timedelta(days=start)}
+            if end is not None:
+                window["$gt"] = now - timedelta(days=end)
+            buckets[label] = vulns.count_documents(_open(severity, **window))
+        by_severity[severity] = {
+            "sla_days": days,
+            "open": sum(buckets.values()),
+            "past_due": vulns.count_documents(_open(severity, **{"$lte": now - timedelta(days=days)})),
+            "buckets": buckets,
+        }
+    rollup = {"_id": "current", "computed_at": now, "buckets": [label for label, _, _ in AGING_BUCKETS],
+              "by_severity": by_severity}
+    db["vuln_aging_rollup"].replace_one({"_id": "current"}, rollup, upsert=True)
+    return rollup
+
+
+def run():
+    now = datetime.utcnow()
+    breaches = check_breaches(now)
+    refresh_rollup(now)
+    return breaches
+
+
+def run_if_due():
+    """One scheduler tick; several workers share the interval through vuln_sla_state."""
+    state = db["vuln_sla_state"].find_one({"_id": "cutoffs"}, {"ran_at": 1})
+    if state is None or datetime.utcnow() - state["ran_at"] >= timedelta(seconds=CHECK_INTERVAL_S):
+        return run()
+    return None
+
+
+def rollup():
+    return db["vuln_aging_rollup"].find_one({"_id": "current"}) or refresh_rollup()
+
+
+def recent_breaches(limit=50, severity=None):
+    query = {"kind": BREACH}
+    if severity:
+        query["severity"] = severity
+    return list(db["vulnerability_events"].find(query).sort("at", -1).limit(limit))
+
+
+# ============================================
+# MIGRATION
+# ============================================
+
+def backfill_first_seen(batch_size=1000):
+    """Sets first_seen from age_days where it's missing and drops age_days everywhere."""
+    now = datetime.utcnow()
+    ops, updated = [], 0
+    for vuln in db["vulnerabilities"].find({"age_days": {"$exists": True}}, {"age_days": 1, "first_seen": 1}):
+        update = {"$unset": {"age_days": ""}}
+        if not vuln.get("first_seen") and isinstance(vuln.get("age_days"), (int, float)):
+            update["$set"] = {"first_seen": now - timedelta(days=vuln["age_days"])}
+        ops.append(UpdateOne({"_id": vuln["_id"]}, update))
+        if len(ops) >= batch_size:
+            updated += db["vulnerabilities"].bulk_write(ops, ordered=False).modified_count
+            ops = []
+    if ops:
+        updated += db["vulnerabilities"].bulk_write(ops, ordered=False).modified_count
+    return updated
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Vulnerability SLA checks and aging rollup.")
+    parser.add_argument("command", nargs="?", choices=["run", "backfill"], default="run")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    if args.command == "backfill":
+        print(f"✅ Backfilled first_seen on {backfill_first_seen():,} vulnerabilities "
+              f"in {time.perf_counter() - started:.1f}s")
+    else:
+        breaches = run()
+        print(f"✅ {sum(breaches.values()):,} new SLA breaches "
+              f"({', '.join(f'{severity} {n:,}' for severity, n in breaches.items())}) "
+              f"in {time.perf_counter() - started:.1f}s")